@@ -0,0 +1,60 @@
+"""Compare iterating over filtered captures in batches and with filter.
+
+Usage:
+    python benchmarks/batch_iteration.py --num-files 10 --captures 2000
+"""
+import argparse
+import tempfile
+
+from datasetinsights.datasets.unity_perception import Captures
+from utils import make_dataset, measure, report
+
+BOUNDING_BOX_2D_DEFINITION_ID = 1
+
+
+def filter_all(data_root, batch_size, prefetch_files):
+    table = Captures(data_root).filter(BOUNDING_BOX_2D_DEFINITION_ID)
+    for start in range(0, len(table), batch_size):
+        table.iloc[start : start + batch_size]
+
+
+def iter_batches(data_root, batch_size, prefetch_files):
+    for _ in Captures.iter_batches(
+        BOUNDING_BOX_2D_DEFINITION_ID,
+        batch_size,
+        data_root,
+        prefetch_files=prefetch_files,
+    ):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        rows = []
+        for name, func, prefetch_files in [
+            ("filter + slice", filter_all, 0),
+            ("iter_batches", iter_batches, 0),
+            ("iter_batches (prefetch 1 file)", iter_batches, 1),
+        ]:
+            elapsed, peak_rss = measure(
+                func, data_root, args.batch_size, prefetch_files
+            )
+            rows.append((name, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Batches of {args.batch_size}: {args.num_files} files x "
+        f"{args.captures} captures",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
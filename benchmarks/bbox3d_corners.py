@@ -0,0 +1,51 @@
+"""Compare computing the corners of 3D bounding boxes.
+
+Usage:
+    python benchmarks/bbox3d_corners.py --boxes 100000
+"""
+import argparse
+
+import numpy as np
+
+from datasetinsights.io.bbox import BBox3DArray
+from utils import measure, report
+
+
+def random_boxes(count):
+    rng = np.random.default_rng(0)
+    return BBox3DArray(
+        label=rng.integers(0, 10, count),
+        translation=rng.uniform(-50, 50, (count, 3)),
+        size=rng.uniform(1, 5, (count, 3)),
+        rotation=rng.normal(size=(count, 4)),
+    )
+
+
+def scalar(count):
+    bboxes = random_boxes(count).to_bboxes()
+    [b.p for b in bboxes]
+
+
+def vectorized(count):
+    random_boxes(count).corners
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boxes", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = []
+    for method, func in [("BBox3D.p", scalar), ("BBox3DArray", vectorized)]:
+        elapsed, peak_rss = measure(func, args.boxes)
+        rows.append((method, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Corners of {args.boxes} 3D boxes",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
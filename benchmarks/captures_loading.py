@@ -0,0 +1,89 @@
+"""Compare single-pass and two-pass loading of the captures table.
+
+The two-pass baseline is the loading that Captures used before captures
+files were parsed once for both tables: every file is parsed once for the
+captures and once more for the annotations.
+
+Usage:
+    python benchmarks/captures_loading.py --num-files 20 --captures 500
+"""
+import argparse
+import tempfile
+
+import pandas as pd
+
+from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.datasets.unity_perception.tables import (
+    SCHEMA_VERSION,
+    glob,
+    load_table,
+)
+from utils import make_dataset, measure, report
+
+
+def load_captures(data_root, version):
+    captures = []
+    for c_file in glob(data_root, Captures.FILE_PATTERN):
+        capture = load_table(c_file, Captures.TABLE_NAME, version, max_level=0)
+        if "annotations" in capture.columns:
+            capture = capture.drop(columns="annotations")
+        captures.append(capture)
+
+    return pd.concat(captures, axis=0)
+
+
+def load_annotations(data_root, version):
+    annotations = []
+    for c_file in glob(data_root, Captures.FILE_PATTERN):
+        try:
+            annotation = load_table(
+                c_file,
+                Captures.TABLE_NAME,
+                version,
+                record_path="annotations",
+                meta="id",
+                meta_prefix="capture.",
+            )
+        except KeyError:
+            annotation = pd.DataFrame(
+                {"annotation_definition": [], "capture.id": []}
+            )
+        annotations.append(annotation)
+
+    return pd.concat(annotations, axis=0)
+
+
+def load_two_pass(data_root):
+    load_captures(data_root, SCHEMA_VERSION)
+    load_annotations(data_root, SCHEMA_VERSION)
+
+
+def load_single_pass(data_root):
+    Captures(data_root, SCHEMA_VERSION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=20)
+    parser.add_argument("--captures", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        rows = []
+        for name, func in [
+            ("two-pass", load_two_pass),
+            ("single-pass", load_single_pass),
+        ]:
+            elapsed, peak_rss = measure(func, data_root)
+            rows.append((name, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Captures loading: {args.num_files} files x {args.captures} captures",
+        rows,
+        ["mode", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Report the memory used by default and compact captures tables.
+
+Usage:
+    python benchmarks/compact_memory.py --num-files 10 --captures 2000
+"""
+import argparse
+import tempfile
+
+from datasetinsights.datasets.unity_perception import Captures
+from utils import make_dataset, report
+
+MIB = 2 ** 20
+
+
+def memory_usage(table):
+    """Deep memory usage of a table in MiB."""
+    return table.memory_usage(deep=True).sum() / MIB
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        default = Captures(data_root)
+        compact = Captures(data_root, compact=True)
+
+    # Annotation values are not converted, so they are reported apart.
+    tables = [
+        ("captures", lambda c: c.captures),
+        ("annotations", lambda c: c.annotations.drop(columns="values")),
+        ("annotation values", lambda c: c.annotations[["values"]]),
+    ]
+    rows = []
+    for name, get_table in tables:
+        before = memory_usage(get_table(default))
+        after = memory_usage(get_table(compact))
+        reduction = 100 * (1 - after / before)
+        rows.append(
+            (name, f"{before:.1f}", f"{after:.1f}", f"{reduction:.0f}%")
+        )
+
+    report(
+        f"Captures memory: {args.num_files} files x {args.captures} captures",
+        rows,
+        ["table", "default (MiB)", "compact (MiB)", "reduction"],
+    )
+    print(
+        "Compact capture ids share their categories, which are counted in "
+        "both tables."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure the COCO-style evaluation of 2D detections over many captures.
+
+Predictions are the ground truth boxes moved by a few pixels, plus as many
+random false positives.
+
+Usage:
+    python benchmarks/detection_evaluation.py --images 100000 --boxes 8
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from datasetinsights.stats.detection import evaluate_detections
+from utils import measure, report
+
+
+def random_boxes(rng, images, boxes, labels=10):
+    count = images * boxes
+    return pd.DataFrame(
+        {
+            "capture_id": np.repeat(np.arange(images), boxes).astype(str),
+            "label_id": rng.integers(0, labels, count),
+            "x": rng.uniform(0, 600, count),
+            "y": rng.uniform(0, 440, count),
+            "width": rng.uniform(10, 100, count),
+            "height": rng.uniform(10, 100, count),
+        }
+    )
+
+
+def evaluate(images, boxes, num_workers):
+    rng = np.random.default_rng(0)
+    ground_truth = random_boxes(rng, images, boxes)
+    moved = ground_truth.assign(
+        x=ground_truth["x"] + rng.normal(0, 3, len(ground_truth))
+    )
+    predictions = pd.concat(
+        [moved, random_boxes(rng, images, boxes)], ignore_index=True
+    )
+    predictions["score"] = rng.uniform(0, 1, len(predictions))
+
+    evaluate_detections(ground_truth, predictions, num_workers=num_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=100000)
+    parser.add_argument("--boxes", type=int, default=8)
+    parser.add_argument("--num-workers", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    rows = []
+    for num_workers in args.num_workers:
+        elapsed, peak_rss = measure(
+            evaluate, args.images, args.boxes, num_workers
+        )
+        rows.append((num_workers, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Evaluate {args.images} images x {args.boxes} boxes "
+        f"({2 * args.boxes} predictions per image)",
+        rows,
+        ["workers", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
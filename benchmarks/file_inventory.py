@@ -0,0 +1,68 @@
+"""Compare finding the table files by globbing and with the file inventory.
+
+The inventory is built, or loaded from where a previous process saved it
+and refreshed. The dataset holds the json files next to directories of
+empty images, like the captured images of a simulation.
+
+Usage:
+    python benchmarks/file_inventory.py --image-dirs 100 --images 1000
+"""
+import argparse
+import pathlib
+import tempfile
+
+from datasetinsights.datasets.unity_perception.cache import (
+    DEFAULT_CACHE_DIRNAME,
+)
+from datasetinsights.datasets.unity_perception.inventory import FileInventory
+from datasetinsights.datasets.unity_perception.tables import DATASET_TABLES
+from utils import make_dataset, measure, report
+
+
+def path_glob(data_root, inventory_path):
+    for table in DATASET_TABLES.values():
+        sorted(pathlib.Path(data_root).glob(table.file))
+
+
+def inventory_glob(data_root, inventory_path):
+    inventory = FileInventory(data_root, inventory_path)
+    for table in DATASET_TABLES.values():
+        inventory.glob(table.file[len("**/") :])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image-dirs", type=int, default=100)
+    parser.add_argument("--images", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = make_dataset(tmp, num_files=10, records_per_file=10)
+        for i in range(args.image_dirs):
+            image_dir = data_root / f"RGB{i}"
+            image_dir.mkdir()
+            for j in range(args.images):
+                (image_dir / f"rgb_{j}.png").touch()
+
+        saved = data_root / DEFAULT_CACHE_DIRNAME / "files.json"
+        saved.parent.mkdir()
+        FileInventory(data_root, saved).refresh()
+        rows = []
+        for name, func, inventory_path in [
+            ("pathlib glob", path_glob, None),
+            ("inventory (built)", inventory_glob, f"{tmp}/unsaved/files.json"),
+            ("inventory (saved, refreshed)", inventory_glob, saved),
+        ]:
+            elapsed, peak_rss = measure(func, data_root, inventory_path)
+            rows.append((name, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Find the files of {len(DATASET_TABLES)} tables next to "
+        f"{args.image_dirs} x {args.images} images",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare computing the IoU of every pair of 2D boxes.
+
+The scalar BBox2D.iou double loop is timed on the first rows of the matrix
+and extrapolated to the whole matrix.
+
+Usage:
+    python benchmarks/iou_matrix.py --sizes 1000 10000 --scalar-rows 100
+"""
+import argparse
+
+import numpy as np
+
+from datasetinsights.io.bbox import (
+    BBox2DArray,
+    iou_matrix,
+    iou_matrix_per_label,
+)
+from utils import measure, report
+
+
+def random_boxes(count, seed):
+    rng = np.random.default_rng(seed)
+    return BBox2DArray(
+        label=rng.integers(0, 10, count),
+        x=rng.uniform(0, 1000, count),
+        y=rng.uniform(0, 1000, count),
+        w=rng.uniform(1, 100, count),
+        h=rng.uniform(1, 100, count),
+    )
+
+
+def scalar(size, rows):
+    boxes = random_boxes(size, 0)[:rows].to_bboxes()
+    other = random_boxes(size, 1).to_bboxes()
+    [[a.iou(b) for b in other] for a in boxes]
+
+
+def vectorized(size, rows):
+    iou_matrix(random_boxes(size, 0), random_boxes(size, 1), dtype=np.float32)
+
+
+def per_label(size, rows):
+    iou_matrix_per_label(random_boxes(size, 0), random_boxes(size, 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--scalar-rows", type=int, default=100)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        scalar_rows = min(size, args.scalar_rows)
+        elapsed, peak_rss = measure(scalar, size, scalar_rows)
+        rows.append(
+            (
+                f"{size}x{size}",
+                f"BBox2D.iou ({scalar_rows} rows, extrapolated)",
+                f"{elapsed * size / scalar_rows:.3f}",
+                f"{peak_rss:.1f}",
+            )
+        )
+        for method, func in [
+            ("iou_matrix (float32)", vectorized),
+            ("iou_matrix_per_label (10 labels)", per_label),
+        ]:
+            elapsed, peak_rss = measure(func, size, size)
+            rows.append(
+                (f"{size}x{size}", method, f"{elapsed:.3f}", f"{peak_rss:.1f}",)
+            )
+
+    report(
+        "IoU of every pair of boxes",
+        rows,
+        ["boxes", "method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
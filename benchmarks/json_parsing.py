@@ -0,0 +1,56 @@
+"""Measure json parse throughput of the installed json backends.
+
+Usage:
+    python benchmarks/json_parsing.py --num-files 10 --captures 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from datasetinsights.datasets.unity_perception import json_backend
+from datasetinsights.datasets.unity_perception.tables import glob
+from utils import make_dataset, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        files = list(glob(data_root, "**/*.json"))
+        size = sum(os.path.getsize(f) for f in files) / 2 ** 20
+
+        rows = []
+        baseline = None
+        for backend in reversed(json_backend.available_backends()):
+            json_backend.set_json_backend(backend)
+            elapsed = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for json_file in files:
+                    json_backend.load(json_file)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            baseline = baseline or elapsed
+            rows.append(
+                (
+                    backend,
+                    f"{elapsed:.3f}",
+                    f"{size / elapsed:.1f}",
+                    f"{baseline / elapsed:.2f}x",
+                )
+            )
+
+    report(
+        f"Json parsing: {len(files)} files, {size:.1f} MiB",
+        rows,
+        ["backend", "seconds", "MiB/s", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
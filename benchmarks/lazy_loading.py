@@ -0,0 +1,46 @@
+"""Compare eager and lazy loading of captures and annotations.
+
+Usage:
+    python benchmarks/lazy_loading.py --num-files 4 --captures 5000
+"""
+import argparse
+import tempfile
+
+from datasetinsights.datasets.unity_perception import Captures
+from utils import make_dataset, measure, report
+
+BOUNDING_BOX_2D_DEFINITION_ID = 1
+
+
+def load(data_root, lazy):
+    Captures(data_root, lazy=lazy)
+
+
+def load_and_filter(data_root, lazy):
+    Captures(data_root, lazy=lazy).filter(BOUNDING_BOX_2D_DEFINITION_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=4)
+    parser.add_argument("--captures", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        rows = []
+        for name, func in [("load", load), ("load + filter", load_and_filter)]:
+            for lazy in (False, True):
+                elapsed, peak_rss = measure(func, data_root, lazy)
+                mode = "lazy" if lazy else "eager"
+                rows.append((name, mode, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Captures loading: {args.num_files} files x {args.captures} captures",
+        rows,
+        ["operation", "mode", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare filtering metrics by scanning files and by reading partitions.
+
+Usage:
+    python benchmarks/metrics_partitions.py --num-files 16 --captures 2000
+"""
+import argparse
+import tempfile
+import time
+
+from datasetinsights.datasets.unity_perception import Metrics
+from utils import make_dataset, report
+
+RENDERED_OBJECT_INFO_DEFINITION_ID = 1
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=16)
+    parser.add_argument("--captures", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        cache_dir = f"{tmp}/cache"
+
+        def filter_metrics():
+            metrics = Metrics(data_root, use_cache=True, cache_dir=cache_dir)
+            metrics.filter_metrics(RENDERED_OBJECT_INFO_DEFINITION_ID)
+
+        scan = timed(
+            lambda: Metrics(data_root).filter_metrics(
+                RENDERED_OBJECT_INFO_DEFINITION_ID
+            )
+        )
+        ingest = timed(
+            lambda: Metrics(
+                data_root, use_cache=True, cache_dir=cache_dir
+            ).ingest()
+        )
+        partition = timed(filter_metrics)
+
+    report(
+        f"Metrics filter: {args.num_files} files x {args.captures} captures",
+        [
+            ("scan metrics files", f"{scan:.3f}"),
+            ("ingest (once)", f"{ingest:.3f}"),
+            ("read ingested partition", f"{partition:.3f}"),
+        ],
+        ["operation", "seconds"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare suppressing and matching the boxes of many images.
+
+The loops visit the images one by one and the boxes of an image one by
+one, computing the IoU of a box with the boxes of its image with numpy.
+The batched functions process the boxes of all images together.
+
+Usage:
+    python benchmarks/nms_matching.py --images 1000 --boxes 200
+"""
+import argparse
+
+import numpy as np
+
+from datasetinsights.io.bbox import (
+    BBox2DArray,
+    greedy_match,
+    iou_matrix,
+    non_max_suppression,
+)
+from utils import measure, report
+
+
+def random_boxes(images, boxes, seed):
+    rng = np.random.default_rng(seed)
+    count = images * boxes
+    groups = np.repeat(np.arange(images), boxes)
+    return (
+        BBox2DArray(
+            label=rng.integers(0, 10, count),
+            x=rng.uniform(0, 1000, count),
+            y=rng.uniform(0, 1000, count),
+            w=rng.uniform(10, 200, count),
+            h=rng.uniform(10, 200, count),
+            score=rng.uniform(0, 1, count),
+        ),
+        groups,
+    )
+
+
+def nms_loop(images, boxes):
+    predictions, groups = random_boxes(images, boxes, 0)
+    for image in range(images):
+        for label in np.unique(predictions.label):
+            positions = np.flatnonzero(
+                (groups == image) & (predictions.label == label)
+            )
+            positions = positions[np.argsort(-predictions.score[positions])]
+            iou = iou_matrix(predictions[positions], predictions[positions])
+            suppressed = np.zeros(len(positions), dtype=bool)
+            for i in range(len(positions)):
+                if not suppressed[i]:
+                    suppressed[i + 1 :] |= iou[i, i + 1 :] > 0.5
+
+
+def nms_batched(images, boxes):
+    predictions, groups = random_boxes(images, boxes, 0)
+    non_max_suppression(predictions, 0.5, groups)
+
+
+def match_loop(images, boxes):
+    predictions, groups = random_boxes(images, boxes, 0)
+    ground_truth, gt_groups = random_boxes(images, boxes // 2, 1)
+    for image in range(images):
+        for label in np.unique(predictions.label):
+            pred = np.flatnonzero(
+                (groups == image) & (predictions.label == label)
+            )
+            pred = pred[np.argsort(-predictions.score[pred])]
+            gt = np.flatnonzero(
+                (gt_groups == image) & (ground_truth.label == label)
+            )
+            iou = iou_matrix(predictions[pred], ground_truth[gt])
+            taken = np.zeros(len(gt), dtype=bool)
+            for i in range(len(pred)):
+                candidates = np.where(taken, -1.0, iou[i])
+                if len(gt) and candidates.max() >= 0.5:
+                    taken[candidates.argmax()] = True
+
+
+def match_batched(images, boxes):
+    predictions, groups = random_boxes(images, boxes, 0)
+    ground_truth, gt_groups = random_boxes(images, boxes // 2, 1)
+    greedy_match(predictions, ground_truth, 0.5, groups, gt_groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--boxes", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    for method, func in [
+        ("NMS, loop", nms_loop),
+        ("non_max_suppression", nms_batched),
+        ("matching, loop", match_loop),
+        ("greedy_match", match_batched),
+    ]:
+        elapsed, peak_rss = measure(func, args.images, args.boxes)
+        rows.append((method, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Suppress and match {args.images} images x {args.boxes} predictions "
+        f"({args.boxes // 2} ground truth boxes, 10 labels)",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare flattening annotation values into one row per object.
+
+Usage:
+    python benchmarks/object_table.py --num-files 10 --captures 2000
+"""
+import argparse
+import tempfile
+
+import pandas as pd
+
+from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.datasets.unity_perception.objects import annotation_objects
+from utils import make_dataset, measure, report
+
+BOUNDING_BOX_2D = 4
+BOUNDING_BOX_3D = 2
+
+
+def python_loop(filtered):
+    rows = []
+    for capture_id, annotation_id, values in zip(
+        filtered["id"], filtered["annotation.id"], filtered["annotation.values"]
+    ):
+        for box in values:
+            row = {"capture_id": capture_id, "annotation_id": annotation_id}
+            row.update(box)
+            rows.append(row)
+    pd.json_normalize(rows)
+
+
+def vectorized(filtered):
+    annotation_objects(filtered)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        captures = Captures(data_root)
+        rows = []
+        for def_id, name in [
+            (BOUNDING_BOX_2D, "2D boxes"),
+            (BOUNDING_BOX_3D, "3D boxes"),
+        ]:
+            filtered = captures.filter(def_id)
+            objects = sum(map(len, filtered["annotation.values"]))
+            for method, func in [
+                ("loop + json_normalize", python_loop),
+                ("annotation_objects", vectorized),
+            ]:
+                elapsed, peak_rss = measure(func, filtered)
+                rows.append(
+                    (name, objects, method, f"{elapsed:.3f}", f"{peak_rss:.1f}")
+                )
+
+    report(
+        f"Objects of {args.num_files} files x {args.captures} captures",
+        rows,
+        ["values", "objects", "method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure how table loading scales with the number of worker processes.
+
+Usage:
+    python benchmarks/parallel_loading.py --num-files 32 --max-workers 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from datasetinsights.datasets.unity_perception import Captures, Metrics
+from utils import make_dataset, report
+
+RENDERED_OBJECT_INFO_DEFINITION_ID = 1
+
+
+def load_captures(data_root, num_workers):
+    Captures(data_root, num_workers=num_workers)
+
+
+def load_metrics(data_root, num_workers, scheduler=None):
+    metrics = Metrics(data_root, num_workers=num_workers, scheduler=scheduler)
+    metrics.filter_metrics(RENDERED_OBJECT_INFO_DEFINITION_ID)
+
+
+def load_metrics_threads(data_root, num_workers):
+    load_metrics(data_root, num_workers, scheduler="threads")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=32)
+    parser.add_argument("--captures", type=int, default=500)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        for name, func in [
+            ("Captures", load_captures),
+            ("Metrics", load_metrics),
+            ("Metrics, threaded scheduler", load_metrics_threads),
+        ]:
+            rows = []
+            baseline = None
+            for num_workers in workers:
+                start = time.perf_counter()
+                func(data_root, num_workers)
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                speedup = baseline / elapsed
+                rows.append((num_workers, f"{elapsed:.3f}", f"{speedup:.2f}x"))
+
+            report(
+                f"{name}: {args.num_files} files x {args.captures} captures",
+                rows,
+                ["workers", "seconds", "speedup"],
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare sampling captures after a full load and with Captures.sample.
+
+Usage:
+    python benchmarks/sampling.py --num-files 10 --captures 2000 --size 1000
+"""
+import argparse
+import tempfile
+
+from datasetinsights.datasets.unity_perception import Captures
+from utils import make_dataset, measure, report
+
+
+def full_load(data_root, size, cache_dir):
+    Captures(data_root).captures.sample(size, random_state=0)
+
+
+def sample(data_root, size, cache_dir):
+    Captures.sample(
+        size,
+        data_root,
+        seed=0,
+        use_cache=cache_dir is not None,
+        cache_dir=cache_dir,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        cache_dir = f"{tmp}/cache"
+        rows = []
+        for name, func, cache in [
+            ("full load + sample", full_load, None),
+            ("Captures.sample", sample, None),
+            ("Captures.sample (inventory cached)", sample, cache_dir),
+        ]:
+            if cache is not None:
+                # Build the cached inventory before measuring.
+                sample(data_root, args.size, cache)
+            elapsed, peak_rss = measure(func, data_root, args.size, cache)
+            rows.append((name, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Sample {args.size} of {args.num_files} files x {args.captures} "
+        "captures",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
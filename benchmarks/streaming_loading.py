@@ -0,0 +1,50 @@
+"""Compare peak memory of eager and streaming parsing of large json files.
+
+Usage:
+    python benchmarks/streaming_loading.py --num-files 2 --captures 20000
+"""
+import argparse
+import tempfile
+
+from datasetinsights.datasets.unity_perception import Captures, Metrics
+from utils import make_dataset, measure, report
+
+RENDERED_OBJECT_INFO_DEFINITION_ID = 1
+
+
+def load_captures(data_root, streaming):
+    Captures(data_root, streaming=streaming)
+
+
+def load_metrics(data_root, streaming):
+    metrics = Metrics(data_root, num_workers=1, streaming=streaming)
+    metrics.filter_metrics(RENDERED_OBJECT_INFO_DEFINITION_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=2)
+    parser.add_argument("--captures", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = str(make_dataset(tmp, args.num_files, args.captures))
+        rows = []
+        for name, func in [
+            ("Captures", load_captures),
+            ("Metrics", load_metrics),
+        ]:
+            for streaming in (False, True):
+                elapsed, peak_rss = measure(func, data_root, streaming)
+                mode = "streaming" if streaming else "eager"
+                rows.append((name, mode, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Streaming parsing: {args.num_files} files x {args.captures} captures",
+        rows,
+        ["table", "mode", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks scale the mock ``simrun`` dataset from the unit tests up to
+realistic sizes by replicating its capture and metric records with fresh ids.
+"""
+import copy
+import json
+import multiprocessing
+import pathlib
+import resource
+import shutil
+import time
+import uuid
+
+MOCK_DATA_ROOT = (
+    pathlib.Path(__file__).parent.parent / "tests" / "mock_data" / "simrun"
+)
+MOCK_DATASET = MOCK_DATA_ROOT / "Dataset"
+REFERENCE_FILES = (
+    "annotation_definitions.json",
+    "egos.json",
+    "metric_definitions.json",
+    "sensors.json",
+)
+
+
+def _template_records(pattern, table_name):
+    records = []
+    for json_file in sorted(MOCK_DATASET.glob(pattern)):
+        with open(json_file, "r") as f:
+            records.extend(json.load(f)[table_name])
+
+    return records
+
+
+def make_dataset(
+    data_root, num_files=10, records_per_file=150, metrics=True, seed=0
+):
+    """Write a synthetic Perception dataset replicated from the mock data.
+
+    Args:
+        data_root (str): directory where the dataset will be written
+        num_files (int): number of captures (and metrics) files
+        records_per_file (int): number of capture records per file
+        metrics (bool): whether to also write metrics files
+        seed (int): seed used to generate capture and sequence ids
+
+    Returns:
+        pathlib.Path: the root directory of the generated dataset.
+    """
+    data_root = pathlib.Path(data_root)
+    dataset = data_root / "Dataset"
+    dataset.mkdir(parents=True, exist_ok=True)
+    for name in REFERENCE_FILES:
+        shutil.copy(MOCK_DATASET / name, dataset / name)
+
+    capture_templates = _template_records("captures_*.json", "captures")
+    metric_templates = _template_records("metrics_*.json", "metrics")
+    ids = _id_generator(seed)
+    step = 0
+    for i in range(num_files):
+        captures = []
+        metric_records = []
+        for _ in range(records_per_file):
+            template = capture_templates[step % len(capture_templates)]
+            capture = copy.deepcopy(template)
+            capture["id"] = next(ids)
+            capture["sequence_id"] = f"sequence-{step // 100}"
+            capture["step"] = step % 100
+            for annotation in capture["annotations"]:
+                annotation["id"] = next(ids)
+            captures.append(capture)
+
+            for template in metric_templates:
+                metric = copy.deepcopy(template)
+                metric["capture_id"] = capture["id"]
+                metric["sequence_id"] = capture["sequence_id"]
+                metric["step"] = capture["step"]
+                metric_records.append(metric)
+            step += 1
+
+        _write(dataset / f"captures_{i:03d}.json", "captures", captures)
+        if metrics:
+            _write(dataset / f"metrics_{i:03d}.json", "metrics", metric_records)
+
+    return data_root
+
+
+def _id_generator(seed):
+    i = 0
+    while True:
+        yield str(uuid.UUID(int=(seed << 64) + i))
+        i += 1
+
+
+def _write(path, table_name, records):
+    with open(path, "w") as f:
+        json.dump({"version": "0.0.1", table_name: records}, f)
+
+
+def _measure_child(queue, func, args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, peak_rss))
+
+
+def measure(func, *args):
+    """Run ``func(*args)`` in a fresh process and measure it.
+
+    Running each measurement in its own process keeps the peak RSS of one
+    benchmark from leaking into the next one.
+
+    Returns:
+        tuple: (elapsed seconds, peak RSS in MiB)
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure_child, args=(queue, func, args))
+    process.start()
+    elapsed, peak_rss = queue.get()
+    process.join()
+
+    return elapsed, peak_rss / 1024
+
+
+def report(title, rows, columns):
+    """Print benchmark results as a plain text table."""
+    print(title)
+    widths = [
+        max(len(str(c)), *(len(str(r[i])) for r in rows))
+        for i, c in enumerate(columns)
+    ]
+    for row in [columns, *rows]:
+        line = "  ".join(str(v).ljust(w) for v, w in zip(row, widths))
+        print(line.rstrip())
+    print()
@@ -0,0 +1,69 @@
+"""Compare finding files of the wrong schema version by parsing and pre-scan.
+
+The last captures file of the dataset has the wrong version.
+
+Usage:
+    python benchmarks/version_check.py --num-files 10 --captures 2000
+"""
+import argparse
+import json
+import tempfile
+
+from datasetinsights.datasets.unity_perception.tables import (
+    SCHEMA_VERSION,
+    glob,
+    load_json,
+    verify_versions,
+)
+from datasetinsights.datasets.unity_perception.validation import VersionError
+from utils import make_dataset, measure, report
+
+
+def parse(files):
+    try:
+        for f in files:
+            load_json(f, SCHEMA_VERSION)
+    except VersionError:
+        pass
+
+
+def pre_scan(files):
+    try:
+        verify_versions(files, SCHEMA_VERSION)
+    except VersionError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=10)
+    parser.add_argument("--captures", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = make_dataset(tmp, args.num_files, args.captures)
+        files = [str(f) for f in glob(data_root, "**/captures_*.json")]
+        with open(files[-1], "r") as f:
+            data = json.load(f)
+        data["version"] = "0.0.0"
+        with open(files[-1], "w") as f:
+            json.dump(data, f)
+
+        rows = []
+        for name, func in [
+            ("parse files", parse),
+            ("verify_versions", pre_scan),
+        ]:
+            elapsed, peak_rss = measure(func, files)
+            rows.append((name, f"{elapsed:.3f}", f"{peak_rss:.1f}"))
+
+    report(
+        f"Find the wrong version in {args.num_files} files x {args.captures} "
+        "captures",
+        rows,
+        ["method", "seconds", "peak RSS (MiB)"],
+    )
+
+
+if __name__ == "__main__":
+    main()
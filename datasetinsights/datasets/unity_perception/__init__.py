@@ -1,12 +1,16 @@
-from .captures import Captures
+from .captures import Captures, DaskCaptures
 from .metrics import Metrics
 from .references import AnnotationDefinitions, Egos, MetricDefinitions, Sensors
+from .session import DatasetSession, get_session
 
 __all__ = [
     "AnnotationDefinitions",
     "Captures",
+    "DaskCaptures",
+    "DatasetSession",
     "Egos",
     "Metrics",
     "MetricDefinitions",
     "Sensors",
+    "get_session",
 ]
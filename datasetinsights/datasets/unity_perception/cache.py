@@ -0,0 +1,358 @@
+""" Persistent columnar cache of Synthetic dataset tables
+"""
+import gc
+import json
+import logging
+import os
+import pathlib
+import re
+
+import numpy as np
+import pandas as pd
+
+from . import json_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIRNAME = ".datasetinsights_cache"
+
+
+def fingerprint(files, version):
+    """Fingerprint a collection of source files.
+
+    Args:
+        files (list): paths of the json files a table is loaded from
+        version (str): requested schema version of the table
+
+    Returns:
+        dict: the schema version and the (path, size, mtime) of every file.
+    """
+    return stats_fingerprint(file_stats(files), version)
+
+
+def stats_fingerprint(stats, version):
+    """Fingerprint source files from their recorded size and mtime.
+
+    Args:
+        stats (iterable): the (path, size, mtime) of every file, as
+            returned by :func:`file_stats`
+        version (str): requested schema version of the table
+
+    Returns:
+        dict: the fingerprint, see :func:`fingerprint`.
+    """
+    entries = [
+        [str(path), int(size), int(mtime)] for path, size, mtime in stats
+    ]
+
+    return {"version": version, "files": sorted(entries)}
+
+
+def file_stats(files):
+    """Get the size and modification time of files.
+
+    Args:
+        files (list): paths of the files
+
+    Returns:
+        list: the [path, size, mtime] of every file, in the order of files.
+    """
+    entries = []
+    for path in files:
+        stat = os.stat(path)
+        entries.append([str(path), stat.st_size, stat.st_mtime_ns])
+
+    return entries
+
+
+def open_cache(data_root, use_cache=False, cache_dir=None):
+    """Open the table cache of a dataset.
+
+    Args:
+        data_root (str): the root directory of the dataset
+        use_cache (bool): whether tables should be cached
+        cache_dir (str): directory of the table cache. Defaults to a
+            ``.datasetinsights_cache`` directory under data_root.
+
+    Returns:
+        TableCache: the table cache, or None if use_cache is False.
+    """
+    if not use_cache:
+        return None
+    if cache_dir is None:
+        cache_dir = pathlib.Path(data_root) / DEFAULT_CACHE_DIRNAME
+
+    return TableCache(cache_dir)
+
+
+class TableCache:
+    """Cache normalized tables as Arrow files on disk.
+
+    Tables are written uncompressed in the Arrow IPC (feather) format so
+    that they can be memory-mapped when loaded. Every table is stored with
+    the fingerprint of the json files it was loaded from and is only
+    returned if the fingerprint still matches.
+
+    Object columns that do not hold plain strings (e.g. sensor, ego or
+    annotation values) have no exact Arrow representation: their values are
+    heterogeneous dicts and lists. They are stored as Arrow string columns
+    of json documents, and all values of a column are decoded with a single
+    call of the json backend when the table is loaded. Columns of deferred
+    values (see ``Captures(lazy=True)``) are stored as Arrow structs of
+    their file, offset and length. Missing values are stored as nulls. Only
+    Arrow and json data is read from the cache, so a cache directory that
+    holds untrusted files can't run code.
+
+    Requires `pyarrow <https://arrow.apache.org/docs/python/>`_.
+
+    Attributes:
+        cache_dir (pathlib.Path): directory of the cached tables
+
+    Examples:
+        >>> cache = TableCache("/data/.datasetinsights_cache")
+        >>> key = fingerprint(files, version="0.0.1")
+        >>> cache.save("sensors", key, sensors)
+        >>> cache.load("sensors", key)  # None if any file has changed
+    """
+
+    TABLE_SUFFIX = ".arrow"
+    # Not ".json", which table file patterns like "**/sensors.json" match
+    # if the cache directory is under the data root.
+    MANIFEST_SUFFIX = ".manifest"
+
+    def __init__(self, cache_dir):
+        """ Initialize TableCache
+
+        Args:
+            cache_dir (str): directory of the cached tables
+        """
+        _import_pyarrow()
+        self.cache_dir = pathlib.Path(cache_dir)
+
+    def _path(self, name, suffix):
+        filename = re.sub(r"[^\w.-]", "_", str(name)) + suffix
+
+        return self.cache_dir / filename
+
+    def load(self, name, key):
+        """Load a cached table.
+
+        Args:
+            name (str): name of the cached table
+            key (dict): fingerprint of the source files of this table
+
+        Returns:
+            pd.DataFrame: the cached table, or None if the table is not
+            cached or the source files have changed.
+        """
+        try:
+            with open(self._path(name, self.MANIFEST_SUFFIX), "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("key") != key:
+            logger.debug(f"Cached table {name} is out of date.")
+            return None
+
+        _, feather = _import_pyarrow()
+        path = self._path(name, self.TABLE_SUFFIX)
+        logger.debug(f"Loading cached table {name} from {path}")
+        try:
+            table = feather.read_table(str(path), memory_map=True)
+        except OSError:
+            return None
+        json_columns = manifest["json_columns"]
+        deferred_columns = manifest["deferred_columns"]
+        encoded = {c: table.column(c) for c in json_columns + deferred_columns}
+        # Arrow buffers are released as their columns are converted, so the
+        # table is not held twice. Columns are still copied into pandas.
+        table = table.drop(list(encoded)).to_pandas(
+            self_destruct=True, split_blocks=True
+        )
+        for column in json_columns:
+            table[column] = _decode_json(encoded[column])
+        for column in deferred_columns:
+            table[column] = _decode_deferred(encoded[column])
+
+        return table[manifest["columns"]]
+
+    def save(self, name, key, table):
+        """Write a table to the cache.
+
+        Args:
+            name (str): name of the cached table
+            key (dict): fingerprint of the source files of this table
+            table (pd.DataFrame): the table to be cached
+        """
+        pa, feather = _import_pyarrow()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self._path(name, self.MANIFEST_SUFFIX)
+        if manifest_path.exists():
+            manifest_path.unlink()
+
+        nested = [c for c in table.columns if _is_nested(table[c])]
+        deferred_columns = [c for c in nested if _is_deferred(table[c])]
+        json_columns = [c for c in nested if c not in deferred_columns]
+        try:
+            encoded = table.drop(columns=deferred_columns).assign(
+                **{c: _encode_json(table[c]) for c in json_columns}
+            )
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Table {name} can't be cached as json: {e}")
+            return
+        path = self._path(name, self.TABLE_SUFFIX)
+        logger.debug(f"Writing cached table {name} to {path}")
+        arrow_table = pa.Table.from_pandas(encoded, preserve_index=True)
+        for column in deferred_columns:
+            arrow_table = arrow_table.append_column(
+                column, _encode_deferred(table[column], pa)
+            )
+        feather.write_feather(
+            arrow_table, str(path), compression="uncompressed"
+        )
+
+        # The manifest is written last so that an interrupted write never
+        # leaves a manifest pointing at an incomplete table file.
+        manifest = {
+            "key": key,
+            "columns": list(table.columns),
+            "json_columns": json_columns,
+            "deferred_columns": deferred_columns,
+        }
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+
+def load_cached(cache, name, files, version, load):
+    """Load a table from the cache, or load and cache it.
+
+    Args:
+        cache (TableCache): the table cache. If None, the table is loaded
+            without caching.
+        name (str): name of the cached table
+        files (list): paths of the json files the table is loaded from
+        version (str): requested schema version of the table
+        load (callable): function that loads the table from the json files
+
+    Returns:
+        pd.DataFrame: the loaded table.
+    """
+    if cache is None:
+        return load()
+
+    key = fingerprint(files, version)
+    table = cache.load(name, key)
+    if table is None:
+        table = load()
+        cache.save(name, key, table)
+
+    return table
+
+
+def _is_nested(column):
+    """Check whether an object column can't be stored as arrow strings."""
+    if column.dtype != object:
+        return False
+
+    return not all(isinstance(v, str) or v is None for v in column)
+
+
+def _is_deferred(column):
+    """Check whether the values of a nested column are deferred values."""
+    # Imported here because tables imports this module through inventory.
+    from .tables import DeferredValue
+
+    values = column.dropna()
+
+    return len(values) > 0 and all(isinstance(v, DeferredValue) for v in values)
+
+
+def _encode_deferred(column, pa):
+    """Encode deferred values as an Arrow struct array."""
+    from .tables import DeferredValue
+
+    missing = DeferredValue(None, 0, 0)
+    present = column.notna().to_numpy()
+    values = [v if p else missing for v, p in zip(column, present)]
+    files, offsets, lengths = zip(*values) if values else ((), (), ())
+
+    return pa.StructArray.from_arrays(
+        [
+            pa.array(files, pa.string()),
+            pa.array(offsets, pa.int64()),
+            pa.array(lengths, pa.int64()),
+        ],
+        names=list(DeferredValue._fields),
+        mask=pa.array(~present),
+    )
+
+
+def _decode_deferred(structs):
+    """Decode an Arrow struct column of deferred values."""
+    from .tables import DeferredValue
+
+    structs = structs.combine_chunks()
+    present = structs.is_valid().to_numpy(zero_copy_only=False)
+    files, offsets, lengths = (
+        structs.field(name).to_numpy(zero_copy_only=False)[present].tolist()
+        for name in DeferredValue._fields
+    )
+    values = np.full(len(structs), np.nan, dtype=object)
+    values[present] = pd.Series(
+        list(map(DeferredValue, files, offsets, lengths)), dtype=object
+    ).to_numpy()
+
+    return values
+
+
+def _encode_json(column):
+    """Encode the values of an object column as json documents.
+
+    Missing values (NaN) become None, which is stored as an Arrow null.
+    """
+    return pd.Series(
+        [
+            None if isinstance(v, float) and v != v else json.dumps(v)
+            for v in column
+        ],
+        index=column.index,
+        dtype=object,
+    )
+
+
+def _decode_json(documents):
+    """Decode an Arrow string column of json documents.
+
+    The documents are joined into one json array, which is parsed with the
+    garbage collector paused. Parsing creates millions of container
+    objects, which would otherwise trigger repeated garbage collection
+    passes that find nothing to free.
+    """
+    documents = documents.to_numpy(zero_copy_only=False)
+    present = pd.notna(documents)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        decoded = json_backend.loads(
+            "[" + ",".join(documents[present].tolist()) + "]"
+        )
+    finally:
+        if enabled:
+            gc.enable()
+    values = np.full(len(documents), np.nan, dtype=object)
+    values[present] = pd.Series(decoded, dtype=object).to_numpy()
+
+    return values
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required to cache tables. "
+            "Install it with `pip install datasetinsights[cache]`."
+        )
+
+    return pyarrow, pyarrow.feather
@@ -1,11 +1,33 @@
 """ Load Synthetic dataset captures and annotations tables
 """
+import functools
+from collections import namedtuple
+
+import dask
+import dask.dataframe as dd
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 from datasetinsights.constants import DEFAULT_DATA_ROOT
 
+from .cache import file_stats, fingerprint, open_cache, stats_fingerprint
+from .compact import compact_captures
 from .exceptions import DefinitionIDError
-from .tables import DATASET_TABLES, SCHEMA_VERSION, glob, load_table
+from .objects import annotation_objects
+from .sampling import sample_records
+from .tables import (
+    DATASET_TABLES,
+    SCHEMA_VERSION,
+    ColumnBuilder,
+    glob,
+    iter_records,
+    load_deferred,
+    load_json,
+    map_files,
+    prefetch,
+    verify_versions,
+)
 
 
 class Captures:
@@ -28,118 +50,438 @@ class Captures:
         >>> data = captures.filter(def_id="6716c783-1c0e-44ae-b1b5-7f068454b66e") # noqa E501 table command not be broken down into multiple lines
         #return the captures and annotations filtered by the annotation
         definition id
+        >>> captures = Captures(
+        ...     data_root="/data", sequence_ids=["2954c..."], steps=(0, 100)
+        ... )
+        #only load the first 100 steps of a sequence. Records that don't
+        match are skipped while the files are parsed.
+
+    With ``lazy=True``, annotation values are not decoded when the
+    captures are loaded. The values column of the annotations table holds
+    a :class:`~datasetinsights.datasets.unity_perception.tables.DeferredValue`
+    per annotation instead, which records where its values are stored in
+    the captures file. :meth:`filter` decodes the values of the returned
+    rows only. Other rows can be decoded with
+    :func:`~datasetinsights.datasets.unity_perception.tables.load_deferred`.
 
     Attributes:
         captures (pd.DataFrame): a collection of captures without annotations
         annotations (pd.DataFrame): a collection of annotations
+
+    Filtered results are memoized per annotation definition id. They are
+    rebuilt if captures or annotations are replaced, but not if either
+    table is modified in place.
     """
 
     TABLE_NAME = "captures"
+    ANNOTATIONS_TABLE_NAME = "annotations"
+    FILES_TABLE_NAME = "captures.files"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
-
-    def __init__(self, data_root=DEFAULT_DATA_ROOT, version=SCHEMA_VERSION):
+    CAPTURES_COLUMNS = [
+        "id",
+        "sequence_id",
+        "step",
+        "timestamp",
+        "sensor",
+        "ego",
+        "filename",
+        "format",
+    ]
+    ANNOTATIONS_COLUMNS = [
+        "id",
+        "annotation_definition",
+        "filename",
+        "values",
+        "capture.id",
+    ]
+
+    def __init__(
+        self,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+        streaming=False,
+        lazy=False,
+        compact=False,
+        sequence_ids=None,
+        steps=None,
+        sensor_ids=None,
+        def_ids=None,
+    ):
         """ Initialize Captures
 
         Args:
             data_root (str): the root directory of the dataset
             version (str): desired schema version
+            use_cache (bool): whether to cache the loaded tables on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                captures files
+            streaming (bool): whether to stream capture records from each
+                file instead of parsing the whole file at once. Peak memory
+                is then bounded by the size of the loaded tables.
+            lazy (bool): whether to defer decoding annotation values until
+                they are requested. Lazy loading always streams the files.
+            compact (bool): whether to convert the loaded tables to compact
+                dtypes, see :func:`compact_captures`
+            sequence_ids (iterable): only load the captures of these
+                sequences
+            steps (tuple): only load the captures with a step in the range
+                (start, stop). The stop is excluded and either bound can be
+                None.
+            sensor_ids (iterable): only load the captures of these sensors
+            def_ids (iterable): only load the annotations of these
+                annotation definitions. Captures are loaded even if they
+                have no such annotation.
         """
-        self.captures = self._load_captures(data_root, version)
-        self.annotations = self._load_annotations(data_root, version)
+        self._data_root = data_root
+        self._version = version
+        self._cache = open_cache(data_root, use_cache, cache_dir)
+        self._options = {
+            "num_workers": num_workers,
+            "streaming": streaming,
+            "lazy": lazy,
+            "predicate": _CapturePredicate.create(
+                sequence_ids, steps, sensor_ids, def_ids
+            ),
+        }
+        self._compact = compact
+        self.captures, self.annotations, self._files = self._load_cached(
+            self._cache, data_root, version, **self._options
+        )
+        if compact:
+            self.captures, self.annotations = compact_captures(
+                self.captures, self.annotations
+            )
+        self._partitions = None
 
-    def _load_captures(self, data_root, version):
-        """Load captures except annotations.
-        :ref:`captures`
+    def _table_names(self, lazy=False):
+        """Names of the cached captures, annotations and files tables."""
+        # Lazy annotations hold file offsets instead of decoded values.
+        annotations_name = self.ANNOTATIONS_TABLE_NAME
+        if lazy:
+            annotations_name += ".lazy"
+
+        return self.TABLE_NAME, annotations_name, self.FILES_TABLE_NAME
+
+    def _load_cached(self, cache, data_root, version, **kwargs):
+        """Load captures and annotations through the table cache.
 
         Args:
+            cache (TableCache): the table cache. If None, the tables are
+                loaded without caching.
             data_root (str): the root directory of the dataset
             version (str): desired schema version
+            **kwargs: loading options passed to :meth:`_load_files`
 
         Returns:
-            A pandas dataframe with combined capture records.
-            Columns: 'id' (UUID of the capture), 'sequence_id',
-            'step' (index of captures), 'timestamp' (Simulation timestamp in
-            milliseconds since the sequence started.), 'sensor'
-            (sensor attributes), 'ego' (ego pose of the simulation),
-            'filename' (single filename that stores captured data)
+            A tuple of pandas dataframes (captures, annotations, files).
+        """
+        files = list(glob(data_root, self.FILE_PATTERN))
+        if cache is None:
+            return self._load_files(files, version, **kwargs)
+
+        names = self._table_names(kwargs.get("lazy"))
+        predicate = kwargs.get("predicate")
+        key = _with_predicate(fingerprint(files, version), predicate)
+        tables = [cache.load(n, key) for n in names]
+        if any(table is None for table in tables):
+            tables = self._load_files(files, version, **kwargs)
+            key = _files_key(tables[2], version, predicate)
+            for name, table in zip(names, tables):
+                cache.save(name, key, table)
+
+        return tuple(tables)
+
+    def _load_files(
+        self,
+        files,
+        version,
+        num_workers=1,
+        streaming=False,
+        lazy=False,
+        predicate=None,
+    ):
+        """Load the captures and annotations of captures files.
+
+        Each captures file is parsed once and both tables are normalized from
+        the same parsed document. The captures table has one row per capture
+        record, without its annotations. Columns: "id" (UUID of the
+        capture), "sequence_id", "step" (index of captures), "timestamp"
+        (simulation timestamp in milliseconds since the sequence started),
+        "sensor" (sensor attributes), "ego" (ego pose of the simulation),
+        "filename" (single filename that stores captured data), "format".
+        :ref:`captures`
 
-        Example Captures DataFrame:
-         id(str)      sequence_id(str)  step(int)    timestamp(float) \
-         cdc8bc5c...  2954c...          300           4.979996
+        The annotations table has one row per annotation. Columns: "id"
+        (annotation id), "annotation_definition" (annotation definition
+        id), "filename", "values" (list of objects that store annotation
+        data, e.g. 2d bounding boxes), "capture.id".
+        :ref:`capture-annotation`
 
-        sensor (dict) \
-        {'sensor_id': 'da873b...', 'ego_id': '44ca9...', 'modality': 'camera',
-        'translation': [0.0, 0.0, 0.0], 'rotation': [0.0, 0.0, 0.0, 1.0],
-        'scale': 0.344577253}
+        Args:
+            files (list): paths of the captures files
+            version (str): desired schema version
+            num_workers (int): number of worker processes used to parse
+                captures files
+            streaming (bool): whether to stream capture records from each
+                file instead of parsing the whole file at once
+            lazy (bool): whether to defer decoding annotation values
+            predicate (_CapturePredicate): records that don't match are
+                skipped while the files are parsed
 
+        Returns:
+            A tuple of pandas dataframes (captures, annotations, files). The
+            files table has the path, size and mtime_ns of each file when it
+            was loaded, and the number of captures and annotations rows
+            loaded from it.
+        """
+        if lazy:
+            read_captures = functools.partial(
+                _stream_captures, deferred={"annotations": {"values": True}}
+            )
+        elif streaming:
+            read_captures = _stream_captures
+        else:
+            read_captures = _read_captures
+        read_captures = functools.partial(
+            read_captures,
+            table_name=self.TABLE_NAME,
+            version=version,
+            predicate=predicate,
+        )
+        # Files are stat'ed before they are read, so that a file written
+        # while it is loaded is loaded again by the next refresh.
+        stats = pd.DataFrame(
+            file_stats(files), columns=["path", "size", "mtime_ns"]
+        )
+        verify_versions(files, version)
+        loaded = map_files(read_captures, files, num_workers)
+        captures = [capture for capture, _ in loaded]
+        annotations = [annotation for _, annotation in loaded]
+        stats["captures"] = [len(capture) for capture in captures]
+        stats["annotations"] = [len(annotation) for annotation in annotations]
 
-         ego (dict)  \
-        {'ego_id': '44ca9...', 'translation': [0.0, 0.0, -20.0],
-        'rotation': [0.0, 0.0, 0.0, 1.0], 'velocity': None,
-        'acceleration': None}
+        # pd.concat might create memory bottleneck
+        return (
+            _concat(captures, self.CAPTURES_COLUMNS),
+            _concat(annotations, self.ANNOTATIONS_COLUMNS),
+            stats,
+        )
 
-        filename (str)          format (str)
-        RGB3/rgb_30...           PNG
+    @classmethod
+    def iter_batches(
+        cls,
+        def_id,
+        batch_size=256,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        streaming=True,
+        prefetch_files=1,
+        drop_last=False,
+    ):
+        """Iterate over the captures and annotations of a definition.
+
+        Captures files are read one at a time, keeping only the annotations
+        of def_id while they are parsed, and joined as in :meth:`filter`.
+        The joined rows are yielded in batches, so memory is bounded by a
+        few captures files instead of the whole dataset. The next files are
+        read in a background thread while a batch is processed.
+
+        Examples:
+            >>> for batch in Captures.iter_batches(def_id, batch_size=32):
+            ...     images = batch["filename"].to_numpy()
+            ...     boxes = batch["annotation.values"].to_numpy()
 
-        """
-        captures = []
-        for c_file in glob(data_root, self.FILE_PATTERN):
-            capture = load_table(c_file, self.TABLE_NAME, version, max_level=0)
-            if "annotations" in capture.columns:
-                capture.drop(columns="annotations")
+        Args:
+            def_id (int): annotation definition id used to filter results
+            batch_size (int): number of rows of each batch
+            data_root (str): the root directory of the dataset
+            version (str): desired schema version
+            streaming (bool): whether to stream capture records from each
+                file instead of parsing the whole file at once
+            prefetch_files (int): number of files read ahead in a background
+                thread. Files are read when batches are requested if 0.
+            drop_last (bool): whether to drop the last batch if it has fewer
+                than batch_size rows
 
-            captures.append(capture)
+        Yields:
+            pd.DataFrame: batches of rows in file order, with the columns
+            of :meth:`filter`.
 
-        # pd.concat might create memory bottleneck
-        return pd.concat(captures, axis=0)
+        Raises:
+            DefinitionIDError: raised if none of the annotation records match
+                def_id, once all files are read.
+        """
+        read = functools.partial(
+            _read_filtered,
+            table_name=cls.TABLE_NAME,
+            version=version,
+            def_id=def_id,
+            streaming=streaming,
+        )
+        tables = map(read, glob(data_root, cls.FILE_PATTERN))
+        if prefetch_files > 0:
+            tables = prefetch(tables, prefetch_files)
+
+        pending = []
+        num_pending = 0
+        found = False
+        for table in tables:
+            if table.empty:
+                continue
+            found = True
+            pending.append(table)
+            num_pending += len(table)
+            if num_pending < batch_size:
+                continue
+            rows = pd.concat(pending, ignore_index=True)
+            end = len(rows) - len(rows) % batch_size
+            for start in range(0, end, batch_size):
+                yield rows.iloc[start : start + batch_size].reset_index(
+                    drop=True
+                )
+            pending = [rows.iloc[end:]]
+            num_pending = len(rows) - end
 
-    def _load_annotations(self, data_root, version):
-        """Load annotations and capture IDs.
-        :ref:`capture-annotation`
+        if not found:
+            msg = (
+                f"Can't find annotations records associate with the given "
+                f"definition id {def_id}."
+            )
+            raise DefinitionIDError(msg)
+        if num_pending and not drop_last:
+            yield pd.concat(pending, ignore_index=True)
+
+    @classmethod
+    def sample(
+        cls,
+        size,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        seed=None,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
+        """Load a uniform random sample of captures.
+
+        Only the sampled capture records are decoded and normalized, see
+        :func:`sampling.sample_records`. The records of the other captures
+        are located but not kept.
 
         Args:
+            size (int): number of captures to sample
             data_root (str): the root directory of the dataset
             version (str): desired schema version
+            seed (int): seed of the random generator. The same sample is
+                drawn for the same seed and captures files.
+            use_cache (bool): whether to keep the inventory of capture
+                records in the table cache
+            cache_dir (str): directory of the table cache
+            num_workers (int): number of worker processes used to scan
+                captures files
 
         Returns:
-            A pandas dataframe with combined annotation records
-            Columns: 'id' (annotation id), 'annotation_definition' (annotation
-            definition ID),
-             'values'
-             (list of objects that store annotation data, e.g. 2d bounding
-             box), 'capture.id'
-
-        Example Annotation Dataframe:
-
-        id(str)	annotation_definition(str)	\
-        ace0...	6716c...
-
-        values (dict) \
-        [{'label_id': 34, 'label_name': 'snack_chips_pringles',
-        ...'height': 118.0}, {'label_id': 35, '... 'height': 91.0}...]
-
-        capture.id (str)
-        cdc8b...
-      """
-        annotations = []
-        for c_file in glob(data_root, self.FILE_PATTERN):
-            try:
-                annotation = load_table(
-                    c_file,
-                    self.TABLE_NAME,
-                    version,
-                    record_path="annotations",
-                    meta="id",
-                    meta_prefix="capture.",
-                )
-            except KeyError:
-                annotation = pd.DataFrame(
-                    {"annotation_definition": [], "capture.id": []}
+            A tuple of pandas dataframes (captures, annotations) of the
+            sampled captures, with the columns of :attr:`captures` and
+            :attr:`annotations`.
+        """
+        records = sample_records(
+            glob(data_root, cls.FILE_PATTERN),
+            cls.TABLE_NAME,
+            version,
+            size,
+            seed=seed,
+            cache=open_cache(data_root, use_cache, cache_dir),
+            num_workers=num_workers,
+        )
+
+        return _normalize_captures(records)
+
+    def refresh(self):
+        """Load captures files that were added or changed since loading.
+
+        Files are compared with the path, size and modification time they
+        had when they were loaded. Rows of changed and removed files are
+        dropped, and the rows of new and changed files are appended to the
+        captures and annotations tables, so a refresh only parses the new
+        data. The table cache is updated if it is enabled.
+
+        Returns:
+            list: paths of the files that were loaded.
+        """
+        files = glob(self._data_root, self.FILE_PATTERN)
+        stats = {path: (size, mtime) for path, size, mtime in file_stats(files)}
+        loaded = self._files
+        keep = np.array(
+            [
+                stats.get(path) == (size, mtime)
+                for path, size, mtime in zip(
+                    loaded["path"], loaded["size"], loaded["mtime_ns"]
                 )
+            ],
+            dtype=bool,
+        )
+        kept = set(loaded["path"][keep])
+        updated = [path for path in stats if path not in kept]
+        if not updated and keep.all():
+            return []
+
+        raw = (None, None)
+        new_files = None
+        if updated:
+            *raw, new_files = self._load_files(
+                updated, self._version, **self._options
+            )
+        captures, annotations = raw
+        if self._compact and updated:
+            captures, annotations = compact_captures(*raw)
+
+        self.captures = _splice(
+            self.captures, loaded["captures"], keep, captures
+        )
+        self.annotations = _splice(
+            self.annotations, loaded["annotations"], keep, annotations
+        )
+        self._files = pd.concat([loaded[keep], new_files], ignore_index=True)
+        if self._cache is not None:
+            self._refresh_cache(loaded, keep, raw)
 
-            annotations.append(annotation)
+        return updated
+
+    def _refresh_cache(self, loaded, keep, raw):
+        """Update the cached tables after a refresh.
+
+        Args:
+            loaded (pd.DataFrame): the files table before the refresh
+            keep (np.ndarray): whether each of the loaded files was kept
+            raw (tuple): the captures and annotations of the refreshed
+                files, before they were converted to compact dtypes
+        """
+        names = self._table_names(self._options["lazy"])
+        predicate = self._options["predicate"]
+        if self._compact:
+            # Compact tables are not cached: splice the cached tables.
+            key = _files_key(loaded, self._version, predicate)
+            tables = [self._cache.load(name, key) for name in names[:2]]
+            if any(table is None for table in tables):
+                return
+            tables = [
+                _splice(table, loaded[column], keep, new)
+                for table, column, new in zip(
+                    tables, ["captures", "annotations"], raw
+                )
+            ]
+        else:
+            tables = [self.captures, self.annotations]
 
-        return pd.concat(annotations, axis=0)
+        key = _files_key(self._files, self._version, predicate)
+        for name, table in zip(names, tables + [self._files]):
+            self._cache.save(name, key, table)
 
     def filter(self, def_id):
         """Get captures and annotations filtered by annotation definition id
@@ -170,20 +512,65 @@ class Captures:
         +---------------+------------------+-----------+-------------------+---------------------------------------------------------------------------------------------------------------------------------------------------------------+------------+---------------+--------------+---------------------+---------------------------------------+-----------------------------------------------------------------------------------------------------------------------+
 
         """  # noqa: E501 table should not be broken down into multiple lines
-        if self.annotations.empty:
+        partitions = self._partition_index()
+        if def_id not in partitions.filtered:
+            partitions.filtered[def_id] = self._filter(partitions, def_id)
+
+        return partitions.filtered[def_id].copy()
+
+    def filter_objects(self, def_id, capture_columns=()):
+        """Get the objects of the annotations of an annotation definition.
+
+        The values of 2D or 3D bounding box and keypoint annotations are
+        flattened into one row per object, see
+        :func:`objects.annotation_objects`.
+
+        Args:
+            def_id (int): annotation definition id used to filter results
+            capture_columns (list): columns of :meth:`filter` to repeat on
+                the rows of every object, e.g. "filename"
+
+        Returns:
+            pd.DataFrame: one row per object. Columns: "capture_id",
+            "annotation_id", capture_columns and the fields of the objects,
+            e.g. "label_id", "x", "y", "width" and "height".
+
+        Raises:
+            DefinitionIDError: Raised if no annotation matches def_id.
+        """
+        return annotation_objects(self.filter(def_id), capture_columns)
+
+    def _filter(self, partitions, def_id):
+        """Join the captures and annotations of one annotation definition.
+
+        Only the rows of the def_id partition and the captures they belong
+        to are joined, so the cost depends on the size of the result rather
+        than on the size of the dataset.
+        """
+        positions = partitions.annotations.get(def_id)
+        if positions is None:
             msg = (
                 f"Can't find annotations records associate with the given "
                 f"definition id {def_id}."
             )
             raise DefinitionIDError(msg)
 
-        mask = self.annotations.annotation_definition == def_id
         annotations = (
-            self.annotations[mask]
+            self.annotations.iloc[positions]
             .set_index("capture.id")
             .add_prefix("annotation.")
         )
-        captures = self.captures.set_index("id")
+        if "annotation.values" in annotations.columns:
+            annotations["annotation.values"] = pd.Series(
+                load_deferred(annotations["annotation.values"]),
+                index=annotations.index,
+                dtype=object,
+            )
+        captures = partitions.captures
+        capture_positions = captures.index.get_indexer_for(annotations.index)
+        captures = captures.iloc[
+            np.unique(capture_positions[capture_positions >= 0])
+        ]
 
         combined = (
             captures.join(annotations, how="inner")
@@ -199,3 +586,430 @@ class Captures:
             raise DefinitionIDError(msg)
 
         return combined
+
+    def _partition_index(self):
+        """Index the annotations by annotation definition id.
+
+        The index is built on first use and rebuilt when the captures or
+        annotations tables are replaced.
+
+        Returns:
+            _Partitions: the captures indexed by capture id, the row
+            positions of the annotations of each annotation definition and
+            the memoized filter results.
+        """
+        sources = (self.captures, self.annotations)
+        partitions = getattr(self, "_partitions", None)
+        if partitions is None or any(
+            a is not b for a, b in zip(partitions.sources, sources)
+        ):
+            if self.annotations.empty:
+                annotations = {}
+            else:
+                annotations = self.annotations.groupby(
+                    "annotation_definition", sort=False
+                ).indices
+            partitions = _Partitions(
+                sources, self.captures.set_index("id"), annotations, {}
+            )
+            self._partitions = partitions
+
+        return partitions
+
+
+_Partitions = namedtuple(
+    "_Partitions", ["sources", "captures", "annotations", "filtered"]
+)
+
+
+class DaskCaptures:
+    """Load captures and annotations tables as dask dataframes
+
+    Each partition holds the captures and annotations of a group of
+    captures files, so datasets larger than memory can be processed one
+    partition at a time. Nothing is loaded until a result is computed,
+    except the first captures file, which is read to infer column dtypes.
+    Results are computed with the dask scheduler in use, e.g. a local
+    ``dask.distributed.Client``.
+
+    Examples:
+
+    .. code-block:: python
+
+        >>> captures = DaskCaptures(data_root="/data", files_per_partition=4)
+        >>> data = captures.filter(def_id="6716c783-1c0e-44ae-b1b5-7f068454b66e") # noqa E501 table command not be broken down into multiple lines
+        >>> data.groupby("sequence_id").size().compute()
+
+    Attributes:
+        captures (dd.DataFrame): a collection of captures without annotations
+        annotations (dd.DataFrame): a collection of annotations
+    """
+
+    TABLE_NAME = Captures.TABLE_NAME
+    FILE_PATTERN = Captures.FILE_PATTERN
+    CAPTURES_COLUMNS = Captures.CAPTURES_COLUMNS
+    ANNOTATIONS_COLUMNS = Captures.ANNOTATIONS_COLUMNS
+
+    def __init__(
+        self,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        files_per_partition=1,
+        streaming=False,
+    ):
+        """ Initialize DaskCaptures
+
+        Args:
+            data_root (str): the root directory of the dataset
+            version (str): desired schema version
+            files_per_partition (int): number of captures files loaded in
+                each partition
+            streaming (bool): whether to stream capture records from each
+                file instead of parsing the whole file at once
+
+        Raises:
+            ValueError: if there are no captures files in data_root.
+        """
+        files = list(glob(data_root, self.FILE_PATTERN))
+        if not files:
+            raise ValueError(f"Can't find captures files in {data_root}.")
+        read_partition = functools.partial(
+            self._read_partition,
+            table_name=self.TABLE_NAME,
+            version=version,
+            streaming=streaming,
+        )
+        self._meta = tuple(t.iloc[:0] for t in read_partition(files[:1]))
+        self._partitions = [
+            dask.delayed(read_partition)(files[i : i + files_per_partition])
+            for i in range(0, len(files), files_per_partition)
+        ]
+        self.captures = self._from_partitions(
+            lambda partition: partition[0], self._meta[0]
+        )
+        self.annotations = self._from_partitions(
+            lambda partition: partition[1], self._meta[1]
+        )
+
+    @classmethod
+    def _read_partition(cls, files, table_name, version, streaming=False):
+        """Load the captures and annotations of a group of captures files.
+
+        Columns are aligned to CAPTURES_COLUMNS and ANNOTATIONS_COLUMNS, so
+        that all partitions have the same columns.
+        """
+        read_captures = _stream_captures if streaming else _read_captures
+        loaded = [read_captures(f, table_name, version) for f in files]
+        captures = pd.concat([c for c, _ in loaded], axis=0)
+        annotations = pd.concat([a for _, a in loaded], axis=0)
+
+        return (
+            captures.reindex(columns=cls.CAPTURES_COLUMNS),
+            annotations.reindex(columns=cls.ANNOTATIONS_COLUMNS),
+        )
+
+    def _from_partitions(self, func, meta):
+        """Build a dask dataframe by applying func to every partition."""
+        return dd.from_delayed(
+            [dask.delayed(func)(p) for p in self._partitions],
+            meta=meta,
+            verify_meta=False,
+        )
+
+    def filter(self, def_id):
+        """Get captures and annotations filtered by annotation definition id
+
+        Unlike :meth:`Captures.filter`, the result is lazy: captures and
+        annotations are joined partition by partition when it is computed.
+        An empty dataframe is computed if no annotation matches the def_id.
+
+        Args:
+            def_id (int): annotation definition id used to filter results
+
+        Returns:
+            A dask dataframe with the columns of :meth:`Captures.filter`.
+        """
+        join = functools.partial(_join_annotations, def_id=def_id)
+
+        return self._from_partitions(
+            lambda partition: join(*partition), join(*self._meta)
+        )
+
+
+def _join_annotations(captures, annotations, def_id):
+    """Join captures with their annotations of one annotation definition.
+    """
+    mask = annotations["annotation_definition"] == def_id
+    annotations = (
+        annotations[mask].set_index("capture.id").add_prefix("annotation.")
+    )
+
+    return (
+        captures.set_index("id")
+        .join(annotations, how="inner")
+        .reset_index()
+        .rename(columns={"index": "id"})
+    )
+
+
+def _concat(tables, columns=None):
+    """Concatenate the tables loaded from each captures file.
+
+    Tables of files without any loaded record are skipped, since they can
+    lack columns of the others. If no record was loaded at all, the table of
+    the first file is returned, or an empty table with the given columns if
+    it has no columns.
+    """
+    loaded = [table for table in tables if len(table)]
+    if loaded:
+        return pd.concat(loaded, axis=0)
+    if tables and len(tables[0].columns):
+        return tables[0]
+
+    return pd.DataFrame(columns=columns)
+
+
+def _read_filtered(c_file, table_name, version, def_id, streaming=True):
+    """Load the joined captures and annotations of def_id in a captures file.
+    """
+    read_captures = _stream_captures if streaming else _read_captures
+    captures, annotations = read_captures(
+        c_file,
+        table_name,
+        version,
+        predicate=_CapturePredicate.create(def_ids=[def_id]),
+    )
+    if annotations.empty:
+        return pd.DataFrame()
+
+    return _join_annotations(captures, annotations, def_id)
+
+
+def _files_key(files, version, predicate=None):
+    """Cache key of the captures files recorded in a files table."""
+    stats = zip(files["path"], files["size"], files["mtime_ns"])
+
+    return _with_predicate(stats_fingerprint(stats, version), predicate)
+
+
+def _with_predicate(key, predicate):
+    """Add the loading predicate of the cached tables to a cache key."""
+    if predicate is None:
+        return key
+
+    return dict(key, predicate=predicate.key())
+
+
+class _CapturePredicate(
+    namedtuple(
+        "_CapturePredicate", ["sequence_ids", "steps", "sensor_ids", "def_ids"]
+    )
+):
+    """Predicates applied to capture records while captures files are parsed.
+
+    A field set to None doesn't filter records.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def create(
+        cls, sequence_ids=None, steps=None, sensor_ids=None, def_ids=None
+    ):
+        """Create a predicate, or return None if no field is set."""
+        if all(v is None for v in (sequence_ids, steps, sensor_ids, def_ids)):
+            return None
+        if steps is not None:
+            start, stop = steps
+            steps = (start, stop)
+
+        return cls(
+            _frozenset(sequence_ids),
+            steps,
+            _frozenset(sensor_ids),
+            _frozenset(def_ids),
+        )
+
+    def match(self, record):
+        """Check whether a capture record is loaded."""
+        if (
+            self.sequence_ids is not None
+            and record.get("sequence_id") not in self.sequence_ids
+        ):
+            return False
+        if self.steps is not None:
+            start, stop = self.steps
+            step = record.get("step")
+            if (
+                step is None
+                or (start is not None and step < start)
+                or (stop is not None and step >= stop)
+            ):
+                return False
+        if self.sensor_ids is not None:
+            sensor = record.get("sensor")
+            if (
+                not isinstance(sensor, dict)
+                or sensor.get("sensor_id") not in self.sensor_ids
+            ):
+                return False
+
+        return True
+
+    def select(self, records):
+        """Yield the matching capture records with their loaded annotations.
+        """
+        for record in records:
+            if not self.match(record):
+                continue
+            annotations = record.get("annotations")
+            if self.def_ids is not None and annotations is not None:
+                record = dict(
+                    record,
+                    annotations=[
+                        a
+                        for a in annotations
+                        if a.get("annotation_definition") in self.def_ids
+                    ],
+                )
+            yield record
+
+    def key(self):
+        """Json representation of the predicate, used in cache keys."""
+        return [
+            list(value) if isinstance(value, tuple) else value
+            for value in (
+                _sorted_ids(self.sequence_ids),
+                self.steps,
+                _sorted_ids(self.sensor_ids),
+                _sorted_ids(self.def_ids),
+            )
+        ]
+
+
+def _frozenset(ids):
+    return None if ids is None else frozenset(ids)
+
+
+def _sorted_ids(ids):
+    return None if ids is None else sorted(ids, key=repr)
+
+
+def _splice(table, counts, keep, new=None):
+    """Drop the rows of files that are not kept and append new rows.
+
+    Args:
+        table (pd.DataFrame): rows loaded from a list of files, in order
+        counts (pd.Series): number of rows loaded from each file
+        keep (np.ndarray): whether the rows of each file are kept
+        new (pd.DataFrame): rows to append
+
+    Returns:
+        pd.DataFrame: the spliced table.
+    """
+    table = table[np.repeat(keep, counts)]
+    if new is None:
+        return table
+
+    combined = pd.concat([table, new], axis=0)
+    for column in combined.columns.intersection(table.columns).intersection(
+        new.columns
+    ):
+        # Categories of compact tables differ between the two parts.
+        parts = [table[column], new[column]]
+        if not all(p.dtype.name == "category" for p in parts):
+            continue
+        if parts[0].cat.categories.dtype != parts[1].cat.categories.dtype:
+            parts = [
+                p.astype(pd.CategoricalDtype(p.cat.categories.astype(object)))
+                for p in parts
+            ]
+        combined[column] = union_categoricals(parts, ignore_order=True)
+
+    return combined
+
+
+def _read_captures(c_file, table_name, version, predicate=None):
+    """Load and normalize the captures and annotations of a captures file.
+    """
+    records = load_json(c_file, version)[table_name]
+    if predicate is not None:
+        records = list(predicate.select(records))
+
+    return _normalize_captures(records)
+
+
+def _stream_captures(
+    c_file, table_name, version, deferred=None, predicate=None
+):
+    """Stream the captures and annotations of a captures file.
+
+    Capture records are decoded one at a time and their values are appended
+    to column builders, so the parsed document is never held in memory.
+    Returns the same tables as :func:`_read_captures`, except for the values
+    of deferred keys (see :func:`iter_records`). Records that don't match
+    the predicate are dropped as soon as they are decoded.
+    """
+    captures = ColumnBuilder()
+    annotations = ColumnBuilder()
+    capture_ids = []
+    has_annotations = True
+    records = iter_records(c_file, table_name, version, deferred=deferred)
+    if predicate is not None:
+        records = predicate.select(records)
+    for record in records:
+        record_annotations = record.pop("annotations", None)
+        captures.append(record)
+        if record_annotations is None:
+            has_annotations = False
+        elif has_annotations:
+            for annotation in record_annotations:
+                annotations.append(annotation)
+                capture_ids.append(record["id"])
+
+    if not has_annotations:
+        annotations = pd.DataFrame(
+            {"annotation_definition": [], "capture.id": []}
+        )
+    else:
+        annotations = annotations.to_frame()
+        annotations["capture.id"] = pd.Series(capture_ids, dtype=object)
+
+    return captures.to_frame(), annotations
+
+
+def _normalize_captures(records):
+    """Normalize capture records into captures and annotations tables.
+
+    The records are already parsed, so the tables are built directly from
+    them instead of going through ``pd.json_normalize``, which deep copies
+    every record (including the annotation values) before flattening it.
+
+    Args:
+        records (list): capture records loaded from a captures file
+
+    Returns:
+        A tuple of pandas dataframes (captures, annotations) with the
+        columns of the captures and annotations tables of
+        :meth:`Captures._load_files`.
+    """
+    captures = pd.DataFrame(
+        [
+            {k: v for k, v in record.items() if k != "annotations"}
+            for record in records
+        ]
+    )
+
+    try:
+        annotations = pd.DataFrame(
+            [a for record in records for a in record["annotations"]]
+        )
+        annotations["capture.id"] = pd.Series(
+            [r["id"] for r in records for _ in r["annotations"]], dtype=object
+        )
+    except KeyError:
+        annotations = pd.DataFrame(
+            {"annotation_definition": [], "capture.id": []}
+        )
+
+    return captures, annotations
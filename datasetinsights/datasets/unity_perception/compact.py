@@ -0,0 +1,153 @@
+""" Compact representation of Synthetic dataset captures tables
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Axes of the vectors stored in sensor and ego records.
+VECTOR_AXES = {
+    "translation": ("x", "y", "z"),
+    "rotation": ("x", "y", "z", "w"),
+    "velocity": ("x", "y", "z"),
+    "acceleration": ("x", "y", "z"),
+}
+SCALAR_KEYS = ("scale",)
+NESTED_COLUMNS = ("sensor", "ego")
+CATEGORICAL_COLUMNS = ("sequence_id", "format")
+INTERNED_COLUMNS = ("filename",)
+
+
+def compact_captures(captures, annotations):
+    """Convert captures and annotations tables to compact dtypes.
+
+    - Capture ids, and the capture ids of annotations, become categoricals
+      that share their categories, so that every id string is stored once.
+      Sequence ids, annotation definition ids and formats become
+      categoricals too. Annotation ids are unique and are left as they are.
+    - The sensor and ego columns are flattened into one column per key,
+      e.g. ``sensor.sensor_id``. Translation, rotation, velocity and
+      acceleration vectors become one float32 column per axis, e.g.
+      ``ego.rotation.w``, and scale becomes a float32 column. Missing
+      vectors are stored as NaN. Other keys become categoricals, or object
+      columns if their values are not hashable (e.g. camera intrinsics).
+    - Filenames are interned.
+
+    Args:
+        captures (pd.DataFrame): captures table, see :class:`Captures`
+        annotations (pd.DataFrame): annotations table, see :class:`Captures`
+
+    Returns:
+        A tuple of pandas dataframes (captures, annotations).
+    """
+    captures = captures.copy()
+    annotations = annotations.copy()
+
+    capture_ids = [captures["id"]]
+    if "capture.id" in annotations.columns:
+        capture_ids.append(annotations["capture.id"])
+    categories = pd.unique(pd.concat(capture_ids, ignore_index=True).dropna())
+    captures["id"] = pd.Categorical(captures["id"], categories=categories)
+    if "capture.id" in annotations.columns:
+        annotations["capture.id"] = pd.Categorical(
+            annotations["capture.id"], categories=categories
+        )
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in captures.columns:
+            captures[column] = _categorical(captures[column])
+    if "annotation_definition" in annotations.columns:
+        annotations["annotation_definition"] = _categorical(
+            annotations["annotation_definition"]
+        )
+    for table in (captures, annotations):
+        for column in INTERNED_COLUMNS:
+            if column in table.columns:
+                table[column] = _intern(table[column])
+
+    for column in NESTED_COLUMNS:
+        if column in captures.columns:
+            captures = _flatten(captures, column)
+
+    return captures, annotations
+
+
+def _flatten(table, column):
+    """Replace a column of dicts with one compact column per key."""
+    records = table[column].tolist()
+    keys = {}
+    for record in records:
+        if isinstance(record, dict):
+            keys.update(dict.fromkeys(record))
+
+    flattened = {}
+    index = table.index
+    for key in keys:
+        values = [r.get(key) if isinstance(r, dict) else None for r in records]
+        name = f"{column}.{key}"
+        if key in VECTOR_AXES:
+            vectors = _vectors(values, len(VECTOR_AXES[key]))
+            if vectors is not None:
+                for axis, vector in zip(VECTOR_AXES[key], vectors.T):
+                    flattened[f"{name}.{axis}"] = vector
+                continue
+        if key in SCALAR_KEYS and _numeric(values):
+            flattened[name] = np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float32
+            )
+        elif all(_hashable(v) for v in values):
+            flattened[name] = _categorical(
+                pd.Series(values, index=index, dtype=object)
+            )
+        else:
+            flattened[name] = pd.Series(values, index=index, dtype=object)
+
+    position = table.columns.get_loc(column)
+    flattened = pd.DataFrame(flattened, index=index)
+
+    return pd.concat(
+        [table.iloc[:, :position], flattened, table.iloc[:, position + 1 :]],
+        axis=1,
+    )
+
+
+def _vectors(values, size):
+    """Stack vectors into a float32 array, or None if they don't fit."""
+    vectors = np.full((len(values), size), np.nan, dtype=np.float32)
+    for row, value in enumerate(values):
+        if value is None:
+            continue
+        if not isinstance(value, list) or len(value) != size:
+            return None
+        if not _numeric(value):
+            return None
+        vectors[row] = value
+
+    return vectors
+
+
+def _numeric(values):
+    return all(
+        v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+        for v in values
+    )
+
+
+def _hashable(value):
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _categorical(column):
+    """Convert a column to a categorical unless it holds unhashable values."""
+    if column.dtype == object and not all(_hashable(v) for v in column):
+        return column
+
+    return column.astype("category")
+
+
+def _intern(column):
+    """Intern the strings of a column so that repeated values are shared."""
+    if column.dtype != object:
+        return column
+
+    return column.map(lambda v: sys.intern(v) if isinstance(v, str) else v)
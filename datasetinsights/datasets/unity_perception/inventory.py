@@ -0,0 +1,228 @@
+""" Persisted inventory of the json files of a Synthetic dataset
+
+Data roots often hold millions of captured images next to a few json
+files. Every table loader looks for its json files, and walking the data
+root each time lists every image again. :class:`FileInventory` walks the
+data root once and remembers the json files of every directory:
+
+    >>> inventory = file_inventory("/data")
+    >>> inventory.glob("captures_*.json")
+    [PosixPath('/data/Dataset/captures_000.json'), ...]
+
+The inventory is refreshed incrementally every time it is used: directories
+are stat'ed and only those whose modification time changed are listed
+again. It is saved next to the table cache of the data root, if there is
+one, so new processes only refresh it.
+"""
+import fnmatch
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import DEFAULT_CACHE_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_FILENAME = "files.json"
+INVENTORY_VERSION = 2
+# A directory modified this close to the time it was listed may have
+# changed again in the same tick of the file system clock.
+RACY_INTERVAL_NS = 2 * 10 ** 9
+
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+
+class FileInventory:
+    """Inventory of the json files under a data root
+
+    Every directory under the data root, except the table cache, is
+    recorded with its modification time, its json files and its
+    subdirectories. Directories are listed with ``os.scandir`` in a thread
+    pool, one level of the directory tree at a time. Symbolic links to
+    directories are not followed, so a link loop is not walked.
+
+    A directory is listed again when its modification time changes, which
+    happens when files are added, removed or renamed in it. On file systems
+    with coarse timestamps, a directory can change again without a new
+    modification time if it changes in the same tick as it was listed. A
+    directory whose modification time is within ``RACY_INTERVAL_NS`` of the
+    time it was listed is therefore listed again on every refresh, until
+    its listing is older than its modification time by that interval.
+
+    Attributes:
+        data_root (pathlib.Path): the root directory of the dataset
+        path (pathlib.Path): file the inventory is saved to
+    """
+
+    def __init__(self, data_root, path=None, num_workers=None):
+        """ Initialize FileInventory
+
+        The inventory is loaded from path if it was saved before.
+
+        Args:
+            data_root (str): the root directory of the dataset
+            path (str): file the inventory is saved to. Defaults to
+                ``.datasetinsights_cache/files.json`` under data_root. The
+                inventory is only saved if the directory of path exists,
+                e.g. once tables were cached with ``use_cache=True``.
+            num_workers (int): number of threads listing directories.
+                Defaults to the ThreadPoolExecutor default.
+        """
+        self.data_root = pathlib.Path(data_root)
+        if path is None:
+            path = self.data_root / DEFAULT_CACHE_DIRNAME / INVENTORY_FILENAME
+        self.path = pathlib.Path(path)
+        self._num_workers = num_workers
+        self._directories = self._load()
+        self._lock = threading.Lock()
+
+    def glob(self, pattern):
+        """Find the json files matching a file name pattern.
+
+        The inventory is refreshed first.
+
+        Args:
+            pattern (str): Unix file name pattern, e.g. "captures_*.json".
+                It is matched against file names, in any directory.
+
+        Returns:
+            list: the matching paths, in sorted order.
+        """
+        with self._lock:
+            self._refresh()
+            directories = self._directories
+
+        return sorted(
+            self.data_root / directory / name
+            for directory, entry in directories.items()
+            for name in fnmatch.filter(entry["files"], pattern)
+        )
+
+    def refresh(self):
+        """List the directories that changed since the last refresh.
+
+        Returns:
+            int: the number of directories that were listed.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        known = self._directories
+        directories = {}
+        listed = 0
+        level = ["."] if self.data_root.is_dir() else []
+        with ThreadPoolExecutor(max_workers=self._num_workers) as executor:
+            while level:
+                entries = executor.map(
+                    lambda d: self._update(d, known.get(d)), level
+                )
+                level_dirs, level = level, []
+                for directory, (entry, was_listed) in zip(level_dirs, entries):
+                    if entry is None:
+                        continue
+                    listed += was_listed
+                    directories[directory] = entry
+                    level.extend(
+                        os.path.join(directory, subdir)
+                        if directory != "."
+                        else subdir
+                        for subdir in entry["subdirs"]
+                    )
+        changed = listed or directories.keys() != known.keys()
+        self._directories = directories
+        if changed:
+            self._save()
+        logger.debug(f"Listed {listed} directories under {self.data_root}")
+
+        return listed
+
+    def _update(self, directory, entry):
+        """Stat a directory and list it if it changed.
+
+        Returns:
+            A tuple (entry, listed). The entry is None if the directory no
+            longer exists.
+        """
+        path = self.data_root / directory
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, False
+        if (
+            entry is not None
+            and entry["mtime_ns"] == mtime
+            and entry["listed_ns"] - mtime >= RACY_INTERVAL_NS
+        ):
+            return entry, False
+
+        listed = time.time_ns()
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            if item.name != DEFAULT_CACHE_DIRNAME:
+                                subdirs.append(item.name)
+                        elif item.name.endswith(".json"):
+                            files.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None, False
+
+        entry = {
+            "mtime_ns": mtime,
+            "listed_ns": listed,
+            "files": files,
+            "subdirs": subdirs,
+        }
+
+        return entry, True
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if saved.get("version") != INVENTORY_VERSION:
+            return {}
+
+        return saved["directories"]
+
+    def _save(self):
+        data = {"version": INVENTORY_VERSION, "directories": self._directories}
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        if not self.path.parent.is_dir():
+            return
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"Can't save the file inventory to {self.path}: {e}")
+
+
+def file_inventory(data_root):
+    """Get the shared file inventory of a data root.
+
+    Args:
+        data_root (str): the root directory of the dataset
+
+    Returns:
+        FileInventory: the inventory of data_root.
+    """
+    key = os.path.abspath(data_root)
+    with _inventories_lock:
+        if key not in _inventories:
+            _inventories[key] = FileInventory(data_root)
+
+        return _inventories[key]
@@ -0,0 +1,163 @@
+""" Pluggable json parsers used to read Synthetic dataset files
+
+The stdlib json module is used unless a faster parser is installed. The
+parser can be selected with the ``DATASETINSIGHTS_JSON_BACKEND``
+environment variable or with :func:`set_json_backend`:
+
+    >>> set_json_backend("orjson")
+    >>> data = load("/data/Dataset/captures_000.json")
+
+Supported backends, in order of preference when no backend is selected:
+
+- ``orjson``: https://github.com/ijl/orjson
+- ``simdjson``: https://github.com/TkTech/pysimdjson
+- ``json``: the Python standard library
+
+orjson is installed with the ``json`` extra, ``pip install
+datasetinsights[json]``.
+
+The environment variable is also read by worker processes, so it is the
+way to select a backend for all workers of a process pool or dask cluster.
+"""
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND_ENV = "DATASETINSIGHTS_JSON_BACKEND"
+AUTO = "auto"
+STDLIB = "json"
+BACKENDS = ("orjson", "simdjson", STDLIB)
+
+_backend = None
+
+
+def _orjson_loads():
+    import orjson
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN, Infinity and integers over 64 bits, which
+            # the stdlib parser accepts.
+            return json.loads(data)
+
+    return loads
+
+
+def _simdjson_loads():
+    import simdjson
+
+    def loads(data):
+        try:
+            return simdjson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+    return loads
+
+
+def _stdlib_loads():
+    return json.loads
+
+
+_LOADERS = {
+    "orjson": _orjson_loads,
+    "simdjson": _simdjson_loads,
+    STDLIB: _stdlib_loads,
+}
+
+
+def available_backends():
+    """List the json backends that are installed.
+
+    Returns:
+        list: names of the installed backends in order of preference.
+    """
+    available = []
+    for name in BACKENDS:
+        try:
+            _LOADERS[name]()
+        except ImportError:
+            continue
+        available.append(name)
+
+    return available
+
+
+def set_json_backend(name=AUTO):
+    """Select the json backend used to read dataset files.
+
+    Args:
+        name (str): one of "orjson", "simdjson" or "json". "auto" selects
+            the fastest installed backend.
+
+    Returns:
+        str: name of the selected backend.
+
+    Raises:
+        ValueError: if the backend is unknown.
+        ImportError: if the backend is not installed.
+    """
+    global _backend
+    if name == AUTO:
+        name = available_backends()[0]
+    if name not in _LOADERS:
+        raise ValueError(
+            f"Unknown json backend {name}. "
+            f"Supported backends are {', '.join(BACKENDS)}."
+        )
+    _backend = (name, _LOADERS[name]())
+    logger.debug(f"Using the {name} json backend.")
+
+    return name
+
+
+def get_json_backend():
+    """Get the name of the json backend used to read dataset files.
+
+    The backend is selected from the ``DATASETINSIGHTS_JSON_BACKEND``
+    environment variable the first time it is used. Unknown or missing
+    backends in the environment variable fall back to "auto".
+
+    Returns:
+        str: name of the selected backend.
+    """
+    if _backend is None:
+        name = os.environ.get(JSON_BACKEND_ENV, AUTO)
+        try:
+            set_json_backend(name)
+        except (ValueError, ImportError) as e:
+            logger.warning(f"{e} Falling back to the {AUTO} json backend.")
+            set_json_backend(AUTO)
+
+    return _backend[0]
+
+
+def loads(data):
+    """Parse a json document with the selected backend.
+
+    Args:
+        data (bytes or str): the json document
+
+    Returns:
+        the parsed document.
+    """
+    get_json_backend()
+
+    return _backend[1](data)
+
+
+def load(json_file):
+    """Read and parse a json file with the selected backend.
+
+    Args:
+        json_file (str): filename to json.
+
+    Returns:
+        the parsed document.
+    """
+    with open(json_file, "rb") as file:
+        return loads(file.read())
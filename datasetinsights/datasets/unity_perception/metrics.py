@@ -1,13 +1,24 @@
 """Load Synthetic dataset Metrics
 """
-import json
+import functools
 
 import dask.bag as db
+import numpy as np
+import pandas as pd
 
 from datasetinsights.constants import DEFAULT_DATA_ROOT
 
+from . import json_backend
+from .cache import file_stats, fingerprint, open_cache, stats_fingerprint
 from .exceptions import DefinitionIDError
-from .tables import DATASET_TABLES, SCHEMA_VERSION, glob
+from .sampling import sample_records
+from .tables import (
+    DATASET_TABLES,
+    SCHEMA_VERSION,
+    glob,
+    iter_records,
+    verify_versions,
+)
 from .validation import verify_version
 
 
@@ -36,22 +47,69 @@ class Metrics:
         | 2             | 2                | 2231                |
         +---------------+------------------+---------------------+
 
+        Repeated filters read the metrics files again. Ingest the metrics
+        once to partition them by metric definition:
+
+        >>> metrics = Metrics(data_root="/data", use_cache=True)
+        >>> metrics.ingest()
+        >>> metrics_df = metrics.filter_metrics(def_id="my_definition_id")
+
+        Metrics files written after loading, e.g. by a running simulation,
+        are picked up by a refresh. Ingested partitions are updated from the
+        new and changed files only:
+
+        >>> metrics.refresh()
     """
 
     TABLE_NAME = "metrics"
+    PARTITIONS_TABLE_NAME = "metrics.partitions"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
 
-    def __init__(self, data_root=DEFAULT_DATA_ROOT, version=SCHEMA_VERSION):
+    def __init__(
+        self,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=None,
+        streaming=False,
+        scheduler=None,
+    ):
         """ Initialize Metrics
 
         Args:
             data_root (str): the root directory of the dataset containing
             metrics
             version (str): desired schema version
+            use_cache (bool): whether to cache filtered metrics on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                metrics files. Metrics are parsed in this process if
+                num_workers is 1. Defaults to the dask default scheduler.
+            streaming (bool): whether to stream metric records from each
+                file instead of parsing the whole file at once. Records of
+                other metric definitions are then discarded as they are read.
+            scheduler (str or distributed.Client): dask scheduler used to
+                compute the metrics: "synchronous", "threads", "processes",
+                "distributed" or a ``dask.distributed.Client``. "threads" and
+                "processes" use num_workers workers. "distributed" uses the
+                running distributed client, or starts a local cluster of
+                num_workers worker processes. Defaults to a scheduler chosen
+                from num_workers.
         """
-        self.metrics = self._load_metrics(data_root, version)
+        self._data_root = data_root
+        self._version = version
+        self._num_workers = num_workers
+        self._scheduler = scheduler
+        self._streaming = streaming
+        self._cache = open_cache(data_root, use_cache, cache_dir)
+        self._partitions = None
+        self._ingested = None
+        self._files = file_stats(glob(data_root, self.FILE_PATTERN))
+        self.metrics = self._load_metrics(data_root, version, streaming)
 
-    def _load_metrics(self, data_root, version):
+    def _load_metrics(self, data_root, version, streaming=False):
         """
         `:ref:`metrics`
 
@@ -60,17 +118,28 @@ class Metrics:
             data_root: (str): the root directory of the dataset containing
             metrics
             version (str): desired schema version
+            streaming (bool): whether to stream metric records from each
+                file instead of parsing the whole file at once
 
         Returns:
             dask.bag.core.Bag
         """
+        load_json = self._records_loader(version, streaming)
         metrics_files = db.from_sequence(glob(data_root, self.FILE_PATTERN))
-        metrics = metrics_files.map(
-            lambda path: Metrics._load_json(path, self.TABLE_NAME, version)
-        ).flatten()
+        metrics = metrics_files.map(load_json).flatten()
 
         return metrics
 
+    @classmethod
+    def _records_loader(cls, version, streaming=False):
+        """Get a picklable function that reads the records of a metrics file.
+        """
+        return functools.partial(
+            iter_records if streaming else Metrics._load_json,
+            table_name=cls.TABLE_NAME,
+            version=version,
+        )
+
     @staticmethod
     def _normalize_values(metric):
         """ Filter unnecessary info from metric.
@@ -97,28 +166,360 @@ class Metrics:
         Columns: "label_id", "capture_id", "annotation_id", "sequence_id",
         "step"
         """
-        metrics = (
-            self.metrics.filter(
-                lambda metric: metric["metric_definition"] == def_id
+        return self.filter_metrics_by_ids([def_id])[def_id]
+
+    def filter_metrics_by_ids(self, def_ids):
+        """Get the metrics of several metric definitions in a single scan
+
+        Metrics files are read once for all def_ids that are not cached.
+        After :meth:`ingest`, no metrics file is read.
+
+        Args:
+            def_ids (list): metric definition ids used to filter results
+        Raises:
+            DefinitionIDError: raised if no metrics records match one of the
+            def_ids
+        Returns (dict):
+        The metrics of each def_id, see :meth:`filter_metrics`.
+        """
+        def_ids = list(dict.fromkeys(def_ids))
+        if self._partitions is not None:
+            _check_definitions(def_ids, self._partitions)
+            return {d: self._partitions[d].copy() for d in def_ids}
+
+        tables = {}
+        if self._cache is not None:
+            key = self._cache_key()
+            for def_id in def_ids:
+                table = self._cache.load(self._cache_name(def_id), key)
+                if table is not None:
+                    tables[def_id] = table
+
+        missing = [def_id for def_id in def_ids if def_id not in tables]
+        if missing and self._cache is not None:
+            ingested = self._cache.load(self.PARTITIONS_TABLE_NAME, key)
+            if ingested is not None:
+                _check_definitions(missing, set(ingested.metric_definition))
+        if missing:
+            filtered = self._group_metrics(missing)
+            _check_definitions(missing, filtered)
+            if self._cache is not None:
+                for def_id in missing:
+                    name = self._cache_name(def_id)
+                    self._cache.save(name, key, filtered[def_id])
+            tables.update(filtered)
+
+        return {def_id: tables[def_id] for def_id in def_ids}
+
+    def ingest(self):
+        """Partition the metrics table by metric definition
+
+        The metrics files are read once and the metrics of every metric
+        definition are normalized into their own table, as returned by
+        :meth:`filter_metrics`. If the table cache is enabled, each table is
+        written to its own file in the cache, so later filters (also by
+        other Metrics instances) only read the files of the requested
+        definitions. Otherwise the tables are kept in memory.
+
+        Returns:
+            list: the metric definition ids found in the metrics files.
+        """
+        files = list(glob(self._data_root, self.FILE_PATTERN))
+        partitions, ingested = self._ingest_files(files)
+        if self._cache is None:
+            self._partitions, self._ingested = partitions, ingested
+        else:
+            self._save_partitions(
+                fingerprint(files, self._version), partitions, ingested
             )
-            .map(Metrics._normalize_values)
-            .flatten()
+
+        return list(partitions)
+
+    @classmethod
+    def sample(
+        cls,
+        size,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        seed=None,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
+        """Load a uniform random sample of metric records.
+
+        Only the sampled records are decoded. Records are sampled across all
+        metric definitions.
+
+        Args:
+            size (int): number of metric records to sample
+            data_root (str): the root directory of the dataset
+            version (str): desired schema version
+            seed (int): seed of the random generator. The same sample is
+                drawn for the same seed and metrics files.
+            use_cache (bool): whether to keep the inventory of metric
+                records in the table cache
+            cache_dir (str): directory of the table cache
+            num_workers (int): number of worker processes used to scan
+                metrics files
+
+        Returns:
+            pd.DataFrame: one row per sampled metric record. Columns:
+            "capture_id", "annotation_id", "sequence_id", "step",
+            "metric_definition", "values".
+        """
+        records = sample_records(
+            glob(data_root, cls.FILE_PATTERN),
+            cls.TABLE_NAME,
+            version,
+            size,
+            seed=seed,
+            cache=open_cache(data_root, use_cache, cache_dir),
+            num_workers=num_workers,
+        )
+
+        return pd.DataFrame(records)
+
+    def refresh(self):
+        """Pick up metrics files that were added or changed since loading.
+
+        Files are compared with the path, size and modification time they
+        had when they were loaded. The metrics bag is rebuilt from the
+        current files. If the metrics were ingested, the rows of changed and
+        removed files are dropped from the partitions and only the new and
+        changed files are read and appended, in memory or in the table
+        cache.
+
+        Returns:
+            list: paths of the files that were added or changed.
+        """
+        stats = file_stats(glob(self._data_root, self.FILE_PATTERN))
+        if stats == self._files:
+            return []
+        loaded = {path: (size, mtime) for path, size, mtime in self._files}
+        updated = [
+            path
+            for path, size, mtime in stats
+            if loaded.get(path) != (size, mtime)
+        ]
+        old_key = stats_fingerprint(self._files, self._version)
+        self._files = stats
+        self.metrics = self._load_metrics(
+            self._data_root, self._version, self._streaming
         )
-        if metrics.count().compute() == 0:
-            msg = (
-                f"Can't find metrics records associated with the given "
-                f"definition id {def_id}."
+
+        if self._partitions is not None:
+            partitions, ingested = self._partitions, self._ingested
+        elif self._cache is not None:
+            partitions, ingested = self._load_partitions(old_key)
+            if partitions is None:
+                return updated
+        else:
+            return updated
+
+        current = [path for path, _, _ in stats]
+        keep = ingested["path"].isin(current) & ~ingested["path"].isin(updated)
+        new_partitions, new_ingested = self._ingest_files(updated)
+        result = {}
+        for def_id in dict.fromkeys([*partitions, *new_partitions]):
+            parts = []
+            if def_id in partitions:
+                rows = ingested["metric_definition"] == def_id
+                mask = np.repeat(keep[rows], ingested["rows"][rows])
+                parts.append(partitions[def_id][mask.to_numpy()])
+            if def_id in new_partitions:
+                parts.append(new_partitions[def_id])
+            table = pd.concat(parts, ignore_index=True)
+            if len(table):
+                result[def_id] = table
+        ingested = pd.concat([ingested[keep], new_ingested], ignore_index=True)
+
+        if self._partitions is not None:
+            self._partitions, self._ingested = result, ingested
+        else:
+            key = stats_fingerprint(stats, self._version)
+            self._save_partitions(key, result, ingested)
+
+        return updated
+
+    def _ingest_files(self, files):
+        """Normalize the metrics of files into one table per definition.
+
+        Args:
+            files (list): paths of the metrics files
+
+        Returns:
+            A tuple (partitions, ingested). Partitions is a dict of the
+            dataframe of each metric definition that has records, see
+            :meth:`filter_metrics`. Ingested is a dataframe of the number of
+            rows each file has in each partition. Columns: "path",
+            "metric_definition", "rows".
+        """
+        columns = ["path", "metric_definition", "rows"]
+        if not files:
+            return {}, pd.DataFrame(columns=columns)
+
+        verify_versions(files, self._version)
+        load_json = self._records_loader(self._version, self._streaming)
+        grouped = db.from_sequence(files).map(load_json).map(_group_values)
+        values = {}
+        counts = []
+        file_values = grouped.compute(**self._compute_kwargs())
+        for path, definition_values in zip(files, file_values):
+            for def_id, metric_values in definition_values.items():
+                if metric_values:
+                    values.setdefault(def_id, []).extend(metric_values)
+                    counts.append((str(path), def_id, len(metric_values)))
+        partitions = {
+            def_id: pd.DataFrame(metric_values)
+            for def_id, metric_values in values.items()
+        }
+
+        return partitions, pd.DataFrame(counts, columns=columns)
+
+    def _load_partitions(self, key):
+        """Load the ingested partitions from the table cache.
+
+        Returns:
+            A tuple (partitions, ingested), see :meth:`_ingest_files`, or
+            (None, None) if the partitions are not cached for this key.
+        """
+        ingested = self._cache.load(self.PARTITIONS_TABLE_NAME, key)
+        if ingested is None or "path" not in ingested.columns:
+            return None, None
+        partitions = {}
+        for def_id in ingested["metric_definition"].unique():
+            table = self._cache.load(self._cache_name(def_id), key)
+            if table is None:
+                return None, None
+            partitions[def_id] = table
+
+        return partitions, ingested
+
+    def _save_partitions(self, key, partitions, ingested):
+        """Save the ingested partitions to the table cache.
+        """
+        for def_id, table in partitions.items():
+            self._cache.save(self._cache_name(def_id), key, table)
+        self._cache.save(self.PARTITIONS_TABLE_NAME, key, ingested)
+
+    def _cache_key(self):
+        files = glob(self._data_root, self.FILE_PATTERN)
+
+        return fingerprint(files, self._version)
+
+    def _cache_name(self, def_id):
+        return f"{self.TABLE_NAME}.{def_id}"
+
+    def _group_metrics(self, def_ids=None):
+        """Normalize the metrics of each metric definition without caching.
+
+        The metrics bag is computed once. Its records are grouped by metric
+        definition and normalized into one dataframe per definition.
+
+        Args:
+            def_ids (list): metric definition ids to keep. Defaults to all
+                metric definitions.
+
+        Returns:
+            dict: the dataframe of each metric definition that has records.
+        """
+        metrics = self.metrics
+        if def_ids is not None:
+            metrics = metrics.filter(
+                functools.partial(_has_definition, def_ids=set(def_ids))
             )
-            raise DefinitionIDError(msg)
+        grouped = metrics.map_partitions(_group_partition)
+        values = {}
+        for partition in grouped.compute(**self._compute_kwargs()):
+            for def_id, metric_values in partition.items():
+                values.setdefault(def_id, []).extend(metric_values)
 
-        return metrics.to_dataframe().compute()
+        return {
+            def_id: pd.DataFrame(metric_values)
+            for def_id, metric_values in values.items()
+            if metric_values
+        }
+
+    def _compute_kwargs(self):
+        """Scheduler arguments used to compute the metrics bag.
+        """
+        scheduler = self._scheduler
+        if scheduler is None:
+            if self._num_workers is None:
+                return {}
+            if self._num_workers <= 1:
+                return {"scheduler": "synchronous"}
+            scheduler = "processes"
+        if scheduler == "distributed":
+            scheduler = _distributed_client(self._num_workers)
+        if scheduler in ("threads", "processes") and self._num_workers:
+            return {"scheduler": scheduler, "num_workers": self._num_workers}
+
+        return {"scheduler": scheduler}
 
     @staticmethod
     def _load_json(filename, table_name, version):
         """Load records from json files into a dict
         """
-        with open(filename, "r") as file:
-            data = json.load(file)
+        data = json_backend.load(filename)
         verify_version(data, version)
 
         return data[table_name]
+
+
+def _has_definition(metric, def_ids):
+    """Check whether a metric record belongs to one of def_ids.
+    """
+    return metric["metric_definition"] in def_ids
+
+
+def _group_values(metrics):
+    """Group the normalized values of metric records by metric definition.
+    """
+    values = {}
+    for metric in metrics:
+        def_id, metric_values = _definition_values(metric)
+        values.setdefault(def_id, []).extend(metric_values)
+
+    return values
+
+
+def _group_partition(metrics):
+    """Group the values of the metric records of a bag partition.
+    """
+    return [_group_values(metrics)]
+
+
+def _definition_values(metric):
+    """Get the metric definition id and normalized values of a metric record.
+    """
+    return metric["metric_definition"], Metrics._normalize_values(metric)
+
+
+def _distributed_client(num_workers=None):
+    """Get the running dask distributed client, or start a local cluster.
+    """
+    try:
+        import distributed
+    except ImportError:
+        raise ImportError(
+            "dask.distributed is required to use the distributed scheduler. "
+            "Install it with `pip install distributed`."
+        )
+    try:
+        return distributed.get_client()
+    except ValueError:
+        return distributed.Client(n_workers=num_workers)
+
+
+def _check_definitions(def_ids, found):
+    """Raise DefinitionIDError if any of def_ids was not found.
+    """
+    missing = [def_id for def_id in def_ids if def_id not in found]
+    if missing:
+        msg = (
+            f"Can't find metrics records associated with the given "
+            f"definition id {', '.join(str(d) for d in missing)}."
+        )
+        raise DefinitionIDError(msg)
@@ -0,0 +1,140 @@
+""" Object level tables of Synthetic dataset annotations
+
+The values of an annotation, e.g. 2D or 3D bounding boxes or keypoints, are
+a list of objects. :func:`annotation_objects` turns the values of filtered
+annotations into one row per object, with one typed column per field:
+
+    >>> filtered = Captures("/data").filter(def_id="my_definition_id")
+    >>> annotation_objects(filtered)
+          capture_id  annotation_id  label_id  label_name    x    y  width ...
+    0  ace0...          a5a4...            27         car   30   50    100 ...
+
+Objects are gathered and their fields are extracted with builtin iterators
+and numpy, so no Python code runs for each object.
+"""
+import itertools
+import operator
+
+import numpy as np
+import pandas as pd
+
+from .compact import VECTOR_AXES
+
+# Axes of the vectors stored in annotation values.
+OBJECT_VECTOR_AXES = dict(VECTOR_AXES, size=("x", "y", "z"))
+
+
+def annotation_objects(filtered, capture_columns=()):
+    """Flatten the values of annotations into one row per object.
+
+    Fields of the objects become columns, and fields of nested objects
+    become columns named with their path, e.g. ``translation.x``:
+
+    - Numbers become integer or float columns. Missing numbers are NaN.
+    - Lists of numbers of the same length in every object (e.g.
+      translation, size or rotation vectors) become one column per axis,
+      named ``x``, ``y``, ``z`` and ``w`` for vectors of
+      :data:`OBJECT_VECTOR_AXES`, or by position otherwise.
+    - Lists of objects of the same length in every object (e.g. the
+      keypoints of a keypoint template) become columns named by position,
+      e.g. ``keypoints.0.x``.
+    - Other values (e.g. strings, lists of varying length) are kept in
+      object columns.
+
+    Args:
+        filtered (pd.DataFrame): captures and annotations of one annotation
+            definition, see :meth:`Captures.filter`
+        capture_columns (list): other columns of filtered to repeat on the
+            rows of every object, e.g. "filename"
+
+    Returns:
+        pd.DataFrame: one row per object, in the order of filtered.
+        Columns: "capture_id", "annotation_id", capture_columns, then the
+        fields of the objects.
+    """
+    values = filtered["annotation.values"].tolist()
+    if set(map(type, values)) != {list}:
+        # Annotations without values, e.g. segmentation images.
+        values = [v if isinstance(v, list) else [] for v in values]
+    counts = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    records = list(itertools.chain.from_iterable(values))
+
+    columns = {
+        "capture_id": np.repeat(filtered["id"].to_numpy(), counts),
+        "annotation_id": np.repeat(
+            filtered["annotation.id"].to_numpy(), counts
+        ),
+    }
+    for column in capture_columns:
+        columns[column] = np.repeat(filtered[column].to_numpy(), counts)
+    for column, data in _flatten_records(records).items():
+        if column not in columns:
+            columns[column] = data
+
+    return pd.DataFrame(columns)
+
+
+def _present(values):
+    """Find the values that are not None."""
+    return np.fromiter(
+        map(operator.is_not, values, itertools.repeat(None)),
+        dtype=bool,
+        count=len(values),
+    )
+
+
+def _flatten_records(records, prefix=""):
+    """Flatten a list of dicts into a dict of columns."""
+    keys = dict.fromkeys(itertools.chain.from_iterable(map(dict.keys, records)))
+    columns = {}
+    for key in keys:
+        values = list(map(operator.methodcaller("get", key), records))
+        columns.update(_flatten_values(values, prefix + str(key), key))
+
+    return columns
+
+
+def _flatten_values(values, name, key):
+    """Flatten a list of json values into one or more columns."""
+    types = set(map(type, values))
+    if type(None) in types and len(types) > 1:
+        present = _present(values)
+        positions = np.flatnonzero(present)
+        flattened = _flatten_values(
+            list(itertools.compress(values, present)), name, key
+        )
+        return {
+            column: pd.Series(data, index=positions)
+            .reindex(range(len(values)))
+            .to_numpy()
+            for column, data in flattened.items()
+        }
+
+    if types and types <= {int, float}:
+        dtype = np.float64 if float in types else np.int64
+        return {name: np.array(values, dtype=dtype)}
+    if types == {bool}:
+        return {name: np.array(values, dtype=bool)}
+    if types == {dict}:
+        return _flatten_records(values, f"{name}.")
+    if types == {list}:
+        lengths = set(map(len, values))
+        size = lengths.pop() if len(lengths) == 1 else 0
+        elements = set(map(type, itertools.chain.from_iterable(values)))
+        if size and elements <= {int, float}:
+            dtype = np.float64 if float in elements else np.int64
+            vectors = np.array(values, dtype=dtype)
+            axes = OBJECT_VECTOR_AXES.get(key, ())
+            if len(axes) != size:
+                axes = range(size)
+            return {
+                f"{name}.{axis}": vectors[:, i] for i, axis in enumerate(axes)
+            }
+        if size and elements == {dict}:
+            columns = {}
+            for i in range(size):
+                records = list(map(operator.itemgetter(i), values))
+                columns.update(_flatten_records(records, f"{name}.{i}."))
+            return columns
+
+    return {name: pd.Series(values, dtype=object).to_numpy()}
@@ -1,8 +1,11 @@
 """ Load Synthetic dataset references tables
 """
+import functools
+
 import pandas as pd
 
-from .tables import DATASET_TABLES, SCHEMA_VERSION, glob, load_table
+from .cache import load_cached, open_cache
+from .tables import DATASET_TABLES, SCHEMA_VERSION, glob, load_table, map_files
 from .validation import NoRecordError
 
 
@@ -19,17 +22,38 @@ class AnnotationDefinitions:
     TABLE_NAME = "annotation_definitions"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
 
-    def __init__(self, data_root, version=SCHEMA_VERSION):
+    def __init__(
+        self,
+        data_root,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
         """ Initialize AnnotationDefinitions
 
         Args:
             data_root (str): the root directory of the dataset containing
         tables
             version (str): desired schema version
+            use_cache (bool): whether to cache the loaded table on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                files
         """
-        self.table = self.load_annotation_definitions(data_root, version)
-
-    def load_annotation_definitions(self, data_root, version):
+        cache = open_cache(data_root, use_cache, cache_dir)
+        self.table = load_cached(
+            cache,
+            self.TABLE_NAME,
+            glob(data_root, self.FILE_PATTERN),
+            version,
+            lambda: self.load_annotation_definitions(
+                data_root, version, num_workers
+            ),
+        )
+
+    def load_annotation_definitions(self, data_root, version, num_workers=1):
         """Load annotation definition files.
 
         For more detail, see schema design here:
@@ -39,6 +63,8 @@ class AnnotationDefinitions:
             data_root (str): the root directory of the dataset containing
         tables
             version (str): desired schema version
+            num_workers (int): number of worker processes used to parse
+                files
 
         Returns:
             A Pandas dataframe with annotation definition records.
@@ -47,10 +73,12 @@ class AnnotationDefinitions:
             (string describing format), 'spec' ( Format-specific specification
             for the annotation values)
         """
-        definitions = []
-        for def_file in glob(data_root, self.FILE_PATTERN):
-            definition = load_table(def_file, self.TABLE_NAME, version)
-            definitions.append(definition)
+        load = functools.partial(
+            load_table, table_name=self.TABLE_NAME, version=version
+        )
+        definitions = map_files(
+            load, glob(data_root, self.FILE_PATTERN), num_workers
+        )
 
         if definitions:
             combined = pd.concat(definitions, axis=0).drop_duplicates(
@@ -98,16 +126,37 @@ class MetricDefinitions:
     TABLE_NAME = "metric_definitions"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
 
-    def __init__(self, data_root, version=SCHEMA_VERSION):
+    def __init__(
+        self,
+        data_root,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
         """ Initialize MetricDefinitions
         Args:
             data_root (str): the root directory of the dataset containing
         tables
             version (str): desired schema version
+            use_cache (bool): whether to cache the loaded table on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                files
         """
-        self.table = self.load_metric_definitions(data_root, version)
-
-    def load_metric_definitions(self, data_root, version):
+        cache = open_cache(data_root, use_cache, cache_dir)
+        self.table = load_cached(
+            cache,
+            self.TABLE_NAME,
+            glob(data_root, self.FILE_PATTERN),
+            version,
+            lambda: self.load_metric_definitions(
+                data_root, version, num_workers
+            ),
+        )
+
+    def load_metric_definitions(self, data_root, version, num_workers=1):
         """Load metric definition files.
 
         :ref:`metric_definitions.json`
@@ -115,6 +164,8 @@ class MetricDefinitions:
         Args:
             data_root (str): the root directory of the dataset containing tables
             version (str): desired schema version
+            num_workers (int): number of worker processes used to parse
+                files
 
         Returns:
             A Pandas dataframe with metric definition records.
@@ -122,10 +173,12 @@ class MetricDefinitions:
     (id for metric definition), name, description, spec (definition specific
     spec)
         """
-        definitions = []
-        for def_file in glob(data_root, self.FILE_PATTERN):
-            definition = load_table(def_file, self.TABLE_NAME, version)
-            definitions.append(definition)
+        load = functools.partial(
+            load_table, table_name=self.TABLE_NAME, version=version
+        )
+        definitions = map_files(
+            load, glob(data_root, self.FILE_PATTERN), num_workers
+        )
 
         combined = pd.concat(definitions, axis=0).drop_duplicates(subset="id")
 
@@ -165,7 +218,14 @@ class Egos:
     TABLE_NAME = "egos"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
 
-    def __init__(self, data_root, version=SCHEMA_VERSION):
+    def __init__(
+        self,
+        data_root,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
         """Initialize `:ref:Egos`
 
 
@@ -173,10 +233,22 @@ class Egos:
             data_root (str): the root directory of the dataset containing
             ego tables. Two columns: id (ego id) and description
             version (str): desired schema version
+            use_cache (bool): whether to cache the loaded table on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                files
         """
-        self.table = self.load_egos(data_root, version)
-
-    def load_egos(self, data_root, version):
+        cache = open_cache(data_root, use_cache, cache_dir)
+        self.table = load_cached(
+            cache,
+            self.TABLE_NAME,
+            glob(data_root, self.FILE_PATTERN),
+            version,
+            lambda: self.load_egos(data_root, version, num_workers),
+        )
+
+    def load_egos(self, data_root, version, num_workers=1):
         """Load egos files.
         For more detail, see schema design here:
 
@@ -186,15 +258,17 @@ class Egos:
             data_root (str): the root directory of the dataset containing
             ego tables
             version (str): desired schema version
+            num_workers (int): number of worker processes used to parse
+                files
 
         Returns:
             A pandas dataframe with all ego records with two columns: id
             (ego id) and description
         """
-        egos = []
-        for ego_file in glob(data_root, self.FILE_PATTERN):
-            ego = load_table(ego_file, self.TABLE_NAME, version)
-            egos.append(ego)
+        load = functools.partial(
+            load_table, table_name=self.TABLE_NAME, version=version
+        )
+        egos = map_files(load, glob(data_root, self.FILE_PATTERN), num_workers)
         combined = pd.concat(egos, axis=0).drop_duplicates(subset="id")
 
         return combined
@@ -217,17 +291,36 @@ class Sensors:
     TABLE_NAME = "sensors"
     FILE_PATTERN = DATASET_TABLES[TABLE_NAME].file
 
-    def __init__(self, data_root, version=SCHEMA_VERSION):
+    def __init__(
+        self,
+        data_root,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+        num_workers=1,
+    ):
         """ Initialize Sensors
 
         Args:
             data_root (str): the root directory of the dataset containing
         tables
             version (str): desired schema version
+            use_cache (bool): whether to cache the loaded table on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+            num_workers (int): number of worker processes used to parse
+                files
         """
-        self.table = self.load_sensors(data_root, version)
-
-    def load_sensors(self, data_root, version):
+        cache = open_cache(data_root, use_cache, cache_dir)
+        self.table = load_cached(
+            cache,
+            self.TABLE_NAME,
+            glob(data_root, self.FILE_PATTERN),
+            version,
+            lambda: self.load_sensors(data_root, version, num_workers),
+        )
+
+    def load_sensors(self, data_root, version, num_workers=1):
         """Load sensors files.
 
         For more detail, see schema design here:
@@ -238,16 +331,20 @@ class Sensors:
             data_root (str): the root directory of the dataset containing
         tables
             version (str): desired schema version
+            num_workers (int): number of worker processes used to parse
+                files
 
         Returns:
             A pandas dataframe with all sensors records  with columns:
         'id' (sensor id), 'ego_id', 'modality'
         ({camera, lidar, radar, sonar,...} -- Sensor modality), 'description'
         """
-        sensors = []
-        for sensor_file in glob(data_root, self.FILE_PATTERN):
-            sensor = load_table(sensor_file, self.TABLE_NAME, version)
-            sensors.append(sensor)
+        load = functools.partial(
+            load_table, table_name=self.TABLE_NAME, version=version
+        )
+        sensors = map_files(
+            load, glob(data_root, self.FILE_PATTERN), num_workers
+        )
         combined = pd.concat(sensors, axis=0).drop_duplicates(subset="id")
 
         return combined
@@ -0,0 +1,270 @@
+""" Uniform random samples of Synthetic dataset records
+
+A sample is drawn without loading the tables. The records of every file
+are first located, which builds an inventory of the byte offset and length
+of each record. Records are located by scanning the brackets and quotes of
+the file with numpy, so no record is decoded, and the inventory is kept in
+the table cache if it is enabled. A reservoir sample of the inventory is
+then drawn and only the sampled records are decoded:
+
+    >>> files = glob("/data", "**/captures_*.json")
+    >>> records = sample_records(files, "captures", "0.0.1", size=1000)
+"""
+import functools
+import itertools
+import math
+import random
+import re
+
+import numpy as np
+import pandas as pd
+
+from .cache import fingerprint
+from .tables import (
+    DeferredValue,
+    iter_records,
+    load_deferred,
+    map_files,
+    verify_versions,
+)
+
+INVENTORY_COLUMNS = ["file", "offset", "length"]
+
+
+def record_inventory(files, table_name, version, cache=None, num_workers=1):
+    """Locate the records of a table in json files.
+
+    Args:
+        files (list): paths of the json files
+        table_name (str): name of the array of records in the json files
+        version (str): requested schema version of the table
+        cache (TableCache): the table cache. If None, the inventory is
+            built without caching.
+        num_workers (int): number of worker processes used to scan files
+
+    Returns:
+        pd.DataFrame: one row per record, in file order. Columns: "file",
+        "offset" (byte offset of the record in the file), "length" (length
+        of the record in bytes).
+    """
+    files = [str(f) for f in files]
+    name = f"{table_name}.inventory"
+    key = fingerprint(files, version)
+    if cache is not None:
+        inventory = cache.load(name, key)
+        if inventory is not None:
+            return inventory
+
+    locate = functools.partial(
+        _locate_records, table_name=table_name, version=version
+    )
+    located = map_files(locate, files, num_workers)
+    inventory = pd.concat(
+        [pd.DataFrame(columns=INVENTORY_COLUMNS)] + located, ignore_index=True
+    ).astype({"offset": np.int64, "length": np.int64})
+    if cache is not None:
+        cache.save(name, key, inventory)
+
+    return inventory
+
+
+def reservoir_sample(items, size, seed=None):
+    """Draw a uniform random sample of items in a single pass.
+
+    Every subset of ``size`` items is equally likely. Items are not
+    materialized and only a number of random draws proportional to
+    ``size * log(n / size)`` is made (algorithm L of Li, 1994), so the
+    sample of a long iterator is cheap. The sample only depends on the seed
+    and on the order of items.
+
+    Args:
+        items (iterable): the items to sample from
+        size (int): number of items to sample
+        seed (int): seed of the random generator. A sample is reproducible
+            if a seed is given.
+
+    Returns:
+        list: the sampled items, or all items if there are fewer than size.
+        Items are not in their original order.
+    """
+    if size <= 0:
+        return []
+
+    rng = random.Random(seed)
+    items = iter(items)
+    reservoir = list(itertools.islice(items, size))
+    if len(reservoir) < size:
+        return reservoir
+
+    weight = math.exp(math.log(_uniform(rng)) / size)
+    while True:
+        skip = 0
+        if weight < 1:
+            skip = math.floor(math.log(_uniform(rng)) / math.log1p(-weight))
+        item = next(itertools.islice(items, skip, None), _END)
+        if item is _END:
+            return reservoir
+        reservoir[rng.randrange(size)] = item
+        weight *= math.exp(math.log(_uniform(rng)) / size)
+
+
+_END = object()
+
+
+def _uniform(rng):
+    """Draw a number in the open interval (0, 1)."""
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+
+    return value
+
+
+def sample_records(
+    files, table_name, version, size, seed=None, cache=None, num_workers=1
+):
+    """Decode a uniform random sample of the records of a table.
+
+    Args:
+        files (list): paths of the json files
+        table_name (str): name of the array of records in the json files
+        version (str): requested schema version of the table
+        size (int): number of records to sample
+        seed (int): seed of the random generator
+        cache (TableCache): the table cache used to keep the inventory of
+            records, see :func:`record_inventory`
+        num_workers (int): number of worker processes used to scan files
+
+    Returns:
+        list: the sampled records, in file order.
+    """
+    inventory = record_inventory(files, table_name, version, cache, num_workers)
+    rows = sorted(reservoir_sample(range(len(inventory)), size, seed))
+    locations = inventory.iloc[rows]
+
+    return load_deferred(
+        DeferredValue(*location)
+        for location in zip(
+            locations["file"],
+            locations["offset"].tolist(),
+            locations["length"].tolist(),
+        )
+    )
+
+
+def _locate_records(json_file, table_name, version):
+    """Get the inventory of the records of a json file.
+
+    Records are located with :func:`_scan_records`. Files whose records are
+    not all json objects are located by decoding them instead.
+    """
+    verify_versions([json_file], version, num_workers=1)
+    with open(json_file, "rb") as f:
+        data = f.read()
+    located = _scan_records(data, table_name)
+    if located is None:
+        return pd.DataFrame(
+            iter_records(json_file, table_name, version, deferred=True),
+            columns=INVENTORY_COLUMNS,
+        )
+    offsets, lengths = located
+
+    return pd.DataFrame(
+        {"file": str(json_file), "offset": offsets, "length": lengths},
+        columns=INVENTORY_COLUMNS,
+    )
+
+
+# Byte values of the json characters the records are located from. The
+# opening and closing brackets only differ in bit 0x20: "[" is 0x5B and "{"
+# is 0x7B, "]" is 0x5D and "}" is 0x7D.
+_QUOTE, _BACKSLASH, _OBJECT_START, _OBJECT_END = b'"\\{}'
+_CASE_BIT = 0x20
+_JSON_WHITESPACE = b" \t\n\r"
+
+
+def _scan_records(data, table_name):
+    """Locate the object records of the array of table_name in a document.
+
+    Strings are found from the positions of unescaped quotes, and the
+    depth of every bracket outside of strings from the cumulative count of
+    opening and closing brackets. Records are the objects that open and
+    close at the depth of the array. Only numpy operations run per byte and
+    per bracket; no value of the document is decoded.
+
+    Args:
+        data (bytes): the json document
+        table_name (str): name of the array of records, a key of the
+            top-level object
+
+    Returns:
+        A tuple of arrays (offsets, lengths) of the records in bytes, or
+        None if an element of the array is not an object.
+
+    Raises:
+        KeyError: If the document has no array table_name.
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    quotes = np.flatnonzero(chars == _QUOTE)
+    backslashes = np.flatnonzero(chars == _BACKSLASH)
+    if len(backslashes):
+        # A quote is escaped by an odd number of backslashes before it.
+        run_starts = np.maximum.accumulate(
+            np.where(np.diff(backslashes, prepend=-2) != 1, backslashes, 0)
+        )
+        before = np.searchsorted(backslashes, quotes) - 1
+        preceded = (before >= 0) & (backslashes[before] == quotes - 1)
+        run_lengths = quotes - run_starts[before]
+        quotes = quotes[~(preceded & (run_lengths % 2 == 1))]
+
+    folded = chars | _CASE_BIT
+    brackets = np.flatnonzero(
+        (folded == _OBJECT_START) | (folded == _OBJECT_END)
+    )
+    brackets = brackets[np.searchsorted(quotes, brackets) % 2 == 0]
+    opening = folded[brackets] == _OBJECT_START
+    depths = np.cumsum(np.where(opening, 1, -1))
+
+    key = re.compile(
+        rb'"'
+        + re.escape(table_name.encode("utf-8"))
+        + rb'"[ \t\n\r]*:[ \t\n\r]*\['
+    )
+    for match in key.finditer(data):
+        start = match.start()
+        index = np.searchsorted(brackets, start)
+        depth = depths[index - 1] if index > 0 else 0
+        if depth == 1 and np.searchsorted(quotes, start) % 2 == 0:
+            break
+    else:
+        raise KeyError(table_name)
+
+    # The array spans from its opening bracket to the first bracket that
+    # closes back to the depth of the top-level object.
+    first = np.searchsorted(brackets, match.end() - 1)
+    closing = np.flatnonzero(depths[first:] == 1)
+    if not len(closing):
+        # Truncated document
+        return None
+    last = first + closing[0]
+    inside = slice(first + 1, last)
+    positions, opens, after = brackets[inside], opening[inside], depths[inside]
+    is_object = chars[positions] == _OBJECT_START
+    offsets = positions[opens & (after == 3) & is_object]
+    is_object_end = chars[positions] == _OBJECT_END
+    ends = positions[~opens & (after == 2) & is_object_end] + 1
+    if len(offsets) != len(ends):
+        return None
+
+    # Any other element of the array lies between two records, which are
+    # only separated by commas.
+    gaps = b"".join(
+        data[start:stop]
+        for start, stop in zip(
+            [match.end()] + ends.tolist(), offsets.tolist() + [brackets[last]]
+        )
+    )
+    if gaps.translate(None, _JSON_WHITESPACE) != b"," * (len(offsets) - 1):
+        return None
+
+    return offsets, ends - offsets
@@ -0,0 +1,296 @@
+""" Shared tables of a Synthetic dataset
+
+Statistics and visualizations of a dataset read the same tables. A
+:class:`DatasetSession` loads each table of a data root the first time it
+is used and keeps it, so that they are only read once:
+
+    >>> session = get_session("/data")
+    >>> captures = session.filter_captures(def_id="my_definition_id")
+    >>> metrics = session.filter_metrics(def_id="my_definition_id")
+"""
+import os
+import threading
+
+from datasetinsights.constants import DEFAULT_DATA_ROOT
+
+from .captures import Captures
+from .metrics import Metrics
+from .references import AnnotationDefinitions, Egos, MetricDefinitions, Sensors
+from .tables import DATASET_TABLES, SCHEMA_VERSION, glob, verify_versions
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class DatasetSession:
+    """Load the tables of a dataset once and share them
+
+    Tables are loaded the first time they are used and kept until they are
+    invalidated. The metrics of the first metric definition that is
+    filtered are kept. Metrics are ingested when a second definition is
+    filtered, so filtering the metrics of several definitions reads the
+    metrics files twice at most. Filter results are copies, so callers can
+    modify them. The schema version of the files of a table is verified
+    before the table is loaded, so that all mismatched files are reported
+    before any is parsed.
+
+    Attributes:
+        data_root (str): the root directory of the dataset
+        version (str): desired schema version
+
+    Examples:
+        >>> session = DatasetSession(data_root="/data")
+        >>> session.captures.captures  # loads the captures
+        >>> session.filter_captures(def_id="my_definition_id")  # no loading
+        >>> session.invalidate("captures")  # loaded again next time
+    """
+
+    TABLES = {
+        "captures": Captures,
+        "metrics": Metrics,
+        "annotation_definitions": AnnotationDefinitions,
+        "metric_definitions": MetricDefinitions,
+        "egos": Egos,
+        "sensors": Sensors,
+    }
+
+    def __init__(
+        self,
+        data_root=DEFAULT_DATA_ROOT,
+        version=SCHEMA_VERSION,
+        use_cache=False,
+        cache_dir=None,
+    ):
+        """Initialize DatasetSession
+
+        Args:
+            data_root (str): the root directory of the dataset
+            version (str): desired schema version
+            use_cache (bool): whether to cache the loaded tables on disk
+            cache_dir (str): directory of the table cache. Defaults to a
+                ``.datasetinsights_cache`` directory under data_root.
+        """
+        self.data_root = data_root
+        self.version = version
+        self._use_cache = use_cache
+        self._cache_dir = cache_dir
+        self._tables = {}
+        self._verified = set()
+        # Metrics filtered before ingestion, None once metrics are ingested.
+        self._filtered_metrics = {}
+        self._lock = threading.RLock()
+
+    @property
+    def captures(self):
+        """Captures: the captures and annotations of the dataset."""
+        return self.table("captures")
+
+    @property
+    def metrics(self):
+        """Metrics: the metrics of the dataset."""
+        return self.table("metrics")
+
+    @property
+    def annotation_definitions(self):
+        """AnnotationDefinitions: the annotation definitions."""
+        return self.table("annotation_definitions")
+
+    @property
+    def metric_definitions(self):
+        """MetricDefinitions: the metric definitions."""
+        return self.table("metric_definitions")
+
+    @property
+    def egos(self):
+        """Egos: the egos of the dataset."""
+        return self.table("egos")
+
+    @property
+    def sensors(self):
+        """Sensors: the sensors of the dataset."""
+        return self.table("sensors")
+
+    def table(self, name):
+        """Get a table of the dataset, loading it if needed.
+
+        Args:
+            name (str): name of the table, one of :attr:`TABLES`
+
+        Returns:
+            the loaded table, e.g. :class:`Captures` for "captures".
+
+        Raises:
+            ValueError: if the table name is unknown.
+            VersionError: if the version of a table file of the dataset
+                does not match the session version.
+        """
+        if name not in self.TABLES:
+            raise ValueError(
+                f"Unknown table {name}. "
+                f"Supported tables are {', '.join(self.TABLES)}."
+            )
+        with self._lock:
+            if name not in self._tables:
+                self.verify(name)
+                self._tables[name] = self._load(name)
+
+            return self._tables[name]
+
+    def verify(self, *names):
+        """Verify the schema version of the files of tables of the dataset.
+
+        The files of each table are only verified once, see
+        :func:`tables.verify_versions`.
+
+        Args:
+            names (str): names of the tables to verify. All tables are
+                verified if no name is given.
+
+        Raises:
+            VersionError: if the version of a file does not match the
+                session version.
+        """
+        with self._lock:
+            names = [n for n in names or self.TABLES if n not in self._verified]
+            files = [
+                f
+                for name in names
+                for f in glob(self.data_root, DATASET_TABLES[name].file)
+            ]
+            verify_versions(files, self.version)
+            self._verified.update(names)
+
+    def _load(self, name):
+        if name == "metrics":
+            self._filtered_metrics = {}
+
+        return self.TABLES[name](
+            self.data_root,
+            self.version,
+            use_cache=self._use_cache,
+            cache_dir=self._cache_dir,
+        )
+
+    def filter_captures(self, def_id):
+        """Get the captures and annotations of an annotation definition.
+
+        Args:
+            def_id (str): annotation definition id used to filter results
+
+        Returns:
+            pd.DataFrame: see :meth:`Captures.filter`.
+        """
+        return self.captures.filter(def_id)
+
+    def filter_objects(self, def_id, capture_columns=()):
+        """Get the objects of the annotations of an annotation definition.
+
+        Args:
+            def_id (str): annotation definition id used to filter results
+            capture_columns (list): capture columns to repeat on the rows of
+                every object
+
+        Returns:
+            pd.DataFrame: see :meth:`Captures.filter_objects`.
+        """
+        return self.captures.filter_objects(def_id, capture_columns)
+
+    def filter_metrics(self, def_id):
+        """Get the metrics of a metric definition.
+
+        Args:
+            def_id (str): metric definition id used to filter results
+
+        Returns:
+            pd.DataFrame: see :meth:`Metrics.filter_metrics`.
+        """
+        with self._lock:
+            metrics = self.metrics
+            filtered = self._filtered_metrics
+            if filtered is None:
+                return metrics.filter_metrics(def_id)
+            if def_id in filtered:
+                return filtered[def_id].copy()
+            if not filtered:
+                filtered[def_id] = metrics.filter_metrics(def_id)
+                return filtered[def_id].copy()
+
+            metrics.ingest()
+            self._filtered_metrics = None
+
+            return metrics.filter_metrics(def_id)
+
+    def invalidate(self, *names):
+        """Drop loaded tables so that they are loaded again when used.
+
+        The versions of the files of dropped tables are verified again when
+        they are loaded.
+
+        Args:
+            names (str): names of the tables to drop. All tables are dropped
+                if no name is given.
+        """
+        with self._lock:
+            if not names:
+                self._tables.clear()
+                self._verified.clear()
+            for name in names:
+                self._tables.pop(name, None)
+                self._verified.discard(name)
+
+    def refresh(self):
+        """Update the loaded tables with files added or changed since loading.
+
+        Captures and metrics are refreshed in place, see
+        :meth:`Captures.refresh`. The definitions, egos and sensors tables
+        are small and are loaded again when used.
+
+        Returns:
+            list: paths of the files that were added or changed.
+        """
+        updated = []
+        with self._lock:
+            if self._filtered_metrics:
+                self._filtered_metrics = {}
+            for name in list(self._tables):
+                table = self._tables[name]
+                if hasattr(table, "refresh"):
+                    updated.extend(table.refresh())
+                else:
+                    del self._tables[name]
+                    self._verified.discard(name)
+
+        return updated
+
+
+def get_session(data_root=DEFAULT_DATA_ROOT, version=SCHEMA_VERSION, **kwargs):
+    """Get the shared session of a data root.
+
+    Sessions are shared by all callers that use the same data root, schema
+    version and options, e.g. all statistics of a dashboard.
+
+    Args:
+        data_root (str): the root directory of the dataset
+        version (str): desired schema version
+        kwargs: other arguments of :class:`DatasetSession`
+
+    Returns:
+        DatasetSession: the session of this data root.
+    """
+    key = (
+        os.path.abspath(data_root),
+        version,
+        tuple(sorted(kwargs.items())),
+    )
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = DatasetSession(data_root, version, **kwargs)
+
+        return _sessions[key]
+
+
+def close_sessions():
+    """Drop all shared sessions and the tables they loaded.
+    """
+    with _sessions_lock:
+        _sessions.clear()
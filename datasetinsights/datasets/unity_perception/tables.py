@@ -1,15 +1,26 @@
+import functools
 import json
 import logging
 import pathlib
+import queue
+import re
+import threading
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
 
+import numpy as np
 import pandas as pd
 
-from .validation import verify_version
+from . import json_backend
+from .inventory import file_inventory
+from .validation import VersionError, verify_version
 
 logger = logging.getLogger(__name__)
 SCHEMA_VERSION = "0.0.1"  # Synthetic dataset schema version
+STREAM_CHUNK_SIZE = 1 << 20  # Characters read at a time by iter_records
+VERSION_SCAN_SIZE = 4096  # Bytes read at each end of a file by read_version
+VERSION_SCAN_WORKERS = 8  # Threads reading versions in verify_versions
 
 
 class FileType(Enum):
@@ -49,18 +60,110 @@ DATASET_TABLES = {
 def glob(data_root, pattern):
     """Find all matching files in a directory.
 
+    Json files matched in any directory, e.g. "**/captures_*.json", are
+    found with the :func:`inventory.file_inventory` of data_root, which
+    does not walk the data root again. Other patterns are matched by
+    walking the data root.
+
     Args:
         data_root (str): directory containing capture files
         pattern (str): Unix file pattern
 
     Yields:
-        str: matched filenames in a directory
+        str: matched filenames in a directory, in sorted order
     """
+    name_pattern = pattern[len("**/") :]
+    if (
+        pattern.startswith("**/")
+        and name_pattern.endswith(".json")
+        and "/" not in name_pattern
+    ):
+        yield from file_inventory(data_root).glob(name_pattern)
+        return
+
     path = pathlib.Path(data_root)
-    for fp in path.glob(pattern):
+    for fp in sorted(path.glob(pattern)):
         yield fp
 
 
+def map_files(func, files, num_workers=1):
+    """Apply a function to every file, optionally with a process pool.
+
+    Args:
+        func (callable): function applied to each file. It must be picklable
+            (e.g. a module level function or a functools.partial of one)
+            if num_workers is larger than 1.
+        files (iterable): files to be processed
+        num_workers (int): number of worker processes. Files are processed
+            in this process if num_workers is 1.
+
+    Returns:
+        list: the results of func, in the same order as files.
+    """
+    files = list(files)
+    if num_workers <= 1 or len(files) <= 1:
+        return [func(f) for f in files]
+
+    num_workers = min(num_workers, len(files))
+    logger.debug(f"Processing {len(files)} files with {num_workers} workers")
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(func, files))
+
+
+def prefetch(iterable, size=1):
+    """Iterate in a background thread, keeping up to size items ahead.
+
+    The next items (e.g. the tables of the next files) are produced while
+    the current one is consumed. At most size items are waiting at a time,
+    so memory stays bounded. Exceptions raised by the iterable are raised
+    in the consuming thread.
+
+    Args:
+        iterable (iterable): the items to produce in the background
+        size (int): maximum number of items produced ahead
+
+    Yields:
+        the items of iterable, in order.
+    """
+    items = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    end = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put((item, None), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            items.put((end, None))
+        except BaseException as e:
+            items.put((end, e))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        # The consumer stopped early or the iterable failed.
+        stop.set()
+        while thread.is_alive():
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                thread.join(0.1)
+
+
 def load_table(json_file, table_name, version, **kwargs):
     """Load records from json files into a pandas table
 
@@ -79,8 +182,471 @@ def load_table(json_file, table_name, version, **kwargs):
         version.
     """
     logger.debug(f"Loading table {table_name} from {json_file}")
-    data = json.load(open(json_file, "r"))
-    verify_version(data, version)
+    data = load_json(json_file, version)
     table = pd.json_normalize(data[table_name], **kwargs)
 
     return table
+
+
+def load_json(json_file, version):
+    """Load a json file and verify its schema version
+
+    The parsed document can be normalized into more than one table without
+    reading the file again.
+
+    Args:
+        json_file (str): filename to json.
+        version (str): requested version of this file
+
+    Returns:
+        dict: the parsed json document.
+
+    Raises:
+        VersionError: If the version in json file does not match the requested
+        version.
+    """
+    data = json_backend.load(json_file)
+    verify_version(data, version)
+
+    return data
+
+
+def iter_records(
+    json_file, table_name, version, chunk_size=STREAM_CHUNK_SIZE, deferred=None,
+):
+    """Stream the records of a table from a json file one at a time.
+
+    Unlike :func:`load_json`, the whole document is never held in memory:
+    the file is read in chunks and only one record of the table is decoded
+    at a time.
+
+    Values of deferred keys are replaced by a :class:`DeferredValue` that
+    records where the value is stored in the file, so that it can be decoded
+    later with :func:`load_deferred`. For example, ``{"annotations":
+    {"values": True}}`` defers the values of every annotation of a capture
+    record. With ``deferred=True``, whole records are deferred, which
+    locates every record of the table without keeping any of them.
+
+    Args:
+        json_file (str): filename to json.
+        table_name (str): name of the array in the json file to be streamed
+        version (str): requested version of this table
+        chunk_size (int): number of characters read from the file at a time
+        deferred (dict or bool): maps keys of a record to True if their
+            values should be deferred, or to the deferred keys of the
+            objects (or arrays of objects) they hold. True defers records.
+
+    Yields:
+        dict: records of the table, in file order. DeferredValue if
+        deferred is True.
+
+    Raises:
+        VersionError: If the version in json file does not match the requested
+        version. The version is checked as soon as it is read, which is
+        before any record if the version precedes the table in the file.
+        KeyError: If the file has no version or no table_name.
+    """
+    logger.debug(f"Streaming table {table_name} from {json_file}")
+    path = str(json_file)
+    with open(json_file, "r", encoding="utf-8", newline="") as file:
+        stream = _JSONStream(file, chunk_size)
+        decode = None
+        if deferred:
+            decode = functools.partial(
+                stream.decode_deferred,
+                deferred,
+                lambda offset, length: DeferredValue(path, offset, length),
+            )
+        found = False
+        header = {}
+        for key in stream.iter_object():
+            if key == table_name and stream.peek() == "[":
+                found = True
+                yield from stream.iter_array(decode)
+            else:
+                header[key] = stream.decode()
+                if key == "version":
+                    verify_version(header, version)
+
+    verify_version(header, version)
+    if not found:
+        raise KeyError(table_name)
+
+
+def read_version(json_file, scan_size=VERSION_SCAN_SIZE):
+    """Read the schema version of a json file without parsing the file.
+
+    The version is read from the first bytes of the file if it is the first
+    key of the document, as written by the Perception package, or from the
+    last bytes if it is the last key, e.g. when keys are sorted. Otherwise
+    the keys of the document are decoded until the version is found.
+
+    Args:
+        json_file (str): filename to json.
+        scan_size (int): number of bytes read at each end of the file
+
+    Returns:
+        the version of the file, or None if it has no version.
+    """
+    with open(json_file, "r", encoding="utf-8", newline="") as file:
+        stream = _JSONStream(file, scan_size)
+        keys = stream.iter_object()
+        key = next(keys, None)
+        if key is None:
+            return None
+        if key == "version":
+            return stream.decode()
+
+        with open(json_file, "rb") as tail:
+            tail.seek(0, 2)
+            tail.seek(max(tail.tell() - scan_size, 0))
+            text = tail.read().decode("utf-8", errors="ignore")
+        match = _TRAILING_VERSION.search(text)
+        if match is not None:
+            return json.loads(match.group(1))
+
+        stream.decode()
+        for key in keys:
+            value = stream.decode()
+            if key == "version":
+                return value
+
+    return None
+
+
+_TRAILING_VERSION = re.compile(
+    r'[,{][ \t\n\r]*"version"[ \t\n\r]*:[ \t\n\r]*'
+    r'("(?:[^"\\]|\\.)*")[ \t\n\r]*}[ \t\n\r]*\Z'
+)
+
+
+def verify_versions(files, version, num_workers=VERSION_SCAN_WORKERS):
+    """Verify the schema version of json files before they are loaded.
+
+    Only the version of each file is read, see :func:`read_version`, so
+    files of the wrong version are all reported before any is parsed.
+    Files are read in a thread pool.
+
+    Args:
+        files (iterable): paths of the json files
+        version (str): requested version of the files
+        num_workers (int): number of threads reading files
+
+    Raises:
+        VersionError: If the version of any file does not match the
+        requested version. The message lists the mismatched files.
+    """
+    files = list(files)
+    if num_workers <= 1 or len(files) <= 1:
+        versions = [read_version(f) for f in files]
+    else:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            versions = list(executor.map(read_version, files))
+
+    mismatched = [
+        f"{f} ({loaded})"
+        for f, loaded in zip(files, versions)
+        if loaded != version
+    ]
+    if mismatched:
+        listed = ", ".join(mismatched[:10])
+        if len(mismatched) > 10:
+            listed += f" and {len(mismatched) - 10} more"
+        raise VersionError(
+            f"Version mismatch. Expected version: {version}. "
+            f"Found in {len(mismatched)} of {len(files)} files: {listed}"
+        )
+
+
+class DeferredValue(namedtuple("DeferredValue", ["file", "offset", "length"])):
+    """Location of a json value that has not been decoded yet.
+
+    Attributes:
+        file (str): filename to json
+        offset (int): byte offset of the value in the file
+        length (int): length of the encoded value in bytes
+    """
+
+    __slots__ = ()
+
+    def load(self):
+        """Read and decode the value.
+
+        Returns:
+            the decoded json value.
+        """
+        return load_deferred([self])[0]
+
+
+def load_deferred(values):
+    """Decode deferred json values.
+
+    Values are read file by file in the order they are stored, so that each
+    file is opened once.
+
+    Args:
+        values (iterable): values that may be :class:`DeferredValue`. Other
+            values are returned unchanged.
+
+    Returns:
+        list: the decoded values, in the order of values.
+    """
+    values = list(values)
+    rows_per_file = {}
+    for row, value in enumerate(values):
+        if isinstance(value, DeferredValue):
+            rows_per_file.setdefault(value.file, []).append(row)
+
+    for json_file, rows in rows_per_file.items():
+        rows.sort(key=lambda row: values[row].offset)
+        with open(json_file, "rb") as file:
+            for row in rows:
+                file.seek(values[row].offset)
+                values[row] = json_backend.loads(file.read(values[row].length))
+
+    return values
+
+
+class _JSONStream:
+    """Incremental decoder of a json document read from a text file.
+
+    The file must be opened with ``encoding="utf-8"`` and ``newline=""`` for
+    :meth:`tell` to return byte offsets in the file.
+    """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+    KEY = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+    # Characters that may follow a json value in a document
+    TERMINATORS = ",]}:"
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.scan_once = self.decoder.scan_once
+        self.buffer = ""
+        self.pos = 0
+        # Byte offset in the file of the buffer position self.mark
+        self.offset = 0
+        self.mark = 0
+
+    def _read(self, size):
+        """Append the next characters of the file to the buffer.
+
+        The part of the buffer that was already decoded is dropped.
+
+        Returns:
+            bool: False if the end of the file was reached.
+        """
+        self.tell()
+        chunk = self.file.read(size)
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        self.mark = 0
+
+        return bool(chunk)
+
+    def tell(self):
+        """Return the byte offset of the current position in the file."""
+        self.offset += len(self.buffer[self.mark : self.pos].encode("utf-8"))
+        self.mark = self.pos
+
+        return self.offset
+
+    def peek(self):
+        """Skip whitespace and return the next character, "" at the end."""
+        while True:
+            buffer = self.buffer
+            self.pos = self.WHITESPACE.match(buffer, self.pos).end()
+            if self.pos < len(buffer):
+                return buffer[self.pos]
+            if not self._read(self.chunk_size):
+                return ""
+
+    def expect(self, characters):
+        """Consume the next character, which must be one of characters."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(
+                f"Expecting one of {characters!r}", self.buffer, self.pos
+            )
+        self.pos += 1
+
+        return character
+
+    def decode(self):
+        """Decode the next json value."""
+        buffer = self.buffer
+        pos = self.WHITESPACE.match(buffer, self.pos).end()
+        try:
+            value, end = self.scan_once(buffer, pos)
+        except (StopIteration, json.JSONDecodeError):
+            # Invalid or truncated at the end of the buffer.
+            pass
+        else:
+            if self._terminated(buffer, end):
+                self.pos = end
+                return value
+
+        self.peek()
+        while True:
+            # Read at least as much as is buffered so that values larger
+            # than a chunk are decoded in a logarithmic number of attempts.
+            size = max(self.chunk_size, len(self.buffer) - self.pos)
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._read(size):
+                    continue
+                raise
+            if not self._terminated(self.buffer, end) and self._read(size):
+                continue
+            self.pos = end
+
+            return value
+
+    def _terminated(self, buffer, end):
+        """Check whether a value decoded up to end is complete.
+
+        A number cut off by the end of the buffer is decoded as its longest
+        valid prefix, e.g. ``0`` from ``0.`` or ``1`` from ``1e``. The value
+        is only complete if it is followed by a terminator in the buffer.
+        """
+        if end < len(buffer) and buffer[end] in self.TERMINATORS:
+            return True
+        end = self.WHITESPACE.match(buffer, end).end()
+
+        return end < len(buffer) and buffer[end] in self.TERMINATORS
+
+    def decode_deferred(self, deferred, defer):
+        """Decode the next json value without decoding deferred keys.
+
+        Args:
+            deferred (dict or bool): deferred keys, see :func:`iter_records`.
+                True defers the whole value.
+            defer (callable): called with the byte offset and length of the
+                value of a deferred key. It returns the value stored for
+                that key.
+        """
+        if deferred is True:
+            self.peek()
+            start = self.tell()
+            self.decode()
+
+            return defer(start, self.tell() - start)
+
+        character = self.peek()
+        if character == "[":
+            decode = functools.partial(self.decode_deferred, deferred, defer)
+            return list(self.iter_array(decode))
+        if character != "{":
+            return self.decode()
+
+        value = {}
+        for key in self.iter_object():
+            nested = deferred.get(key)
+            if nested:
+                value[key] = self.decode_deferred(nested, defer)
+            else:
+                value[key] = self.decode()
+
+        return value
+
+    def iter_array(self, decode=None):
+        """Decode the elements of the next json array one at a time.
+
+        Args:
+            decode (callable): decodes one element. Defaults to decode.
+        """
+        decode = decode or self.decode
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield decode()
+            if self.expect(",]") == "]":
+                return
+
+    def iter_object(self):
+        """Iterate over the keys of the next json object.
+
+        The value of each key must be consumed before the next key is read.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            yield self._key()
+            if self.expect(",}") == "}":
+                return
+
+    def _key(self):
+        """Decode the next object key and the colon that follows it."""
+        match = self.KEY.match(self.buffer, self.pos)
+        if match is None or match.end() == len(self.buffer):
+            # The key may continue in the file, or is not a string.
+            key = self.decode()
+            self.expect(":")
+            self.peek()
+
+            return key
+
+        self.pos = match.end()
+        key = match.group(1)
+        if "\\" in key:
+            key = self.decoder.decode(f'"{key}"')
+
+        return key
+
+
+class ColumnBuilder:
+    """Build a pandas dataframe column by column from records.
+
+    Records are appended one at a time and only their values are kept, so
+    the records can be discarded as soon as they are appended. The result
+    is the same as ``pd.DataFrame(records)``: columns are ordered by first
+    appearance and missing values are filled with NaN.
+
+    Examples:
+        >>> builder = ColumnBuilder()
+        >>> builder.append({"id": "a", "step": 1})
+        >>> builder.append({"id": "b"})
+        >>> builder.to_frame()
+          id  step
+        0  a   1.0
+        1  b   NaN
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.num_rows = 0
+
+    def __len__(self):
+        return self.num_rows
+
+    def append(self, record):
+        """Append a record as a new row.
+
+        Args:
+            record (dict): mapping of column names to values
+        """
+        for key, value in record.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [np.nan] * self.num_rows
+            column.append(value)
+        self.num_rows += 1
+        if len(record) < len(self.columns):
+            for column in self.columns.values():
+                if len(column) < self.num_rows:
+                    column.append(np.nan)
+
+    def to_frame(self):
+        """Build the dataframe of all appended records.
+
+        Returns:
+            pd.DataFrame: one row per appended record.
+        """
+        return pd.DataFrame(self.columns)
@@ -1,7 +1,9 @@
-from .bbox import BBox2D
+from .bbox import BBox2D, BBox2DArray, BBox3DArray
 from .downloader import create_dataset_downloader
 
 __all__ = [
     "BBox2D",
+    "BBox2DArray",
+    "BBox3DArray",
     "create_dataset_downloader",
 ]
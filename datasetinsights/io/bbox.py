@@ -1,8 +1,12 @@
 import math
 
 import numpy as np
+import pandas as pd
 from pyquaternion import Quaternion
 
+# Number of box pairs whose IoU is computed at a time by iou_matrix
+IOU_CHUNK_SIZE = 1 << 20
+
 
 def group_bbox2d_per_label(bboxes):
     """Group 2D bounding boxes with same label.
@@ -172,6 +176,545 @@ class BBox2D:
         return iou
 
 
+class BBox2DArray:
+    """Collection of 2D bounding boxes stored in arrays.
+
+    Each attribute of the boxes is stored in one NumPy array, so that the
+    geometry of many boxes is computed at once instead of box by box with
+    :class:`BBox2D`.
+
+    Attributes:
+        label (np.ndarray): labels of the boxes
+        x (np.ndarray): x pixel coordinates of the upper left corners
+        y (np.ndarray): y pixel coordinates of the upper left corners
+        w (np.ndarray): widths of the boxes
+        h (np.ndarray): heights of the boxes
+        score (np.ndarray): detection confidence scores
+
+    Examples:
+        >>> boxes = BBox2DArray.from_bboxes(
+        ...     [BBox2D("car", 2, 6, 2, 4), BBox2D("bus", 0, 0, 10, 8, 0.5)]
+        ... )
+        >>> boxes.area
+        array([ 8., 80.])
+        >>> boxes.filter(min_score=0.8).to_bboxes()
+        [label=car|score=1.00|x=2.00|y=6.00|w=2.00|h=4.00]
+    """
+
+    def __init__(self, label, x, y, w, h, score=None):
+        """ Initialize 2D bounding box array
+
+        Args:
+            label (array-like): labels of the boxes
+            x (array-like): x pixel coordinates of the upper left corners
+            y (array-like): y pixel coordinates of the upper left corners
+            w (array-like): widths of the boxes
+            h (array-like): heights of the boxes
+            score (array-like): detection confidence scores. Defaults to 1
+                for every box, as for ground truth boxes.
+
+        Raises:
+            ValueError: if the arrays don't have the same length.
+        """
+        self.label = np.asarray(label)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.w = np.asarray(w, dtype=np.float64)
+        self.h = np.asarray(h, dtype=np.float64)
+        if score is None:
+            score = np.ones(len(self.x))
+        self.score = np.asarray(score, dtype=np.float64)
+        lengths = {len(a) for a in self._arrays()}
+        if len(lengths) > 1:
+            raise ValueError(
+                "Labels, coordinates and scores of boxes must have the "
+                f"same length. Found lengths {sorted(lengths)}."
+            )
+
+    @classmethod
+    def from_bboxes(cls, bboxes):
+        """Create an array from a list of boxes.
+
+        Args:
+            bboxes (list[BBox2D]): the boxes
+
+        Returns:
+            BBox2DArray: the boxes, in the same order.
+        """
+        return cls(
+            label=[b.label for b in bboxes],
+            x=[b.x for b in bboxes],
+            y=[b.y for b in bboxes],
+            w=[b.w for b in bboxes],
+            h=[b.h for b in bboxes],
+            score=[b.score for b in bboxes],
+        )
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame,
+        label="label_id",
+        x="x",
+        y="y",
+        w="width",
+        h="height",
+        score=None,
+    ):
+        """Create an array from the columns of a table of boxes.
+
+        The default column names are those of the objects of 2D bounding
+        box annotations of a Synthetic dataset, see
+        ``Captures.filter_objects``.
+
+        Args:
+            frame (pd.DataFrame): table with one row per box
+            label (str): column of the labels
+            x (str): column of the x coordinates
+            y (str): column of the y coordinates
+            w (str): column of the widths
+            h (str): column of the heights
+            score (str): column of the scores. Scores are 1 if None.
+
+        Returns:
+            BBox2DArray: the boxes, in the order of the rows.
+        """
+        return cls(
+            label=frame[label].to_numpy(),
+            x=frame[x].to_numpy(),
+            y=frame[y].to_numpy(),
+            w=frame[w].to_numpy(),
+            h=frame[h].to_numpy(),
+            score=None if score is None else frame[score].to_numpy(),
+        )
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """Join arrays of boxes into one array.
+
+        Args:
+            arrays (list[BBox2DArray]): the arrays to join
+
+        Returns:
+            BBox2DArray: the boxes of every array, in order.
+        """
+        arrays = list(arrays)
+        if not arrays:
+            return cls([], [], [], [], [])
+
+        return cls(
+            *(
+                np.concatenate(columns)
+                for columns in zip(*map(cls._arrays, arrays))
+            )
+        )
+
+    def to_bboxes(self):
+        """Convert the array to a list of boxes.
+
+        Returns:
+            list[BBox2D]: the boxes, in the same order.
+        """
+        return [
+            BBox2D(label=label, x=x, y=y, w=w, h=h, score=score)
+            for label, x, y, w, h, score in zip(
+                *(a.tolist() for a in self._arrays())
+            )
+        ]
+
+    def _arrays(self):
+        return self.label, self.x, self.y, self.w, self.h, self.score
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        """Select boxes.
+
+        Args:
+            index: an integer, a slice, an array of indices or a boolean
+                mask of the boxes
+
+        Returns:
+            BBox2D for an integer index, BBox2DArray otherwise.
+        """
+        if isinstance(index, (int, np.integer)):
+            label, x, y, w, h, score = (a[index].item() for a in self._arrays())
+            return BBox2D(label=label, x=x, y=y, w=w, h=h, score=score)
+
+        return BBox2DArray(*(a[index] for a in self._arrays()))
+
+    def __repr__(self):
+        return f"BBox2DArray({len(self)} boxes)"
+
+    @property
+    def area(self):
+        """np.ndarray: width x height of every box."""
+        return self.w * self.h
+
+    @property
+    def xyxy(self):
+        """np.ndarray: (x1, y1, x2, y2) corners of every box, shape (n, 4).
+        """
+        return np.stack([self.x, self.y, self.x + self.w, self.y + self.h], 1)
+
+    def clip(self, width, height):
+        """Clip the boxes to an image.
+
+        Args:
+            width (float): width of the image in pixels
+            height (float): height of the image in pixels
+
+        Returns:
+            BBox2DArray: the part of every box inside the image. Boxes
+            outside the image have a width or height of 0.
+        """
+        x1 = np.clip(self.x, 0, width)
+        y1 = np.clip(self.y, 0, height)
+        x2 = np.clip(self.x + self.w, 0, width)
+        y2 = np.clip(self.y + self.h, 0, height)
+
+        return BBox2DArray(self.label, x1, y1, x2 - x1, y2 - y1, self.score)
+
+    def scale(self, sx, sy=None):
+        """Scale the coordinates of the boxes, e.g. when resizing an image.
+
+        Args:
+            sx (float): horizontal scale factor
+            sy (float): vertical scale factor. Defaults to sx.
+
+        Returns:
+            BBox2DArray: the scaled boxes.
+        """
+        if sy is None:
+            sy = sx
+
+        return BBox2DArray(
+            self.label,
+            self.x * sx,
+            self.y * sy,
+            self.w * sx,
+            self.h * sy,
+            self.score,
+        )
+
+    def filter(self, labels=None, min_score=None):
+        """Select boxes by label and score.
+
+        Args:
+            labels (list): labels of the boxes to keep. Boxes of every label
+                are kept if None.
+            min_score (float): minimum score of the boxes to keep
+
+        Returns:
+            BBox2DArray: the selected boxes, in the same order.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if labels is not None:
+            mask &= np.isin(self.label, list(labels))
+        if min_score is not None:
+            mask &= self.score >= min_score
+
+        return self[mask]
+
+
+def iter_iou_chunks(boxes, other, chunk_size=IOU_CHUNK_SIZE):
+    """Compute the IoU of every pair of boxes, a block of rows at a time.
+
+    Only one block of about chunk_size pairs is held in memory at a time,
+    so the IoU of large sets of boxes can be reduced (e.g. to the best
+    match of each box) without holding the whole matrix.
+
+    The IoU of two boxes is the same as :meth:`BBox2D.iou`. It is 0 if
+    the boxes don't overlap or if their union is empty.
+
+    Args:
+        boxes (BBox2DArray or list[BBox2D]): the N boxes of the rows
+        other (BBox2DArray or list[BBox2D]): the M boxes of the columns
+        chunk_size (int): number of pairs computed at a time
+
+    Yields:
+        tuple: (start, iou) where iou is the float array of shape (rows, M)
+        of the boxes ``start`` to ``start + rows`` of boxes.
+    """
+    boxes = _as_bbox2d_array(boxes)
+    other = _as_bbox2d_array(other)
+    rows = max(1, chunk_size // max(1, len(other)))
+    xyxy = boxes.xyxy[:, None, :]
+    area = boxes.area[:, None]
+    for start in range(0, len(boxes), rows):
+        stop = start + rows
+        iou = _iou(xyxy[start:stop], area[start:stop], other.xyxy, other.area)
+
+        yield start, iou
+
+
+def iou_matrix(boxes, other, chunk_size=IOU_CHUNK_SIZE, dtype=np.float64):
+    """Compute the IoU of every pair of boxes of two collections.
+
+    This replaces calling :meth:`BBox2D.iou` in a double loop. The matrix
+    is computed in blocks of rows, see :func:`iter_iou_chunks`, so that
+    the intermediate arrays are bounded by chunk_size.
+
+    Args:
+        boxes (BBox2DArray or list[BBox2D]): the N boxes of the rows
+        other (BBox2DArray or list[BBox2D]): the M boxes of the columns
+        chunk_size (int): number of pairs computed at a time
+        dtype (np.dtype): dtype of the matrix, e.g. np.float32 to halve
+            the memory of large matrices
+
+    Returns:
+        np.ndarray: the N x M matrix of the IoU of ``boxes[i]`` and
+        ``other[j]``.
+    """
+    boxes = _as_bbox2d_array(boxes)
+    other = _as_bbox2d_array(other)
+    matrix = np.empty((len(boxes), len(other)), dtype=dtype)
+    for start, iou in iter_iou_chunks(boxes, other, chunk_size):
+        matrix[start : start + len(iou)] = iou
+
+    return matrix
+
+
+def iou_matrix_per_label(boxes, other, chunk_size=IOU_CHUNK_SIZE):
+    """Compute the IoU matrices of the boxes of each label.
+
+    Boxes are grouped by label, as in :func:`group_bbox2d_per_label`, and
+    only pairs of boxes with the same label are computed.
+
+    Args:
+        boxes (BBox2DArray or list[BBox2D]): the boxes of the rows, e.g.
+            predictions
+        other (BBox2DArray or list[BBox2D]): the boxes of the columns,
+            e.g. ground truths
+        chunk_size (int): number of pairs computed at a time
+
+    Returns:
+        dict: a dictionary of the matrix of each label found in boxes or
+        other. {label: (rows, columns, iou)}, where rows and columns are
+        the positions of the boxes of the label in boxes and other, and
+        iou is their IoU matrix.
+    """
+    boxes = _as_bbox2d_array(boxes)
+    other = _as_bbox2d_array(other)
+    rows_per_label = _positions_per_label(boxes.label)
+    columns_per_label = _positions_per_label(other.label)
+    empty = np.zeros(0, dtype=np.int64)
+    matrices = {}
+    for label in {**rows_per_label, **columns_per_label}:
+        rows = rows_per_label.get(label, empty)
+        columns = columns_per_label.get(label, empty)
+        iou = iou_matrix(boxes[rows], other[columns], chunk_size)
+        matrices[label] = (rows, columns, iou)
+
+    return matrices
+
+
+def non_max_suppression(boxes, iou_threshold=0.5, groups=None, max_boxes=None):
+    """Select the boxes that are not suppressed by a higher scored box.
+
+    Boxes are visited in order of decreasing score, and a box is dropped if
+    its IoU with a box already selected is larger than iou_threshold. Only
+    boxes with the same label, and the same group if groups are given,
+    suppress each other, so the predictions of many images can be
+    suppressed at once by grouping them by image.
+
+    All groups are processed together: each round selects the highest
+    scored remaining box of every group and drops the boxes of the group it
+    suppresses. The number of rounds is the largest number of boxes
+    selected in a group.
+
+    Args:
+        boxes (BBox2DArray or list[BBox2D]): the boxes, e.g. predictions
+        iou_threshold (float): boxes overlapping a selected box of the same
+            label and group with a larger IoU are dropped
+        groups (array-like): group of every box, e.g. its capture id
+        max_boxes (int): maximum number of boxes selected per label and
+            group
+
+    Returns:
+        np.ndarray: positions of the selected boxes in boxes, in order of
+        decreasing score.
+    """
+    boxes = _as_bbox2d_array(boxes)
+    keys = _group_keys(boxes.label, groups)
+    order = np.lexsort((-boxes.score, keys))
+    keys = keys[order]
+    xyxy = boxes.xyxy[order]
+    area = boxes.area[order]
+
+    selected = []
+    remaining = np.arange(len(boxes))
+    while len(remaining) and (max_boxes is None or len(selected) < max_boxes):
+        # Remaining boxes stay sorted, so the first of a key is its best box.
+        new_key = np.diff(keys[remaining], prepend=-1) != 0
+        heads = remaining[new_key]
+        selected.append(heads)
+        head = heads[np.cumsum(new_key) - 1]
+        iou = _iou(xyxy[remaining], area[remaining], xyxy[head], area[head])
+        remaining = remaining[(iou <= iou_threshold) & ~new_key]
+
+    if not selected:
+        return np.zeros(0, dtype=np.int64)
+    selected = order[np.concatenate(selected)]
+
+    return selected[np.argsort(-boxes.score[selected], kind="stable")]
+
+
+def greedy_match(
+    predictions,
+    ground_truth,
+    iou_thresholds=0.5,
+    prediction_groups=None,
+    ground_truth_groups=None,
+):
+    """Match predicted boxes to ground truth boxes.
+
+    In order of decreasing score, each prediction is matched to the
+    unmatched ground truth box of the same label (and group) that it
+    overlaps most, if their IoU reaches the threshold. This is the matching
+    of the COCO evaluation.
+
+    All groups are matched together: round r matches the r-th highest
+    scored prediction of every group, comparing it only with the ground
+    truth boxes of its group. The number of rounds is the largest number of
+    predictions of a group.
+
+    Args:
+        predictions (BBox2DArray or list[BBox2D]): the predicted boxes
+        ground_truth (BBox2DArray or list[BBox2D]): the ground truth boxes
+        iou_thresholds (float or list): IoU threshold of a match, or a list
+            of thresholds that are matched independently
+        prediction_groups (array-like): group of every prediction, e.g. its
+            capture id
+        ground_truth_groups (array-like): group of every ground truth box.
+            Required if prediction_groups is given.
+
+    Returns:
+        np.ndarray: position in ground_truth of the box matched to every
+        prediction, or -1 if it is not matched. The shape is (predictions,)
+        for one threshold and (predictions, thresholds) for a list.
+    """
+    predictions = _as_bbox2d_array(predictions)
+    ground_truth = _as_bbox2d_array(ground_truth)
+    thresholds = np.atleast_1d(np.asarray(iou_thresholds, dtype=np.float64))
+    num_predictions = len(predictions)
+    if prediction_groups is not None:
+        groups = np.concatenate(
+            [np.asarray(prediction_groups), np.asarray(ground_truth_groups)]
+        )
+    else:
+        groups = None
+    keys = _group_keys(
+        np.concatenate([predictions.label, ground_truth.label]), groups
+    )
+    pred_order = np.lexsort((-predictions.score, keys[:num_predictions]))
+    gt_order = np.argsort(keys[num_predictions:], kind="stable")
+    pred_keys = keys[:num_predictions][pred_order]
+    gt_keys = keys[num_predictions:][gt_order]
+    pred_xyxy = predictions.xyxy[pred_order]
+    pred_area = predictions.area[pred_order]
+    gt_xyxy = ground_truth.xyxy[gt_order]
+    gt_area = ground_truth.area[gt_order]
+
+    gt_starts = np.searchsorted(gt_keys, pred_keys, side="left")
+    gt_counts = np.searchsorted(gt_keys, pred_keys, side="right") - gt_starts
+    new_key = np.diff(pred_keys, prepend=-1) != 0
+    ranks = np.arange(num_predictions) - np.maximum.accumulate(
+        np.where(new_key, np.arange(num_predictions), 0)
+    )
+    by_rank = np.argsort(ranks, kind="stable")
+    rank_bounds = np.cumsum(np.bincount(ranks, minlength=1))
+
+    matches = np.full((num_predictions, len(thresholds)), -1, dtype=np.int64)
+    taken = np.zeros((len(thresholds), len(ground_truth)), dtype=bool)
+    for start, stop in zip(np.append(0, rank_bounds[:-1]), rank_bounds):
+        active = by_rank[start:stop]
+        active = active[gt_counts[active] > 0]
+        if not len(active):
+            continue
+        counts = gt_counts[active]
+        segments = np.cumsum(counts) - counts
+        pair_pred = np.repeat(active, counts)
+        pair_gt = np.arange(counts.sum()) + np.repeat(
+            gt_starts[active] - segments, counts
+        )
+        iou = _iou(
+            pred_xyxy[pair_pred],
+            pred_area[pair_pred],
+            gt_xyxy[pair_gt],
+            gt_area[pair_gt],
+        )
+        candidates = np.where(taken[:, pair_gt], -1.0, iou)
+        best_iou = np.maximum.reduceat(candidates, segments, axis=1)
+        is_best = candidates == np.repeat(best_iou, counts, axis=1)
+        best = np.minimum.reduceat(
+            np.where(is_best, np.arange(len(pair_gt)), len(pair_gt)),
+            segments,
+            axis=1,
+        )
+        t, a = np.nonzero(best_iou >= thresholds[:, None])
+        matched = pair_gt[best[t, a]]
+        taken[t, matched] = True
+        matches[active[a], t] = gt_order[matched]
+
+    result = np.empty_like(matches)
+    result[pred_order] = matches
+    if np.ndim(iou_thresholds) == 0:
+        return result[:, 0]
+
+    return result
+
+
+def _iou(xyxy, area, other_xyxy, other_area):
+    """Compute the IoU of boxes given by their corners and areas.
+
+    The arrays are broadcast, so that boxes are either compared pairwise
+    or element by element.
+    """
+    width = np.minimum(xyxy[..., 2], other_xyxy[..., 2]) - np.maximum(
+        xyxy[..., 0], other_xyxy[..., 0]
+    )
+    height = np.minimum(xyxy[..., 3], other_xyxy[..., 3]) - np.maximum(
+        xyxy[..., 1], other_xyxy[..., 1]
+    )
+    intersection = np.clip(width, 0, None) * np.clip(height, 0, None)
+    union = area + other_area - intersection
+
+    return np.divide(
+        intersection, union, out=np.zeros_like(intersection), where=union > 0,
+    )
+
+
+def _group_keys(labels, groups=None):
+    """Number every distinct (group, label) pair, ordered by group first."""
+    label_codes, label_values = pd.factorize(labels)
+    keys = label_codes.astype(np.int64)
+    if groups is not None:
+        group_codes, _ = pd.factorize(np.asarray(groups))
+        keys = keys + group_codes.astype(np.int64) * max(len(label_values), 1)
+
+    return keys
+
+
+def _positions_per_label(labels):
+    """Group the positions of labels by label, in order of first appearance.
+    """
+    codes, unique = pd.factorize(labels)
+    positions = np.argsort(codes, kind="stable")
+    positions = positions[codes[positions] >= 0]
+    groups = np.split(positions, np.cumsum(np.bincount(codes[positions]))[:-1])
+
+    return dict(zip(unique.tolist(), groups))
+
+
+def _as_bbox2d_array(boxes):
+    if isinstance(boxes, BBox2DArray):
+        return boxes
+
+    return BBox2DArray.from_bboxes(list(boxes))
+
+
 class BBox3D:
     """
     Class for 3d bounding boxes which can either be predictions or
@@ -309,3 +852,243 @@ class BBox3D:
             ]
         )
         return x
+
+
+# Signs of the (width, height, length) offsets of the corners of a 3D box
+# from its center, in the order of BBox3D.p.
+BBOX3D_CORNER_SIGNS = np.array(
+    [
+        [-1, -1, -1],
+        [-1, -1, 1],
+        [1, -1, 1],
+        [1, -1, -1],
+        [-1, 1, -1],
+        [-1, 1, 1],
+        [1, 1, 1],
+        [1, 1, -1],
+    ],
+    dtype=np.float64,
+)
+
+
+class BBox3DArray:
+    """Collection of 3D bounding boxes stored in arrays.
+
+    The translations, sizes and rotations of the boxes are stored in
+    (n, 3) and (n, 4) arrays, so that the corners of all boxes are computed
+    with one batched product of rotation matrices instead of eight
+    quaternion rotations per :class:`BBox3D`.
+
+    Attributes:
+        label (np.ndarray): labels of the boxes
+        translation (np.ndarray): centers of the boxes, shape (n, 3)
+        size (np.ndarray): (width, height, length) of the boxes, shape
+            (n, 3)
+        rotation (np.ndarray): rotations of the boxes as (w, x, y, z)
+            quaternions, the order of ``Quaternion.elements``, shape (n, 4)
+        score (np.ndarray): detection confidence scores
+        sample_token (np.ndarray): sample tokens of the boxes
+
+    Examples:
+        >>> boxes = BBox3DArray.from_bboxes(bboxes)
+        >>> boxes.corners  # shape (len(bboxes), 8, 3)
+    """
+
+    def __init__(
+        self,
+        label,
+        translation,
+        size,
+        rotation=None,
+        score=None,
+        sample_token=None,
+    ):
+        """ Initialize 3D bounding box array
+
+        Args:
+            label (array-like): labels of the boxes
+            translation (array-like): centers of the boxes, shape (n, 3)
+            size (array-like): (width, height, length) of the boxes, shape
+                (n, 3)
+            rotation (array-like): rotations of the boxes as (w, x, y, z)
+                quaternions, shape (n, 4). Defaults to no rotation.
+            score (array-like): detection confidence scores. Defaults to 1
+                for every box, as for ground truth boxes.
+            sample_token (array-like): sample tokens of the boxes. Defaults
+                to 0 for every box.
+
+        Raises:
+            ValueError: if the arrays don't have the same length.
+        """
+        self.label = np.asarray(label)
+        count = len(self.label)
+        self.translation = np.asarray(translation, dtype=np.float64).reshape(
+            -1, 3
+        )
+        self.size = np.asarray(size, dtype=np.float64).reshape(-1, 3)
+        if rotation is None:
+            rotation = np.tile([1.0, 0.0, 0.0, 0.0], (count, 1))
+        self.rotation = np.asarray(rotation, dtype=np.float64).reshape(-1, 4)
+        if score is None:
+            score = np.ones(count)
+        self.score = np.asarray(score, dtype=np.float64)
+        if sample_token is None:
+            sample_token = np.zeros(count, dtype=np.int64)
+        self.sample_token = np.asarray(sample_token)
+        lengths = {len(a) for a in self._arrays()}
+        if len(lengths) > 1:
+            raise ValueError(
+                "Labels, translations, sizes, rotations, scores and sample "
+                f"tokens of boxes must have the same length. Found lengths "
+                f"{sorted(lengths)}."
+            )
+
+    @classmethod
+    def from_bboxes(cls, bboxes):
+        """Create an array from a list of boxes.
+
+        Args:
+            bboxes (list[BBox3D]): the boxes
+
+        Returns:
+            BBox3DArray: the boxes, in the same order.
+        """
+        return cls(
+            label=[b.label for b in bboxes],
+            translation=[b.translation for b in bboxes],
+            size=[b.size for b in bboxes],
+            rotation=[b.rotation.elements for b in bboxes],
+            score=[b.score for b in bboxes],
+            sample_token=[b.sample_token for b in bboxes],
+        )
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame,
+        label="label_id",
+        translation="translation",
+        size="size",
+        rotation="rotation",
+        score=None,
+        sample_token=None,
+    ):
+        """Create an array from the columns of a table of boxes.
+
+        Vectors are read from one column per axis, e.g. ``translation.x``,
+        as in the objects of 3D bounding box annotations of a Synthetic
+        dataset, see ``Captures.filter_objects``. Rotations are read from
+        the ``x``, ``y``, ``z`` and ``w`` columns.
+
+        Args:
+            frame (pd.DataFrame): table with one row per box
+            label (str): column of the labels
+            translation (str): prefix of the translation columns
+            size (str): prefix of the size columns
+            rotation (str): prefix of the rotation columns
+            score (str): column of the scores. Scores are 1 if None.
+            sample_token (str): column of the sample tokens, e.g.
+                "capture_id". Sample tokens are 0 if None.
+
+        Returns:
+            BBox3DArray: the boxes, in the order of the rows.
+        """
+
+        def vectors(prefix, axes):
+            return frame[[f"{prefix}.{axis}" for axis in axes]].to_numpy()
+
+        return cls(
+            label=frame[label].to_numpy(),
+            translation=vectors(translation, "xyz"),
+            size=vectors(size, "xyz"),
+            rotation=vectors(rotation, "wxyz"),
+            score=None if score is None else frame[score].to_numpy(),
+            sample_token=(
+                None if sample_token is None else frame[sample_token].to_numpy()
+            ),
+        )
+
+    def to_bboxes(self):
+        """Convert the array to a list of boxes.
+
+        Returns:
+            list[BBox3D]: the boxes, in the same order.
+        """
+        return [
+            BBox3D(
+                translation=translation,
+                size=size,
+                label=label,
+                sample_token=sample_token,
+                score=score,
+                rotation=Quaternion(rotation),
+            )
+            for (
+                label,
+                translation,
+                size,
+                rotation,
+                score,
+                sample_token,
+            ) in zip(*(a.tolist() for a in self._arrays()))
+        ]
+
+    def _arrays(self):
+        return (
+            self.label,
+            self.translation,
+            self.size,
+            self.rotation,
+            self.score,
+            self.sample_token,
+        )
+
+    def __len__(self):
+        return len(self.label)
+
+    def __getitem__(self, index):
+        """Select boxes.
+
+        Args:
+            index: an integer, a slice, an array of indices or a boolean
+                mask of the boxes
+
+        Returns:
+            BBox3D for an integer index, BBox3DArray otherwise.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self[index : index + 1 or None].to_bboxes()[0]
+
+        return BBox3DArray(*(a[index] for a in self._arrays()))
+
+    def __repr__(self):
+        return f"BBox3DArray({len(self)} boxes)"
+
+    @property
+    def rotation_matrices(self):
+        """np.ndarray: rotation matrices of the boxes, shape (n, 3, 3).
+
+        Quaternions are normalized first, as by ``Quaternion.rotate``.
+        """
+        norm = np.linalg.norm(self.rotation, axis=1, keepdims=True)
+        w, x, y, z = (self.rotation / np.where(norm > 0, norm, 1)).T
+        matrices = [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+            [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+            [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+        ]
+
+        return np.moveaxis(np.array(matrices), -1, 0)
+
+    @property
+    def corners(self):
+        """np.ndarray: the 8 corners of every box, shape (n, 8, 3).
+
+        Corners are in the order of :attr:`BBox3D.p`: the bottom four
+        corners, then the top four corners, both in counterclockwise order
+        (from birds eye view) beginning with the back-left corner.
+        """
+        local = BBOX3D_CORNER_SIGNS * (self.size[:, None, :] / 2)
+        rotated = np.matmul(local, self.rotation_matrices.transpose(0, 2, 1))
+
+        return rotated + self.translation[:, None, :]
@@ -1,3 +1,4 @@
+from .detection import evaluate_detections
 from .statistics import RenderedObjectInfo
 from .visualization.plots import (
     bar_plot,
@@ -12,6 +13,7 @@ from .visualization.plots import (
 
 __all__ = [
     "bar_plot",
+    "evaluate_detections",
     "grid_plot",
     "histogram_plot",
     "plot_bboxes",
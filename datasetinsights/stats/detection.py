@@ -0,0 +1,231 @@
+""" Evaluation of 2D object detection models
+
+:func:`evaluate_detections` computes the COCO-style average precision (AP)
+and average recall (AR) of predicted 2D bounding boxes against the ground
+truth of a Synthetic dataset:
+
+    >>> ground_truth = get_session("/data").filter_captures(def_id)
+    >>> metrics = evaluate_detections(ground_truth, predictions)
+    >>> metrics["AP"].mean()  # mAP
+    >>> metrics["AP50"].mean()  # mAP@IOU50
+    >>> metrics["AR"].mean()  # mAR
+
+The per-label metrics can be drawn with
+:func:`~datasetinsights.stats.visualization.plots.model_performance_box_plot`.
+"""
+import functools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from datasetinsights.datasets.unity_perception.objects import annotation_objects
+from datasetinsights.io.bbox import BBox2DArray, greedy_match
+
+COCO_IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+RECALL_THRESHOLDS = np.linspace(0.0, 1.0, 101)
+MAX_DETECTIONS = 100  # Predictions per capture and label that are evaluated
+CAPTURES_PER_TASK = 1000  # Captures matched at a time by a worker process
+
+# Boxes sorted by key, which orders them by capture and label.
+_Boxes = namedtuple("_Boxes", ["key", "boxes"])
+
+
+def evaluate_detections(
+    ground_truth,
+    predictions,
+    iou_thresholds=COCO_IOU_THRESHOLDS,
+    max_detections=MAX_DETECTIONS,
+    num_workers=1,
+):
+    """Compute the average precision and recall of predicted 2D boxes.
+
+    Predictions are matched to the ground truth of the same capture and
+    label as in the COCO evaluation, see :func:`bbox.greedy_match`. Crowd
+    annotations and area ranges are not supported. Precision and recall are
+    accumulated over all captures for each label and IoU threshold. AP is
+    the mean of the 101-point interpolated precision, and AR is the recall
+    reached with at most max_detections predictions per capture.
+
+    Args:
+        ground_truth (pd.DataFrame): the 2D bounding boxes of the dataset,
+            either the result of :meth:`Captures.filter` or an object table
+            of :meth:`Captures.filter_objects`. Columns: "capture_id",
+            "label_id", "x", "y", "width", "height".
+        predictions (pd.DataFrame): the predicted boxes, one row per box.
+            Columns: the columns of the ground truth object table and
+            "score".
+        iou_thresholds (list): IoU thresholds of a match. Defaults to the
+            COCO thresholds 0.5, 0.55, ..., 0.95.
+        max_detections (int): number of the highest scored predictions of
+            each capture and label that are evaluated
+        num_workers (int): number of worker processes matching boxes.
+            Boxes are matched in this process if num_workers is 1.
+
+    Returns:
+        pd.DataFrame: the metrics of every label, indexed by "label_id".
+        Columns: "AP" and "AR" (averaged over IoU thresholds), "AP50",
+        "AP55", ... (AP of each IoU threshold, which is named in percent),
+        "ground_truths" and "predictions" (number of boxes). AP and AR are
+        fractions in [0, 1], and NaN for labels without ground truth.
+    """
+    if "annotation.values" in ground_truth.columns:
+        ground_truth = annotation_objects(ground_truth)
+    thresholds = np.asarray(iou_thresholds, dtype=np.float64)
+
+    captures, _ = pd.factorize(
+        pd.concat(
+            [ground_truth["capture_id"], predictions["capture_id"]],
+            ignore_index=True,
+        )
+    )
+    labels, label_ids = pd.factorize(
+        pd.concat(
+            [ground_truth["label_id"], predictions["label_id"]],
+            ignore_index=True,
+        )
+    )
+    num_labels = max(len(label_ids), 1)
+    keys = captures.astype(np.int64) * num_labels + labels
+    split = len(ground_truth)
+    gt = _sorted_boxes(ground_truth, keys[:split], labels[:split])
+    pred = _sorted_boxes(predictions, keys[split:], labels[split:], "score")
+    num_predictions = np.bincount(pred.boxes.label, minlength=num_labels)
+    pred = _top_boxes(pred, max_detections)
+
+    match = functools.partial(_match_boxes, thresholds=thresholds)
+    tasks = _split_captures(gt, pred, num_labels * CAPTURES_PER_TASK)
+    if num_workers <= 1 or len(tasks) <= 1:
+        matched = [match(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            matched = list(executor.map(match, *zip(*tasks)))
+
+    metrics = _accumulate(
+        matched,
+        num_ground_truths=np.bincount(gt.boxes.label, minlength=num_labels),
+        num_predictions=num_predictions,
+        thresholds=thresholds,
+    )
+    metrics.index = pd.Index(label_ids, name="label_id")
+
+    return metrics
+
+
+def _sorted_boxes(table, keys, labels, score=None):
+    """Sort boxes by key, and by decreasing score within a key."""
+    boxes = BBox2DArray(
+        labels,
+        table["x"].to_numpy(),
+        table["y"].to_numpy(),
+        table["width"].to_numpy(),
+        table["height"].to_numpy(),
+        None if score is None else table[score].to_numpy(),
+    )
+    order = np.lexsort((-boxes.score, keys))
+
+    return _Boxes(keys[order], boxes[order])
+
+
+def _top_boxes(boxes, count):
+    """Keep the count highest scored sorted boxes of every key."""
+    positions = np.arange(len(boxes.key))
+    new_key = np.diff(boxes.key, prepend=-1) != 0
+    ranks = positions - np.maximum.accumulate(np.where(new_key, positions, 0))
+    top = ranks < count
+
+    return _Boxes(boxes.key[top], boxes.boxes[top])
+
+
+def _split_captures(gt, pred, keys_per_task):
+    """Split sorted boxes into tasks of consecutive captures."""
+    if len(gt.key) == 0 and len(pred.key) == 0:
+        return []
+    stop = max(gt.key.max(initial=0), pred.key.max(initial=0)) + 1
+    bounds = np.arange(0, stop + keys_per_task, keys_per_task)
+    gt_bounds = np.searchsorted(gt.key, bounds)
+    pred_bounds = np.searchsorted(pred.key, bounds)
+    tasks = []
+    for g0, g1, p0, p1 in zip(
+        gt_bounds[:-1], gt_bounds[1:], pred_bounds[:-1], pred_bounds[1:]
+    ):
+        if p1 > p0:
+            tasks.append(
+                (
+                    _Boxes(gt.key[g0:g1], gt.boxes[g0:g1]),
+                    _Boxes(pred.key[p0:p1], pred.boxes[p0:p1]),
+                )
+            )
+
+    return tasks
+
+
+def _match_boxes(gt, pred, thresholds):
+    """Match the predictions of each capture and label to ground truth.
+
+    Returns:
+        A tuple (labels, scores, matched) of the predictions. matched is a
+        boolean array of shape (predictions, thresholds).
+    """
+    matches = greedy_match(
+        pred.boxes,
+        gt.boxes,
+        thresholds,
+        prediction_groups=pred.key,
+        ground_truth_groups=gt.key,
+    )
+
+    return pred.boxes.label, pred.boxes.score, matches >= 0
+
+
+def _accumulate(matched, num_ground_truths, num_predictions, thresholds):
+    """Compute the precision and recall of each label over all captures."""
+    num_labels = len(num_ground_truths)
+    ap = np.full((num_labels, len(thresholds)), np.nan)
+    ar = np.full((num_labels, len(thresholds)), np.nan)
+    ar[num_ground_truths > 0] = 0.0
+    ap[num_ground_truths > 0] = 0.0
+    if matched:
+        labels, scores, hits = map(np.concatenate, zip(*matched))
+        order = np.lexsort((-scores, labels))
+        labels, hits = labels[order], hits[order]
+        starts = np.flatnonzero(np.diff(labels, prepend=-1))
+        stops = np.append(starts[1:], len(labels))
+        for start, stop in zip(starts, stops):
+            label = labels[start]
+            if num_ground_truths[label] == 0:
+                continue
+            ap[label], ar[label] = _precision_recall(
+                hits[start:stop], num_ground_truths[label]
+            )
+
+    columns = {"AP": ap.mean(axis=1), "AR": ar.mean(axis=1)}
+    for i, threshold in enumerate(thresholds):
+        columns[f"AP{round(threshold * 100)}"] = ap[:, i]
+    columns["ground_truths"] = num_ground_truths
+    columns["predictions"] = num_predictions
+
+    return pd.DataFrame(columns)
+
+
+def _precision_recall(hits, num_ground_truths):
+    """Compute the AP and recall of predictions sorted by decreasing score.
+
+    Returns:
+        A tuple of arrays (ap, recall) with one value per threshold.
+    """
+    true_positives = np.cumsum(hits, axis=0)
+    false_positives = np.cumsum(~hits, axis=0)
+    recall = true_positives / num_ground_truths
+    precision = true_positives / (true_positives + false_positives)
+    # Interpolated precision: the best precision at any higher recall.
+    precision = np.maximum.accumulate(precision[::-1], axis=0)[::-1]
+
+    ap = np.zeros(hits.shape[1])
+    for t in range(hits.shape[1]):
+        rows = np.searchsorted(recall[:, t], RECALL_THRESHOLDS, side="left")
+        reached = rows < len(recall)
+        ap[t] = precision[rows[reached], t].sum() / len(RECALL_THRESHOLDS)
+
+    return ap, recall[-1]
@@ -1,7 +1,7 @@
 import logging
 
 import datasetinsights.constants as const
-from datasetinsights.datasets.unity_perception import MetricDefinitions, Metrics
+from datasetinsights.datasets.unity_perception import get_session
 from datasetinsights.datasets.unity_perception.tables import SCHEMA_VERSION
 
 logger = logging.getLogger(__name__)
@@ -38,6 +38,10 @@ class RenderedObjectInfo:
         capture_id  count
             qwerty     10
             asdfgh     21
+        #share the loaded tables with other statistics of the dataset
+        >>> session = get_session(data_root)
+        >>> roinfo = RenderedObjectInfo(data_root, definition_id,
+        ...                             session=session)
     """
 
     LABEL = "label_id"
@@ -51,6 +55,7 @@ class RenderedObjectInfo:
         data_root=const.DEFAULT_DATA_ROOT,
         version=SCHEMA_VERSION,
         def_id=None,
+        session=None,
     ):
         """Initialize RenderedObjectInfo
 
@@ -58,9 +63,16 @@ class RenderedObjectInfo:
             data_root (str): root directory where the dataset was stored
             version (str): synthetic dataset schema version
             def_id (str): rendered object info definition id
+            session (DatasetSession): session the dataset tables are read
+                from. Defaults to the shared session of data_root, see
+                :func:`get_session`.
         """
-        filtered_metrics = Metrics(data_root, version).filter_metrics(def_id)
-        label_mappings = self._read_label_mappings(data_root, version, def_id)
+        if session is None:
+            session = get_session(data_root, version)
+        filtered_metrics = session.filter_metrics(def_id)
+        label_mappings = self._read_label_mappings(
+            session.metric_definitions, def_id
+        )
         self.raw_table = self._read_filtered_metrics(
             filtered_metrics, label_mappings
         )
@@ -74,20 +86,17 @@ class RenderedObjectInfo:
         return self.raw_table[self.INDEX_COLUMN].nunique()
 
     @staticmethod
-    def _read_label_mappings(data_root, version, def_id):
+    def _read_label_mappings(metric_definitions, def_id):
         """Read label_mappings from a metric_definition record.
 
         Args:
-            data_root (str): root directory where the dataset was stored
-            version (str): synthetic dataset schema version
+            metric_definitions (MetricDefinitions): the metric definitions
             def_id (str): rendered object info definition id
 
         Returns:
             dict: The mappings of {label_id: label_name}
         """
-        definition = MetricDefinitions(data_root, version).get_definition(
-            def_id
-        )
+        definition = metric_definitions.get_definition(def_id)
         name = RenderedObjectInfo.LABEL
         readable_name = RenderedObjectInfo.LABEL_READABLE
 
@@ -20,15 +20,18 @@ class ScaleFactor:
 
     """
 
-    def __init__(self, data_root):
+    def __init__(self, data_root, session=None):
         """
 
         Args:
             data_root(str): path to the dataset.
+            session(sim.DatasetSession): session the dataset tables are read
+                from. Defaults to the shared session of data_root.
 
         """
-        capture = sim.Captures(data_root)
-        self.captures = capture.filter(
+        if session is None:
+            session = sim.get_session(data_root)
+        self.captures = session.filter_captures(
             def_id=constants.BOUNDING_BOX_2D_DEFINITION_ID
         )
 
@@ -108,11 +111,15 @@ class UserParameter:
 
     Args:
         data_root(str): path to the dataset.
+        session(sim.DatasetSession): session the dataset tables are read
+            from. Defaults to the shared session of data_root.
     """
 
-    def __init__(self, data_root):
-        self.metrics = sim.Metrics(data_root=data_root)
-        self.user_parameter_table = self.metrics.filter_metrics(
+    def __init__(self, data_root, session=None):
+        if session is None:
+            session = sim.get_session(data_root)
+        self.metrics = session.metrics
+        self.user_parameter_table = session.filter_metrics(
             constants.USER_PARAMETERS_DEFINITION_ID
         )
 
@@ -167,13 +174,18 @@ class Lighting:
     X_Y_COLUMNS = ["x_rotation", "y_rotation"]
     COLOR_COLUMNS = ["color.r", "color.g", "color.b", "color.a"]
 
-    def __init__(self, data_root):
+    def __init__(self, data_root, session=None):
         """
         Args:
             data_root(str): path to the dataset.
+            session(sim.DatasetSession): session the dataset tables are read
+                from. Defaults to the shared session of data_root.
 
         """
-        self.metrics = sim.Metrics(data_root=data_root)
+        if session is None:
+            session = sim.get_session(data_root)
+        self.metrics = session.metrics
+        self._session = session
         self.lighting = self._read_lighting_info()
 
     def _read_lighting_info(self):
@@ -184,8 +196,7 @@ class Lighting:
                 and orientation information.
 
         """
-        metrics = self.metrics
-        filtered_metrics = metrics.filter_metrics(
+        filtered_metrics = self._session.filter_metrics(
             constants.LIGHTING_INFO_DEFINITION_ID
         )
         colors = pd.json_normalize(filtered_metrics["color"])
@@ -357,14 +368,19 @@ class ObjectPlacement:
 
     OBJECT_ORIENTATION = ("x_rot", "y_rot", "z_rot")
 
-    def __init__(self, data_root):
+    def __init__(self, data_root, session=None):
         """
 
         Args:
             data_root(str): path to the dataset.
+            session(sim.DatasetSession): session the dataset tables are read
+                from. Defaults to the shared session of data_root.
 
         """
-        self.metrics = sim.Metrics(data_root=data_root)
+        if session is None:
+            session = sim.get_session(data_root)
+        self.metrics = session.metrics
+        self._session = session
         self.rotation = self._read_foreground_placement_info()
 
     def _read_foreground_placement_info(self):
@@ -375,8 +391,7 @@ class ObjectPlacement:
                 orientations.
 
         """
-        metrics = self.metrics
-        filtered_metrics = metrics.filter_metrics(
+        filtered_metrics = self._session.filter_metrics(
             constants.FOREGROUND_PLACEMENT_INFO_DEFINITION_ID
         )
         combined = pd.DataFrame(
@@ -512,10 +527,12 @@ def render_object_detection_layout(data_root):
             lighting statistics for the object.
 
     """
-    user_parameter = UserParameter(data_root)
-    object_placement = ObjectPlacement(data_root)
-    lighting = Lighting(data_root)
-    scale_factor = ScaleFactor(data_root)
+    # All statistics of the dashboard share the tables of the dataset.
+    session = sim.get_session(data_root)
+    user_parameter = UserParameter(data_root, session)
+    object_placement = ObjectPlacement(data_root, session)
+    lighting = Lighting(data_root, session)
+    scale_factor = ScaleFactor(data_root, session)
     object_detection_layout = html.Div(
         [
             html.Div(id="object_detection"),
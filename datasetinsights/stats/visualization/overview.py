@@ -6,6 +6,7 @@ from dash.dependencies import Input, Output
 
 import datasetinsights.stats.statistics as stat
 import datasetinsights.stats.visualization.constants as constants
+from datasetinsights.datasets.unity_perception import get_session
 
 from .app import get_app
 from .plots import bar_plot, histogram_plot
@@ -98,7 +99,9 @@ def html_overview(data_root):
     """
 
     roinfo = stat.RenderedObjectInfo(
-        data_root=data_root, def_id=constants.RENDERED_OBJECT_INFO_DEFINITION_ID
+        data_root=data_root,
+        def_id=constants.RENDERED_OBJECT_INFO_DEFINITION_ID,
+        session=get_session(data_root),
     )
     label_names = roinfo.total_counts()["label_name"].unique()
 
@@ -183,9 +186,11 @@ def update_visible_pixels_figure(label_value, json_data_root):
     Returns:
         plotly.graph_objects.Figure: displays visible pixels distribution.
     """
+    data_root = json.loads(json_data_root)
     roinfo = stat.RenderedObjectInfo(
-        data_root=json.loads(json_data_root),
+        data_root=data_root,
         def_id=constants.RENDERED_OBJECT_INFO_DEFINITION_ID,
+        session=get_session(data_root),
     )
     filtered_roinfo = roinfo.raw_table[
         roinfo.raw_table["label_name"] == label_value
@@ -216,9 +221,11 @@ def update_object_counts_capture_figure(label_value, json_data_root):
     Returns:
         plotly.graph_objects.Figure: displays object count distribution.
     """
+    data_root = json.loads(json_data_root)
     roinfo = stat.RenderedObjectInfo(
-        data_root=json.loads(json_data_root),
+        data_root=data_root,
         def_id=constants.RENDERED_OBJECT_INFO_DEFINITION_ID,
+        session=get_session(data_root),
     )
     filtered_object_count = roinfo.raw_table[
         roinfo.raw_table["label_name"] == label_value
@@ -1,5 +1,9 @@
+import pathlib
+
 import pandas as pd
 
+from datasetinsights.datasets.unity_perception import get_session
+from datasetinsights.datasets.unity_perception.session import close_sessions
 from datasetinsights.stats.statistics import RenderedObjectInfo
 
 
@@ -33,3 +37,20 @@ def test_read_filtered_metrics():
     agg = RenderedObjectInfo._read_filtered_metrics(metrics, mappings)
     agg = agg.reset_index(drop=True)
     pd.testing.assert_frame_equal(agg, expected, check_like=True)
+
+
+def test_rendered_object_info_shares_session():
+    data_root = str(
+        pathlib.Path(__file__).parent.parent / "mock_data" / "simrun"
+    )
+    try:
+        roinfo = RenderedObjectInfo(data_root, def_id=1)
+        session = get_session(data_root)
+
+        assert set(session._tables) == {"metrics", "metric_definitions"}
+        pd.testing.assert_frame_equal(
+            RenderedObjectInfo(data_root, def_id=1).raw_table, roinfo.raw_table
+        )
+        assert session.metrics._partitions is None
+    finally:
+        close_sessions()
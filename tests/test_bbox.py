@@ -1,6 +1,19 @@
 import numpy
+import pandas as pd
+import pytest
+from pyquaternion import Quaternion
 
-from datasetinsights.io.bbox import BBox2D, BBox3D, group_bbox2d_per_label
+from datasetinsights.io.bbox import (
+    BBox2D,
+    BBox2DArray,
+    BBox3D,
+    BBox3DArray,
+    greedy_match,
+    group_bbox2d_per_label,
+    iou_matrix,
+    iou_matrix_per_label,
+    non_max_suppression,
+)
 from datasetinsights.stats.visualization.bbox3d_plot import (
     _project_pt_to_pixel_location,
     _project_pt_to_pixel_location_orthographic,
@@ -19,6 +32,154 @@ def test_group_bbox2d_per_label():
     assert len(bboxes_per_label["pedestrian"]) == count2
 
 
+def test_bbox2d_array():
+    bboxes = [
+        BBox2D(label="car", x=2, y=6, w=2, h=4),
+        BBox2D(label="bus", x=-5, y=0, w=10, h=8, score=0.5),
+        BBox2D(label="car", x=630, y=470, w=20, h=20, score=0.9),
+    ]
+    boxes = BBox2DArray.from_bboxes(bboxes)
+
+    assert len(boxes) == 3
+    assert boxes.to_bboxes() == bboxes
+    assert boxes[1] == bboxes[1]
+    numpy.testing.assert_array_equal(boxes.area, [b.area for b in bboxes])
+    assert boxes.filter(labels=["car"]).to_bboxes() == bboxes[::2]
+    assert boxes.filter(labels=["car"], min_score=0.95).to_bboxes() == [
+        bboxes[0]
+    ]
+    assert boxes.scale(2, 0.5)[0] == BBox2D(label="car", x=4, y=3, w=4, h=2)
+    clipped = boxes.clip(640, 480)
+    numpy.testing.assert_array_equal(
+        clipped.xyxy[1:], [[0, 0, 5, 8], [630, 470, 640, 480]]
+    )
+    assert BBox2DArray.concatenate([boxes[:1], boxes[1:]]).to_bboxes() == bboxes
+    assert len(BBox2DArray.concatenate([])) == 0
+
+    frame = pd.DataFrame(
+        {
+            "label_id": [1, 2],
+            "x": [0, 1],
+            "y": [2, 3],
+            "width": [4, 5],
+            "height": [6, 7],
+        }
+    )
+    assert BBox2DArray.from_frame(frame).to_bboxes() == [
+        BBox2D(label=1, x=0, y=2, w=4, h=6),
+        BBox2D(label=2, x=1, y=3, w=5, h=7),
+    ]
+    with pytest.raises(ValueError):
+        BBox2DArray(["car"], [0, 1], [0], [1], [1])
+
+
+def _random_bboxes(rng, count):
+    return [
+        BBox2D(
+            label=str(rng.choice(["car", "bus", "person"])),
+            x=float(rng.uniform(0, 100)),
+            y=float(rng.uniform(0, 100)),
+            w=float(rng.uniform(1, 30)),
+            h=float(rng.uniform(1, 30)),
+        )
+        for _ in range(count)
+    ]
+
+
+def test_iou_matrix():
+    rng = numpy.random.default_rng(0)
+    bboxes = _random_bboxes(rng, 57) + [BBox2D("car", 200, 200, 0, 0)]
+    other = _random_bboxes(rng, 43) + [BBox2D("car", 200, 200, 1, 1)]
+
+    expected = [[a.iou(b) for b in other] for a in bboxes[:-1]]
+    matrix = iou_matrix(bboxes, BBox2DArray.from_bboxes(other), chunk_size=50)
+    numpy.testing.assert_allclose(matrix[:-1], expected)
+    assert not matrix[-1].any()
+    assert iou_matrix(bboxes, []).shape == (len(bboxes), 0)
+
+    matrices = iou_matrix_per_label(bboxes, other)
+    assert set(matrices) == {"car", "bus", "person"}
+    for label, (rows, columns, iou) in matrices.items():
+        assert [bboxes[i] for i in rows] == group_bbox2d_per_label(bboxes)[
+            label
+        ]
+        assert all(other[j].label == label for j in columns)
+        numpy.testing.assert_allclose(iou, matrix[numpy.ix_(rows, columns)])
+
+
+def _scored_bboxes(rng, count):
+    bboxes = _random_bboxes(rng, count)
+    for box in bboxes:
+        box.score = float(rng.uniform(0, 1))
+
+    return bboxes
+
+
+def test_non_max_suppression():
+    rng = numpy.random.default_rng(1)
+    bboxes = _scored_bboxes(rng, 300)
+    groups = rng.integers(0, 4, len(bboxes))
+
+    selected = non_max_suppression(bboxes, 0.3, groups=groups)
+
+    expected = []
+    for i in sorted(range(len(bboxes)), key=lambda i: -bboxes[i].score):
+        if all(
+            bboxes[i].label != bboxes[j].label
+            or groups[i] != groups[j]
+            or bboxes[i].iou(bboxes[j]) <= 0.3
+            for j in expected
+        ):
+            expected.append(i)
+    assert selected.tolist() == expected
+
+    selected = non_max_suppression(bboxes, 0.3, groups=groups, max_boxes=2)
+    assert len(selected) <= 2 * 3 * 4
+    assert set(selected) <= set(expected)
+    assert len(non_max_suppression([], 0.5)) == 0
+
+
+def test_greedy_match():
+    rng = numpy.random.default_rng(2)
+    ground_truth = _random_bboxes(rng, 100)
+    predictions = _scored_bboxes(rng, 150)
+    gt_groups = rng.integers(0, 5, len(ground_truth))
+    groups = rng.integers(0, 5, len(predictions))
+    thresholds = [0.1, 0.5]
+
+    matches = greedy_match(
+        BBox2DArray.from_bboxes(predictions),
+        ground_truth,
+        thresholds,
+        prediction_groups=groups,
+        ground_truth_groups=gt_groups,
+    )
+
+    for t, threshold in enumerate(thresholds):
+        taken = set()
+        for i in sorted(
+            range(len(predictions)), key=lambda i: -predictions[i].score
+        ):
+            candidates = [
+                (predictions[i].iou(box), -j)
+                for j, box in enumerate(ground_truth)
+                if j not in taken
+                and box.label == predictions[i].label
+                and gt_groups[j] == groups[i]
+            ]
+            best_iou, j = max(candidates, default=(-1, 1))
+            if best_iou >= threshold:
+                taken.add(-j)
+                assert matches[i, t] == -j
+            else:
+                assert matches[i, t] == -1
+    assert (matches[:, 0] >= 0).sum() > (matches[:, 1] >= 0).sum() > 0
+    numpy.testing.assert_array_equal(
+        greedy_match(predictions, ground_truth, 0.1)[:3],
+        greedy_match(predictions, ground_truth, [0.1])[:3, 0],
+    )
+
+
 def test_group_bbox3d():
     bbox = BBox3D(
         label="na", sample_token=0, translation=[0, 0, 0], size=[5, 5, 5]
@@ -43,6 +204,61 @@ def test_group_bbox3d():
     assert blt[2] == blb[2] == brt[2] == brb[2] == -2.5
 
 
+def test_bbox3d_array():
+    rng = numpy.random.default_rng(0)
+    bboxes = [
+        BBox3D(
+            translation=rng.uniform(-10, 10, 3).tolist(),
+            size=rng.uniform(1, 5, 3).tolist(),
+            label=i % 3,
+            sample_token=i,
+            score=float(rng.uniform()),
+            rotation=Quaternion(rng.normal(size=4) * 2),
+        )
+        for i in range(20)
+    ]
+    boxes = BBox3DArray.from_bboxes(bboxes)
+
+    assert len(boxes) == 20
+    numpy.testing.assert_allclose(boxes.corners, [b.p for b in bboxes])
+    numpy.testing.assert_allclose(
+        boxes[3:5].corners, [b.p for b in bboxes[3:5]]
+    )
+    numpy.testing.assert_allclose(boxes[-1].p, bboxes[-1].p)
+    assert boxes[-1].label == bboxes[-1].label
+    assert boxes[-1].sample_token == bboxes[-1].sample_token
+    assert len(boxes[:0].corners) == 0
+
+    unrotated = BBox3DArray([0], [[1, 2, 3]], [[2, 4, 6]])
+    numpy.testing.assert_array_equal(
+        unrotated.corners[0],
+        BBox3D(
+            translation=[1, 2, 3], size=[2, 4, 6], label=0, sample_token=0
+        ).p,
+    )
+
+    frame = pd.DataFrame(
+        {
+            "label_id": [1],
+            "translation.x": [1.0],
+            "translation.y": [2.0],
+            "translation.z": [3.0],
+            "size.x": [2.0],
+            "size.y": [4.0],
+            "size.z": [6.0],
+            "rotation.x": [0.0],
+            "rotation.y": [0.0],
+            "rotation.z": [0.0],
+            "rotation.w": [1.0],
+        }
+    )
+    numpy.testing.assert_array_equal(
+        BBox3DArray.from_frame(frame).corners, unrotated.corners
+    )
+    with pytest.raises(ValueError):
+        BBox3DArray([0, 1], [[0, 0, 0]], [[1, 1, 1]])
+
+
 def test_project_pt_to_pixel_location():
     pt = [0, 0, 0]
     proj = numpy.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
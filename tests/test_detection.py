@@ -0,0 +1,122 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.io.bbox import BBox2D
+from datasetinsights.stats.detection import (
+    COCO_IOU_THRESHOLDS,
+    RECALL_THRESHOLDS,
+    evaluate_detections,
+)
+
+
+def _random_boxes(rng, count, num_captures, score=False):
+    boxes = pd.DataFrame(
+        {
+            "capture_id": rng.integers(0, num_captures, count).astype(str),
+            "label_id": rng.integers(1, 4, count),
+            "x": rng.uniform(0, 50, count),
+            "y": rng.uniform(0, 50, count),
+            "width": rng.uniform(5, 20, count),
+            "height": rng.uniform(5, 20, count),
+        }
+    )
+    if score:
+        boxes["score"] = rng.uniform(0, 1, count)
+
+    return boxes
+
+
+def _bboxes(table):
+    return [
+        BBox2D(row.label_id, row.x, row.y, row.width, row.height)
+        for row in table.itertuples()
+    ]
+
+
+def _reference_ap(ground_truth, predictions, label, threshold):
+    """Match boxes one pair at a time, as in the COCO evaluation."""
+    scores = []
+    hits = []
+    num_ground_truths = (ground_truth["label_id"] == label).sum()
+    for capture_id in predictions["capture_id"].unique():
+        gt = ground_truth[
+            (ground_truth["capture_id"] == capture_id)
+            & (ground_truth["label_id"] == label)
+        ]
+        pred = predictions[
+            (predictions["capture_id"] == capture_id)
+            & (predictions["label_id"] == label)
+        ].sort_values("score", ascending=False, kind="mergesort")
+        taken = set()
+        for pred_box, score in zip(_bboxes(pred), pred["score"]):
+            best, best_iou = None, -1
+            for i, gt_box in enumerate(_bboxes(gt)):
+                iou = pred_box.iou(gt_box)
+                if i not in taken and iou > best_iou:
+                    best, best_iou = i, iou
+            hit = best is not None and best_iou >= threshold
+            if hit:
+                taken.add(best)
+            scores.append(score)
+            hits.append(hit)
+
+    order = np.argsort(-np.array(scores), kind="mergesort")
+    hits = np.array(hits)[order]
+    true_positives = np.cumsum(hits)
+    recall = true_positives / num_ground_truths
+    precision = true_positives / np.arange(1, len(hits) + 1)
+    ap = 0
+    for r in RECALL_THRESHOLDS:
+        reached = precision[recall >= r]
+        ap += reached.max() if len(reached) else 0
+
+    return ap / len(RECALL_THRESHOLDS), recall[-1]
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_evaluate_detections(num_workers, monkeypatch):
+    monkeypatch.setattr("datasetinsights.stats.detection.CAPTURES_PER_TASK", 3)
+    rng = np.random.default_rng(0)
+    ground_truth = _random_boxes(rng, 200, 10)
+    predictions = _random_boxes(rng, 300, 10, score=True)
+    close = ground_truth.sample(150, random_state=0).assign(
+        score=rng.uniform(0, 1, 150), x=lambda t: t["x"] + rng.uniform(-3, 3)
+    )
+    predictions = pd.concat([predictions, close], ignore_index=True)
+
+    metrics = evaluate_detections(
+        ground_truth, predictions, num_workers=num_workers
+    )
+
+    assert sorted(metrics.index) == [1, 2, 3]
+    for label in metrics.index:
+        aps, recalls = zip(
+            *(
+                _reference_ap(ground_truth, predictions, label, threshold)
+                for threshold in COCO_IOU_THRESHOLDS
+            )
+        )
+        assert metrics.loc[label, "AP"] == pytest.approx(np.mean(aps))
+        assert metrics.loc[label, "AP50"] == pytest.approx(aps[0])
+        assert metrics.loc[label, "AP75"] == pytest.approx(aps[5])
+        assert metrics.loc[label, "AR"] == pytest.approx(np.mean(recalls))
+
+
+def test_evaluate_detections_ground_truth():
+    cur_dir = pathlib.Path(__file__).parent.absolute()
+    captures = Captures(str(cur_dir / "mock_data" / "simrun"))
+    ground_truth = captures.filter(4)
+    predictions = captures.filter_objects(4).assign(score=0.9)
+    predictions = pd.concat(
+        [predictions, predictions.assign(label_id=-1, score=0.5)]
+    )
+
+    metrics = evaluate_detections(ground_truth, predictions)
+
+    assert (metrics.drop(-1)[["AP", "AP50", "AR"]] == 1).all(axis=None)
+    assert metrics.loc[-1, ["AP", "AR"]].isna().all()
+    assert metrics.loc[-1, "predictions"] == len(predictions) // 2
@@ -0,0 +1,155 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception import (
+    AnnotationDefinitions,
+    Captures,
+    Metrics,
+    Sensors,
+)
+from datasetinsights.datasets.unity_perception.cache import (
+    TableCache,
+    fingerprint,
+    load_cached,
+)
+from datasetinsights.datasets.unity_perception.exceptions import (
+    DefinitionIDError,
+)
+from datasetinsights.datasets.unity_perception.tables import (
+    SCHEMA_VERSION,
+    DeferredValue,
+)
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def data_root(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+
+    return str(data_root)
+
+
+def test_table_cache_round_trip(tmp_path):
+    json_file = tmp_path / "table.json"
+    json_file.write_text("{}")
+    key = fingerprint([json_file], SCHEMA_VERSION)
+    table = pd.DataFrame(
+        {
+            "id": ["a", "b", None],
+            "step": [1, 2, 3],
+            "sensor": [{"x": [1.0, 2.0]}, {"x": None}, {}],
+            "mixed": [1, "b", None],
+            "values": [[{"x": 1}], None, float("nan")],
+            "deferred": [
+                DeferredValue("a.json", 10, 5),
+                float("nan"),
+                DeferredValue("b.json", 0, 2),
+            ],
+        },
+        index=[0, 1, 0],
+    )
+
+    cache = TableCache(tmp_path / "cache")
+    assert cache.load("table", key) is None
+    cache.save("table", key, table)
+
+    pd.testing.assert_frame_equal(cache.load("table", key), table)
+    assert isinstance(
+        cache.load("table", key)["deferred"].iloc[0], DeferredValue
+    )
+    suffixes = {path.suffix for path in (tmp_path / "cache").iterdir()}
+    assert suffixes == {TableCache.TABLE_SUFFIX, TableCache.MANIFEST_SUFFIX}
+
+
+def test_table_cache_out_of_date(tmp_path):
+    json_file = tmp_path / "table.json"
+    json_file.write_text("{}")
+    cache = TableCache(tmp_path / "cache")
+    key = fingerprint([json_file], SCHEMA_VERSION)
+    cache.save("table", key, pd.DataFrame({"id": ["a"]}))
+
+    json_file.write_text('{"changed": true}')
+    assert cache.load("table", fingerprint([json_file], SCHEMA_VERSION)) is None
+    assert cache.load("table", fingerprint([json_file], "0.0.2")) is None
+
+
+def test_load_cached_without_cache():
+    table = pd.DataFrame({"id": ["a"]})
+
+    assert (
+        load_cached(None, "table", [], SCHEMA_VERSION, lambda: table) is table
+    )
+
+
+def test_cached_captures(data_root):
+    expected = Captures(data_root, SCHEMA_VERSION)
+    Captures(data_root, SCHEMA_VERSION, use_cache=True)
+    assert os.path.isdir(os.path.join(data_root, ".datasetinsights_cache"))
+
+    cached = Captures(data_root, SCHEMA_VERSION, use_cache=True)
+
+    pd.testing.assert_frame_equal(cached.captures, expected.captures)
+    pd.testing.assert_frame_equal(cached.annotations, expected.annotations)
+
+
+def test_cached_references(data_root, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for table_class in [AnnotationDefinitions, Sensors]:
+        expected = table_class(data_root, SCHEMA_VERSION)
+        table_class(data_root, SCHEMA_VERSION, True, cache_dir)
+        cached = table_class(data_root, SCHEMA_VERSION, True, cache_dir)
+
+        pd.testing.assert_frame_equal(cached.table, expected.table)
+
+
+@pytest.mark.parametrize("cache_dirname", [".datasetinsights_cache", "cache"])
+def test_cache_under_data_root(data_root, cache_dirname):
+    cache_dir = os.path.join(data_root, cache_dirname)
+    expected = Sensors(data_root, SCHEMA_VERSION)
+    AnnotationDefinitions(data_root, SCHEMA_VERSION, True, cache_dir)
+    Sensors(data_root, SCHEMA_VERSION, True, cache_dir)
+
+    # Manifests in the cache directory are not mistaken for table files.
+    AnnotationDefinitions(data_root, SCHEMA_VERSION, True, cache_dir)
+    pd.testing.assert_frame_equal(Sensors(data_root).table, expected.table)
+
+
+def test_cached_metrics_invalidated(data_root, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    metrics = Metrics(data_root, SCHEMA_VERSION, True, cache_dir)
+    expected = metrics.filter_metrics(1)
+    pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+
+    metrics_file = os.path.join(data_root, "Dataset", "metrics_000.json")
+    stat = os.stat(metrics_file)
+    os.utime(metrics_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cache = TableCache(cache_dir)
+    assert cache.load("metrics.1", fingerprint([metrics_file], "0.0.1")) is None
+
+
+def test_cached_lazy_captures(data_root):
+    expected = Captures(data_root, SCHEMA_VERSION, lazy=True)
+    Captures(data_root, SCHEMA_VERSION, use_cache=True, lazy=True)
+    cached = Captures(data_root, SCHEMA_VERSION, use_cache=True, lazy=True)
+
+    pd.testing.assert_frame_equal(cached.annotations, expected.annotations)
+    pd.testing.assert_frame_equal(cached.filter(1), expected.filter(1))
+    eager = Captures(data_root, SCHEMA_VERSION, use_cache=True)
+    pd.testing.assert_frame_equal(eager.filter(1), expected.filter(1))
+
+
+def test_ingested_metrics(data_root, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = Metrics(data_root, SCHEMA_VERSION).filter_metrics(1)
+    Metrics(data_root, SCHEMA_VERSION, True, cache_dir).ingest()
+
+    metrics = Metrics(data_root, SCHEMA_VERSION, True, cache_dir)
+    metrics.metrics = None
+    pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+    with pytest.raises(DefinitionIDError):
+        metrics.filter_metrics("bad_definition_id")
@@ -1,15 +1,20 @@
 import collections
 import json
+import shutil
 
+import numpy as np
+import pandas as pd
 import pytest
 
-from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.datasets.unity_perception import Captures, DaskCaptures
 from datasetinsights.datasets.unity_perception.exceptions import (
     DefinitionIDError,
 )
 from datasetinsights.datasets.unity_perception.tables import (
     SCHEMA_VERSION,
+    DeferredValue,
     glob,
+    load_deferred,
 )
 
 
@@ -34,3 +39,307 @@ def test_get_captures_and_annotations(mock_data_base_dir, data_dir_name):
 
     with pytest.raises(DefinitionIDError):
         captures.filter("bad_definition_id")
+
+
+def _expected_tables(data_root):
+    """Build the captures and annotations tables from the parsed files."""
+    captures = []
+    annotations = []
+    for json_file in glob(data_root, Captures.FILE_PATTERN):
+        with open(json_file, "r") as f:
+            records = json.load(f)[Captures.TABLE_NAME]
+        captures.append(
+            pd.DataFrame(
+                [
+                    {k: v for k, v in record.items() if k != "annotations"}
+                    for record in records
+                ]
+            )
+        )
+        annotations.append(
+            pd.DataFrame(
+                [
+                    dict(annotation, **{"capture.id": record["id"]})
+                    for record in records
+                    for annotation in record["annotations"]
+                ]
+            )
+        )
+    annotations = pd.concat(annotations)
+    if annotations.empty:
+        annotations = pd.DataFrame(columns=["capture.id"])
+
+    return pd.concat(captures), annotations
+
+
+@pytest.mark.parametrize(
+    "data_dir_name", ["simrun", "no_annotations_or_metrics"],
+)
+def test_load_captures_and_annotations(mock_data_base_dir, data_dir_name):
+    mock_data_dir = mock_data_base_dir / data_dir_name
+    captures = Captures(str(mock_data_dir), version=SCHEMA_VERSION)
+
+    expected_captures, expected_annotations = _expected_tables(mock_data_dir)
+
+    pd.testing.assert_frame_equal(captures.captures, expected_captures)
+    pd.testing.assert_frame_equal(captures.annotations, expected_annotations)
+    assert "annotations" not in captures.captures.columns
+
+
+def test_parallel_loading(mock_data_dir):
+    expected = Captures(str(mock_data_dir), version=SCHEMA_VERSION)
+    captures = Captures(
+        str(mock_data_dir), version=SCHEMA_VERSION, num_workers=2
+    )
+
+    pd.testing.assert_frame_equal(captures.captures, expected.captures)
+    pd.testing.assert_frame_equal(captures.annotations, expected.annotations)
+
+
+@pytest.mark.parametrize(
+    "data_dir_name", ["simrun", "no_annotations_or_metrics"],
+)
+def test_streaming_loading(mock_data_base_dir, data_dir_name):
+    mock_data_dir = str(mock_data_base_dir / data_dir_name)
+    expected = Captures(mock_data_dir, version=SCHEMA_VERSION)
+    captures = Captures(mock_data_dir, version=SCHEMA_VERSION, streaming=True)
+
+    pd.testing.assert_frame_equal(captures.captures, expected.captures)
+    pd.testing.assert_frame_equal(captures.annotations, expected.annotations)
+
+
+def test_filter_memoized(mock_data_dir):
+    captures = Captures(str(mock_data_dir), version=SCHEMA_VERSION)
+    expected = captures.filter(1)
+    filtered = captures.filter(1)
+    pd.testing.assert_frame_equal(filtered, expected)
+
+    filtered.drop(index=filtered.index, inplace=True)
+    pd.testing.assert_frame_equal(captures.filter(1), expected)
+
+    captures.annotations = captures.annotations[
+        captures.annotations.annotation_definition != 1
+    ]
+    with pytest.raises(DefinitionIDError):
+        captures.filter(1)
+
+
+def test_filter_duplicate_capture_ids():
+    captures = Captures.__new__(Captures)
+    captures.captures = pd.DataFrame(
+        {"id": ["b", "a", "c", "a"], "step": range(4)}
+    )
+    captures.annotations = pd.DataFrame(
+        {
+            "id": ["x", "y", "z", "w"],
+            "annotation_definition": [1, 1, 2, 1],
+            "values": [[1], [2], [3], [4]],
+            "capture.id": ["a", "c", "a", "missing"],
+        }
+    )
+    annotations = (
+        captures.annotations[captures.annotations.annotation_definition == 1]
+        .set_index("capture.id")
+        .add_prefix("annotation.")
+    )
+    expected = (
+        captures.captures.set_index("id")
+        .join(annotations, how="inner")
+        .reset_index()
+        .rename(columns={"index": "id"})
+    )
+
+    pd.testing.assert_frame_equal(captures.filter(1), expected)
+
+
+@pytest.mark.parametrize(
+    "data_dir_name", ["simrun", "no_annotations_or_metrics"],
+)
+def test_lazy_loading(mock_data_base_dir, data_dir_name):
+    mock_data_dir = str(mock_data_base_dir / data_dir_name)
+    expected = Captures(mock_data_dir, version=SCHEMA_VERSION)
+    captures = Captures(mock_data_dir, version=SCHEMA_VERSION, lazy=True)
+
+    pd.testing.assert_frame_equal(captures.captures, expected.captures)
+    annotations = captures.annotations
+    if "values" in annotations.columns:
+        assert any(isinstance(v, DeferredValue) for v in annotations["values"])
+        annotations = annotations.assign(
+            values=load_deferred(annotations["values"])
+        )
+    pd.testing.assert_frame_equal(annotations, expected.annotations)
+
+    for def_id in expected.annotations.get("annotation_definition", []):
+        pd.testing.assert_frame_equal(
+            _sorted(captures.filter(def_id)), _sorted(expected.filter(def_id))
+        )
+
+
+@pytest.mark.parametrize("files_per_partition", [1, 2])
+def test_dask_captures(mock_data_dir, files_per_partition):
+    expected = Captures(str(mock_data_dir), version=SCHEMA_VERSION)
+    captures = DaskCaptures(
+        str(mock_data_dir),
+        version=SCHEMA_VERSION,
+        files_per_partition=files_per_partition,
+    )
+
+    assert captures.captures.npartitions == 2 // files_per_partition
+    pd.testing.assert_frame_equal(
+        captures.captures.compute(), expected.captures
+    )
+    pd.testing.assert_frame_equal(
+        captures.annotations.compute(), expected.annotations
+    )
+    for def_id in expected.annotations.annotation_definition.unique():
+        filtered = captures.filter(def_id).compute()
+        pd.testing.assert_frame_equal(
+            filtered.reset_index(drop=True), expected.filter(def_id)
+        )
+    assert len(captures.filter("bad_definition_id").compute()) == 0
+
+
+def _sorted(table):
+    # Categories of compact tables are not in the same order after a refresh.
+    table = table.apply(
+        lambda c: c.astype(object) if c.dtype.name == "category" else c
+    )
+    order = np.argsort(table["id"].astype(str).to_numpy(), kind="mergesort")
+
+    return table.iloc[order].reset_index(drop=True)
+
+
+def _assert_captures_equal(captures, expected):
+    for table, expected_table in [
+        (captures.captures, expected.captures),
+        (captures.annotations, expected.annotations),
+    ]:
+        pd.testing.assert_frame_equal(_sorted(table), _sorted(expected_table))
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"lazy": True}, {"compact": True}, {"use_cache": True}]
+)
+def test_refresh(mock_data_dir, tmp_path, options):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    dataset = data_root / "Dataset"
+    captures = Captures(str(data_root), SCHEMA_VERSION, **options)
+    assert captures.refresh() == []
+
+    data = json.loads((dataset / "captures_001.json").read_text())
+    for capture in data["captures"]:
+        capture["id"] += "-new"
+    new_file = dataset / "captures_002.json"
+    new_file.write_text(json.dumps(data))
+    assert captures.refresh() == [str(new_file)]
+    _assert_captures_equal(
+        captures, Captures(str(data_root), SCHEMA_VERSION, **options)
+    )
+
+    data["captures"] = data["captures"][:1]
+    new_file.write_text(json.dumps(data))
+    (dataset / "captures_000.json").unlink()
+    assert captures.refresh() == [str(new_file)]
+    expected = Captures(str(data_root), SCHEMA_VERSION, **options)
+    _assert_captures_equal(captures, expected)
+    for def_id in expected.annotations.annotation_definition.unique():
+        pd.testing.assert_frame_equal(
+            _sorted(captures.filter(def_id)), _sorted(expected.filter(def_id))
+        )
+
+
+@pytest.mark.parametrize(
+    "predicates",
+    [
+        {"sequence_ids": ["e96b97cd-8130-4ab4-a105-1b911a6d912b"]},
+        {"sequence_ids": ["bad_sequence_id"]},
+        {"steps": (2, None)},
+        {"steps": (None, 2)},
+        {"sensor_ids": [1, 2]},
+        {"def_ids": [1, 3]},
+        {"steps": (2, 3), "def_ids": [2]},
+    ],
+)
+@pytest.mark.parametrize("options", [{}, {"streaming": True}, {"lazy": True}])
+def test_captures_predicates(mock_data_dir, predicates, options):
+    full = Captures(str(mock_data_dir), SCHEMA_VERSION, **options)
+    captures = Captures(
+        str(mock_data_dir), SCHEMA_VERSION, **options, **predicates
+    )
+
+    mask = pd.Series(True, index=range(len(full.captures)))
+    expected = full.captures.reset_index(drop=True)
+    if "sequence_ids" in predicates:
+        mask &= expected["sequence_id"].isin(predicates["sequence_ids"])
+    if "steps" in predicates:
+        start, stop = predicates["steps"]
+        if start is not None:
+            mask &= expected["step"] >= start
+        if stop is not None:
+            mask &= expected["step"] < stop
+    if "sensor_ids" in predicates:
+        sensor_ids = expected["sensor"].map(lambda s: s["sensor_id"])
+        mask &= sensor_ids.isin(predicates["sensor_ids"])
+    expected = expected[mask.to_numpy()]
+    annotations = full.annotations.reset_index(drop=True)
+    annotations = annotations[annotations["capture.id"].isin(expected["id"])]
+    if "def_ids" in predicates:
+        annotations = annotations[
+            annotations["annotation_definition"].isin(predicates["def_ids"])
+        ]
+
+    # Dtypes can't be inferred if no capture is loaded.
+    pd.testing.assert_frame_equal(
+        captures.captures.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=not expected.empty,
+    )
+    if annotations.empty:
+        assert captures.annotations.empty
+    else:
+        pd.testing.assert_frame_equal(
+            captures.annotations.reset_index(drop=True),
+            annotations.reset_index(drop=True),
+        )
+
+
+def test_captures_predicates_cache(mock_data_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    expected = Captures(str(mock_data_dir), SCHEMA_VERSION)
+
+    Captures(str(mock_data_dir), use_cache=True, cache_dir=cache_dir)
+    filtered = Captures(
+        str(mock_data_dir), use_cache=True, cache_dir=cache_dir, steps=(2, 3)
+    )
+    cached = Captures(str(mock_data_dir), use_cache=True, cache_dir=cache_dir)
+
+    assert len(filtered.captures) == 2
+    assert len(cached.captures) == len(expected.captures)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3])
+@pytest.mark.parametrize(
+    "options", [{}, {"prefetch_files": 0}, {"streaming": False}]
+)
+def test_iter_batches(mock_data_dir, batch_size, options):
+    expected = Captures(str(mock_data_dir), SCHEMA_VERSION).filter(1)
+
+    batches = list(
+        Captures.iter_batches(
+            1, batch_size, str(mock_data_dir), SCHEMA_VERSION, **options
+        )
+    )
+
+    assert [len(b) for b in batches[:-1]] == [batch_size] * (len(batches) - 1)
+    pd.testing.assert_frame_equal(
+        pd.concat(batches, ignore_index=True), expected
+    )
+    dropped = Captures.iter_batches(
+        1, batch_size, str(mock_data_dir), drop_last=True
+    )
+    assert sum(len(b) for b in dropped) == len(expected) - (
+        len(expected) % batch_size
+    )
+    with pytest.raises(DefinitionIDError):
+        list(Captures.iter_batches("bad_definition_id", 1, str(mock_data_dir)))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.datasets.unity_perception.compact import compact_captures
+from datasetinsights.datasets.unity_perception.exceptions import (
+    DefinitionIDError,
+)
+
+
+def test_compact_captures():
+    captures = pd.DataFrame(
+        {
+            "id": ["a", "b"],
+            "sequence_id": ["s", "s"],
+            "sensor": [
+                {"sensor_id": "c", "translation": [1, 2, 3], "scale": 0.5},
+                {"sensor_id": "c", "translation": None, "matrix": [[1]]},
+            ],
+            "filename": ["a.png", "b.png"],
+        }
+    )
+    annotations = pd.DataFrame(
+        {
+            "id": ["x", "y", "z"],
+            "annotation_definition": [1, 2, 1],
+            "capture.id": ["b", "a", "b"],
+        }
+    )
+
+    captures, annotations = compact_captures(captures, annotations)
+
+    assert list(captures.columns) == [
+        "id",
+        "sequence_id",
+        "sensor.sensor_id",
+        "sensor.translation.x",
+        "sensor.translation.y",
+        "sensor.translation.z",
+        "sensor.scale",
+        "sensor.matrix",
+        "filename",
+    ]
+    assert captures["id"].dtype == "category"
+    assert captures["sequence_id"].dtype == "category"
+    assert captures["sensor.sensor_id"].dtype == "category"
+    np.testing.assert_array_equal(
+        captures["sensor.translation.y"], np.array([2, np.nan], np.float32)
+    )
+    np.testing.assert_array_equal(
+        captures["sensor.scale"], np.array([0.5, np.nan], np.float32)
+    )
+    assert captures["sensor.matrix"].tolist() == [None, [[1]]]
+    assert annotations["annotation_definition"].dtype == "category"
+    assert annotations["capture.id"].cat.categories.equals(
+        captures["id"].cat.categories
+    )
+    assert annotations["id"].tolist() == ["x", "y", "z"]
+
+
+def test_compact_filter(mock_data_dir):
+    expected = Captures(str(mock_data_dir))
+    captures = Captures(str(mock_data_dir), compact=True)
+
+    assert captures.captures["sensor.rotation.w"].dtype == np.float32
+    for def_id in expected.annotations.annotation_definition.unique():
+        filtered = captures.filter(def_id)
+        expected_filtered = expected.filter(def_id)
+        assert filtered["id"].astype(str).tolist() == (
+            expected_filtered["id"].tolist()
+        )
+        pd.testing.assert_series_equal(
+            filtered["annotation.values"],
+            expected_filtered["annotation.values"],
+        )
+
+    with pytest.raises(DefinitionIDError):
+        captures.filter("bad_definition_id")
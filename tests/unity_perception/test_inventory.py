@@ -0,0 +1,99 @@
+import os
+import shutil
+import time
+
+from datasetinsights.datasets.unity_perception.cache import (
+    DEFAULT_CACHE_DIRNAME,
+)
+from datasetinsights.datasets.unity_perception.inventory import (
+    FileInventory,
+    file_inventory,
+)
+from datasetinsights.datasets.unity_perception.tables import (
+    DATASET_TABLES,
+    glob,
+)
+
+
+def _age_directories(data_root, seconds=60):
+    """Set the modification time of every directory back by seconds."""
+    mtime = time.time() - seconds
+    for directory, _, _ in os.walk(data_root):
+        os.utime(directory, (mtime, mtime))
+
+
+def test_file_inventory_glob(mock_data_dir):
+    inventory = FileInventory(mock_data_dir)
+
+    for table in DATASET_TABLES.values():
+        expected = sorted(mock_data_dir.glob(table.file))
+        assert inventory.glob(table.file[len("**/") :]) == expected
+        assert list(glob(mock_data_dir, table.file)) == expected
+    assert file_inventory(str(mock_data_dir)) is file_inventory(mock_data_dir)
+
+
+def test_file_inventory_refresh(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    (data_root / "RGB").mkdir()
+    (data_root / "RGB" / "rgb_1.png").write_bytes(b"")
+    cache_dir = data_root / DEFAULT_CACHE_DIRNAME
+    cache_dir.mkdir()
+    (cache_dir / "metric_definitions.json").write_text("{}")
+    _age_directories(data_root)
+    inventory = FileInventory(data_root)
+
+    assert inventory.refresh() == 5
+    assert inventory.refresh() == 0
+    assert inventory.glob("metric_definitions.json") == [
+        data_root / "Dataset" / "metric_definitions.json"
+    ]
+
+    (data_root / "RGB" / "rgb_2.png").write_bytes(b"")
+    new_file = data_root / "Dataset" / "captures_001.json"
+    new_file.write_text("{}")
+    _age_directories(data_root, seconds=30)
+    assert new_file in inventory.glob("captures_*.json")
+    assert inventory.refresh() == 0
+
+    saved = FileInventory(data_root)
+    assert saved.refresh() == 0
+    shutil.rmtree(data_root / "RGB")
+    (data_root / "Dataset" / "captures_001.json").unlink()
+    _age_directories(data_root, seconds=10)
+    assert saved.glob("captures_*.json") == sorted(
+        data_root.glob("**/captures_*.json")
+    )
+    assert saved.refresh() == 0
+
+
+def test_file_inventory_skips_directory_symlinks(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    (data_root / "Dataset" / "loop").symlink_to(data_root)
+    inventory = FileInventory(data_root)
+
+    assert inventory.glob("captures_*.json") == sorted(
+        (data_root / "Dataset").glob("captures_*.json")
+    )
+    assert "Dataset/loop" not in inventory._directories
+
+
+def test_file_inventory_relists_racy_directories(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    _age_directories(data_root, seconds=0)
+    inventory = FileInventory(data_root)
+    num_directories = inventory.refresh()
+
+    # Changed in the same tick as the listing: the mtime is unchanged.
+    mtime_ns = os.stat(data_root / "Dataset").st_mtime_ns
+    new_file = data_root / "Dataset" / "captures_001.json"
+    new_file.write_text("{}")
+    os.utime(data_root / "Dataset", ns=(mtime_ns, mtime_ns))
+
+    assert new_file in inventory.glob("captures_*.json")
+    assert inventory.refresh() == num_directories
+    _age_directories(data_root)
+    assert inventory.refresh() == num_directories
+    assert inventory.refresh() == 0
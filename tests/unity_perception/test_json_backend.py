@@ -0,0 +1,55 @@
+import json
+import math
+
+import pytest
+
+from datasetinsights.datasets.unity_perception import json_backend
+from datasetinsights.datasets.unity_perception.tables import glob
+
+
+@pytest.fixture(autouse=True)
+def reset_backend(monkeypatch):
+    monkeypatch.setattr(json_backend, "_backend", None)
+    monkeypatch.delenv(json_backend.JSON_BACKEND_ENV, raising=False)
+
+
+@pytest.mark.parametrize("backend", json_backend.available_backends())
+def test_load(mock_data_dir, backend):
+    json_backend.set_json_backend(backend)
+
+    for json_file in glob(mock_data_dir, "**/*.json"):
+        with open(json_file, "r") as f:
+            expected = json.load(f)
+
+        assert json_backend.load(json_file) == expected
+
+
+@pytest.mark.parametrize("backend", json_backend.available_backends())
+def test_loads_falls_back_to_stdlib(backend):
+    json_backend.set_json_backend(backend)
+
+    data = json_backend.loads(b'{"x": NaN, "y": 123456789012345678901234}')
+
+    assert math.isnan(data["x"])
+    assert data["y"] == 123456789012345678901234
+
+
+def test_set_json_backend():
+    assert json_backend.set_json_backend(json_backend.STDLIB) == "json"
+    assert json_backend.get_json_backend() == "json"
+    assert json_backend.set_json_backend() in json_backend.BACKENDS
+
+    with pytest.raises(ValueError):
+        json_backend.set_json_backend("yaml")
+
+
+def test_json_backend_from_env(monkeypatch):
+    monkeypatch.setenv(json_backend.JSON_BACKEND_ENV, json_backend.STDLIB)
+    assert json_backend.get_json_backend() == "json"
+
+
+def test_unknown_json_backend_from_env(monkeypatch):
+    monkeypatch.setenv(json_backend.JSON_BACKEND_ENV, "yaml")
+    assert (
+        json_backend.get_json_backend() == json_backend.available_backends()[0]
+    )
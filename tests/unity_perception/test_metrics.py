@@ -1,5 +1,8 @@
 import collections
+import functools
 import json
+import pickle
+import shutil
 
 import pandas as pd
 import pytest
@@ -8,6 +11,7 @@ from datasetinsights.datasets.unity_perception import Metrics
 from datasetinsights.datasets.unity_perception.exceptions import (
     DefinitionIDError,
 )
+from datasetinsights.datasets.unity_perception.metrics import _has_definition
 from datasetinsights.datasets.unity_perception.tables import (
     SCHEMA_VERSION,
     glob,
@@ -96,3 +100,128 @@ def test_normalize_values(mock_data_dir):
     for i, metric in enumerate(expected):
         for k in metric:
             assert metric[k] == flatten_metrics[i][k]
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_filter_metrics_num_workers(mock_data_dir, num_workers):
+    expected = Metrics(str(mock_data_dir)).filter_metrics(1)
+    metrics = Metrics(str(mock_data_dir), num_workers=num_workers)
+
+    pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+
+
+def test_filter_metrics_streaming(mock_data_dir):
+    expected = Metrics(str(mock_data_dir)).filter_metrics(1)
+    metrics = Metrics(str(mock_data_dir), streaming=True)
+
+    pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+
+
+def test_filter_metrics_by_ids(mock_data_dir):
+    metrics = Metrics(str(mock_data_dir), num_workers=1)
+
+    filtered = metrics.filter_metrics_by_ids([2, 1, 2])
+
+    assert list(filtered) == [2, 1]
+    for def_id, table in filtered.items():
+        pd.testing.assert_frame_equal(table, metrics.filter_metrics(def_id))
+    with pytest.raises(DefinitionIDError):
+        metrics.filter_metrics_by_ids([1, "bad_definition_id"])
+
+
+def test_ingest(mock_data_dir):
+    metrics = Metrics(str(mock_data_dir), num_workers=1)
+    expected = {def_id: metrics.filter_metrics(def_id) for def_id in (1, 2)}
+
+    assert sorted(metrics.ingest()) == [1, 2]
+    metrics.metrics = None
+    for def_id, table in expected.items():
+        pd.testing.assert_frame_equal(metrics.filter_metrics(def_id), table)
+    with pytest.raises(DefinitionIDError):
+        metrics.filter_metrics("bad_definition_id")
+
+
+def _assert_metrics_equal(metrics, expected):
+    for def_id in (1, 2):
+        table = metrics.filter_metrics(def_id)
+        columns = ["capture_id", "label_id"]
+        pd.testing.assert_frame_equal(
+            table.sort_values(columns).reset_index(drop=True),
+            expected.filter_metrics(def_id)
+            .sort_values(columns)
+            .reset_index(drop=True),
+        )
+
+
+@pytest.mark.parametrize("ingest", [None, "memory", "cache"])
+def test_refresh(mock_data_dir, tmp_path, ingest):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    dataset = data_root / "Dataset"
+    use_cache = ingest == "cache"
+    metrics = Metrics(str(data_root), num_workers=1, use_cache=use_cache)
+    if ingest:
+        metrics.ingest()
+    assert metrics.refresh() == []
+
+    data = json.loads((dataset / "metrics_000.json").read_text())
+    for record in data[Metrics.TABLE_NAME]:
+        record["capture_id"] += "-new"
+    new_file = dataset / "metrics_001.json"
+    new_file.write_text(json.dumps(data))
+    assert metrics.refresh() == [str(new_file)]
+    _assert_metrics_equal(metrics, Metrics(str(data_root), num_workers=1))
+
+    data[Metrics.TABLE_NAME] = data[Metrics.TABLE_NAME][:1]
+    new_file.write_text(json.dumps(data))
+    (dataset / "metrics_000.json").unlink()
+    assert metrics.refresh() == [str(new_file)]
+    expected = Metrics(str(data_root), num_workers=1)
+    if ingest:
+        metrics.metrics = None
+    assert metrics.filter_metrics_by_ids([1]).keys() == {1}
+    with pytest.raises(DefinitionIDError):
+        metrics.filter_metrics(2)
+    pd.testing.assert_frame_equal(
+        metrics.filter_metrics(1), expected.filter_metrics(1)
+    )
+    if use_cache:
+        cached = Metrics(str(data_root), use_cache=True)
+        cached.metrics = None
+        pd.testing.assert_frame_equal(
+            cached.filter_metrics(1), expected.filter_metrics(1)
+        )
+
+
+def test_metrics_graph_picklable(mock_data_dir):
+    metrics = Metrics(str(mock_data_dir), streaming=True)
+
+    graph = metrics.metrics.filter(
+        functools.partial(_has_definition, def_ids={1})
+    ).__dask_graph__()
+
+    pickle.dumps(dict(graph))
+
+
+@pytest.mark.parametrize(
+    "scheduler", ["synchronous", "threads", "processes", "distributed"]
+)
+def test_filter_metrics_scheduler(mock_data_dir, scheduler):
+    expected = Metrics(str(mock_data_dir), num_workers=1).filter_metrics(1)
+    if scheduler == "distributed":
+        distributed = pytest.importorskip("distributed")
+        client = distributed.Client(processes=False, n_workers=1)
+    else:
+        client = None
+
+    try:
+        metrics = Metrics(
+            str(mock_data_dir), num_workers=2, scheduler=scheduler
+        )
+        pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+        if client is not None:
+            metrics = Metrics(str(mock_data_dir), scheduler=client)
+            pd.testing.assert_frame_equal(metrics.filter_metrics(1), expected)
+    finally:
+        if client is not None:
+            client.close()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from datasetinsights.datasets.unity_perception import Captures
+from datasetinsights.datasets.unity_perception.objects import annotation_objects
+from datasetinsights.datasets.unity_perception.tables import SCHEMA_VERSION
+
+
+def test_annotation_objects_bounding_boxes(mock_data_dir):
+    captures = Captures(str(mock_data_dir), SCHEMA_VERSION)
+    filtered = captures.filter(4)
+
+    objects = captures.filter_objects(4, ["filename"])
+
+    rows = [
+        dict(
+            capture_id=row["id"],
+            annotation_id=row["annotation.id"],
+            filename=row["filename"],
+            **box,
+        )
+        for _, row in filtered.iterrows()
+        for box in row["annotation.values"]
+    ]
+    pd.testing.assert_frame_equal(objects, pd.DataFrame(rows))
+
+    objects = captures.filter_objects(2)
+    boxes = [
+        box
+        for values in captures.filter(2)["annotation.values"]
+        for box in values
+    ]
+    assert len(objects) == len(boxes)
+    np.testing.assert_array_equal(
+        objects[["rotation.x", "rotation.y", "rotation.z", "rotation.w"]],
+        [box["rotation"] for box in boxes],
+    )
+    np.testing.assert_array_equal(
+        objects[["size.x", "size.y", "size.z"]], [box["size"] for box in boxes]
+    )
+    assert objects["acceleration"].isna().all()
+
+
+def test_annotation_objects_nested_values():
+    keypoints = [
+        {"index": 0, "x": 1.5, "y": 2.0, "state": 2},
+        {"index": 1, "x": 0.0, "y": 0.0, "state": 0},
+    ]
+    filtered = pd.DataFrame(
+        {
+            "id": ["c0", "c1", "c2"],
+            "annotation.id": ["a0", "a1", "a2"],
+            "annotation.values": [
+                [
+                    {
+                        "label_id": 1,
+                        "translation": {"x": 1.0, "y": 2.0, "z": 3.0},
+                        "keypoints": keypoints,
+                    },
+                    {
+                        "label_id": 2,
+                        "translation": None,
+                        "keypoints": keypoints,
+                    },
+                ],
+                None,
+                [{"label_id": 3, "keypoints": keypoints[:1]}],
+            ],
+        }
+    )
+
+    objects = annotation_objects(filtered)
+
+    assert objects["capture_id"].tolist() == ["c0", "c0", "c2"]
+    assert objects["label_id"].tolist() == [1, 2, 3]
+    np.testing.assert_array_equal(
+        objects["translation.x"], [1.0, np.nan, np.nan]
+    )
+    assert objects["keypoints"].tolist() == [
+        keypoints,
+        keypoints,
+        keypoints[:1],
+    ]
+
+    objects = annotation_objects(filtered.iloc[:1])
+    assert objects["keypoints.1.state"].tolist() == [0, 0]
+    assert objects["keypoints.0.x"].dtype == np.float64
+    assert objects["translation.z"].tolist()[0] == 3.0
@@ -36,3 +36,12 @@ def test_metric_definitions(mock_data_dir):
         record = records[i]
 
         assert definition.get_definition(def_id) == record
+
+
+def test_parallel_loading(mock_data_dir):
+    expected = AnnotationDefinitions(str(mock_data_dir), SCHEMA_VERSION)
+    definition = AnnotationDefinitions(
+        str(mock_data_dir), SCHEMA_VERSION, num_workers=2
+    )
+
+    assert definition.table.equals(expected.table)
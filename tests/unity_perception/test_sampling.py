@@ -0,0 +1,123 @@
+import collections
+import json
+
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception import Captures, Metrics
+from datasetinsights.datasets.unity_perception.cache import TableCache
+from datasetinsights.datasets.unity_perception.sampling import (
+    _locate_records,
+    _scan_records,
+    record_inventory,
+    reservoir_sample,
+    sample_records,
+)
+from datasetinsights.datasets.unity_perception.tables import (
+    SCHEMA_VERSION,
+    DeferredValue,
+    glob,
+    iter_records,
+)
+
+
+def test_reservoir_sample():
+    assert sorted(reservoir_sample(range(3), 5)) == [0, 1, 2]
+    assert reservoir_sample(range(3), 0) == []
+
+    sample = reservoir_sample(range(1000), 10, seed=1)
+    assert len(set(sample)) == 10
+    assert reservoir_sample(range(1000), 10, seed=1) == sample
+
+    counts = collections.Counter()
+    for seed in range(2000):
+        counts.update(reservoir_sample(iter(range(10)), 2, seed=seed))
+    # Every item is sampled with probability 0.2, i.e. 400 times.
+    assert all(300 < counts[item] < 500 for item in range(10))
+
+
+def test_record_inventory(mock_data_dir, tmp_path):
+    files = list(glob(mock_data_dir, Captures.FILE_PATTERN))
+    cache = TableCache(tmp_path / "cache")
+
+    inventory = record_inventory(
+        files, Captures.TABLE_NAME, SCHEMA_VERSION, cache
+    )
+
+    expected = [
+        record
+        for f in files
+        for record in json.load(open(f))[Captures.TABLE_NAME]
+    ]
+    locations = [DeferredValue(*row) for row in inventory.itertuples(False)]
+    assert [location.load() for location in locations] == expected
+    cached = record_inventory(files, Captures.TABLE_NAME, SCHEMA_VERSION, cache)
+    pd.testing.assert_frame_equal(cached, inventory)
+
+    records = sample_records(
+        files, Captures.TABLE_NAME, SCHEMA_VERSION, 2, seed=3, cache=cache
+    )
+    assert len(records) == 2
+    assert records == [r for r in expected if r in records]
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        [],
+        [{}],
+        [{"a": "[{,", "b": {"c": [1, {"d": "}]"}]}}, {"e": []}],
+        [{"a": 'quote " and }', "b": "backslash \\"}, {"c": '\\" ]'}],
+        [{"a": "\u00e9t\u00e9 ]"}, {"captures": [1, 2]}],
+        [{"a": 1}, [2], "three"],
+    ],
+)
+def test_locate_records(tmp_path, records):
+    json_file = tmp_path / "captures_000.json"
+    json_file.write_text(
+        '{"version": "%s", "note": "\\"captures\\": [", "captures": %s}'
+        % (SCHEMA_VERSION, json.dumps(records, ensure_ascii=False, indent=1)),
+        encoding="utf-8",
+    )
+
+    located = _locate_records(json_file, Captures.TABLE_NAME, SCHEMA_VERSION)
+
+    expected = iter_records(
+        json_file, Captures.TABLE_NAME, SCHEMA_VERSION, deferred=True
+    )
+    rows = list(located.itertuples(index=False, name=None))
+    assert rows == [tuple(location) for location in expected]
+    assert [DeferredValue(*row).load() for row in rows] == records
+    # Arrays of objects are located without decoding them.
+    scanned = _scan_records(json_file.read_bytes(), Captures.TABLE_NAME)
+    assert (scanned is None) == any(not isinstance(r, dict) for r in records)
+
+
+def test_captures_sample(mock_data_dir):
+    expected = Captures(str(mock_data_dir), SCHEMA_VERSION)
+
+    captures, annotations = Captures.sample(
+        10, str(mock_data_dir), SCHEMA_VERSION
+    )
+    pd.testing.assert_frame_equal(
+        captures, expected.captures.reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(
+        annotations, expected.annotations.reset_index(drop=True)
+    )
+
+    captures, annotations = Captures.sample(
+        2, str(mock_data_dir), SCHEMA_VERSION, seed=0
+    )
+    assert len(captures) == 2
+    assert set(captures["id"]) <= set(expected.captures["id"])
+    assert set(annotations["capture.id"]) <= set(captures["id"])
+
+
+def test_metrics_sample(mock_data_dir):
+    sample = Metrics.sample(2, str(mock_data_dir), SCHEMA_VERSION, seed=0)
+
+    assert len(sample) == 2
+    pd.testing.assert_frame_equal(
+        sample, Metrics.sample(2, str(mock_data_dir), SCHEMA_VERSION, seed=0)
+    )
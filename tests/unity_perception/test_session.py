@@ -0,0 +1,131 @@
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception import (
+    Captures,
+    DatasetSession,
+    Metrics,
+    get_session,
+)
+from datasetinsights.datasets.unity_perception.session import close_sessions
+from datasetinsights.datasets.unity_perception.tables import SCHEMA_VERSION
+from datasetinsights.datasets.unity_perception.validation import VersionError
+
+
+def test_session_loads_tables_once(mock_data_dir):
+    session = DatasetSession(str(mock_data_dir), SCHEMA_VERSION)
+
+    assert session.captures is session.captures
+    assert session.metric_definitions is session.table("metric_definitions")
+    with pytest.raises(ValueError):
+        session.table("bad_table_name")
+
+    pd.testing.assert_frame_equal(
+        session.filter_captures(1),
+        Captures(str(mock_data_dir), SCHEMA_VERSION).filter(1),
+    )
+
+
+def test_session_ingests_metrics_of_several_definitions(mock_data_dir):
+    session = DatasetSession(str(mock_data_dir), SCHEMA_VERSION)
+    metrics = Metrics(str(mock_data_dir), SCHEMA_VERSION)
+    expected = metrics.filter_metrics_by_ids([1, 2])
+
+    table = session.filter_metrics(1)
+    pd.testing.assert_frame_equal(table, expected[1])
+    assert session.metrics._partitions is None
+    session.metrics.metrics = None
+    table.drop(columns="capture_id", inplace=True)
+    pd.testing.assert_frame_equal(session.filter_metrics(1), expected[1])
+
+    pd.testing.assert_frame_equal(session.filter_metrics(2), expected[2])
+    assert session.metrics._partitions is not None
+    pd.testing.assert_frame_equal(session.filter_metrics(1), expected[1])
+
+
+def test_session_invalidate(mock_data_dir):
+    session = DatasetSession(str(mock_data_dir), SCHEMA_VERSION)
+    captures = session.captures
+    sensors = session.sensors
+
+    session.invalidate("captures")
+    assert session.captures is not captures
+    assert session.sensors is sensors
+    session.invalidate()
+    assert session.sensors is not sensors
+
+
+def test_session_refresh(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    session = DatasetSession(str(data_root), SCHEMA_VERSION)
+    captures = session.captures
+    metrics = session.metrics
+    session.metric_definitions
+
+    data = json.loads((data_root / "Dataset" / "metrics_000.json").read_text())
+    for record in data[Metrics.TABLE_NAME]:
+        record["capture_id"] += "-new"
+    new_file = data_root / "Dataset" / "metrics_001.json"
+    new_file.write_text(json.dumps(data))
+
+    assert session.refresh() == [str(new_file)]
+    assert session.captures is captures
+    assert session.metrics is metrics
+    expected = Metrics(str(data_root), SCHEMA_VERSION).filter_metrics(1)
+    pd.testing.assert_frame_equal(session.filter_metrics(1), expected)
+
+
+def test_session_verifies_versions(mock_data_dir, tmp_path):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    sensors_file = data_root / "Dataset" / "sensors.json"
+    data = json.loads(sensors_file.read_text())
+    data["version"] = "0.0.2"
+    sensors_file.write_text(json.dumps(data))
+    session = DatasetSession(str(data_root), SCHEMA_VERSION)
+
+    with pytest.raises(VersionError, match="sensors.json"):
+        session.verify()
+    # Only the files of the loaded table are verified.
+    session.captures
+    with pytest.raises(VersionError, match="sensors.json"):
+        session.sensors
+    assert list(session._tables) == ["captures"]
+
+
+@pytest.mark.parametrize("drop", ["invalidate", "invalidate_all", "refresh"])
+def test_session_verifies_dropped_tables_again(mock_data_dir, tmp_path, drop):
+    data_root = tmp_path / "simrun"
+    shutil.copytree(mock_data_dir, data_root)
+    session = DatasetSession(str(data_root), SCHEMA_VERSION)
+    session.sensors
+
+    sensors_file = data_root / "Dataset" / "sensors.json"
+    data = json.loads(sensors_file.read_text())
+    data["version"] = "0.0.2"
+    sensors_file.write_text(json.dumps(data))
+    if drop == "invalidate":
+        session.invalidate("sensors")
+    elif drop == "invalidate_all":
+        session.invalidate()
+    else:
+        session.refresh()
+
+    with pytest.raises(VersionError, match="sensors.json"):
+        session.sensors
+
+
+def test_get_session(mock_data_dir):
+    try:
+        session = get_session(str(mock_data_dir))
+
+        assert get_session(str(mock_data_dir)) is session
+        assert get_session(str(mock_data_dir), use_cache=False) is not session
+        close_sessions()
+        assert get_session(str(mock_data_dir)) is not session
+    finally:
+        close_sessions()
@@ -0,0 +1,175 @@
+import functools
+import json
+
+import pandas as pd
+import pytest
+
+from datasetinsights.datasets.unity_perception.tables import (
+    SCHEMA_VERSION,
+    STREAM_CHUNK_SIZE,
+    ColumnBuilder,
+    DeferredValue,
+    glob,
+    iter_records,
+    load_deferred,
+    load_table,
+    map_files,
+    prefetch,
+    read_version,
+    verify_versions,
+)
+from datasetinsights.datasets.unity_perception.validation import VersionError
+
+
+def test_glob_sorted(mock_data_dir):
+    files = list(glob(mock_data_dir, "**/*.json"))
+
+    assert files == sorted(files)
+
+
+def test_map_files_in_order(mock_data_dir):
+    files = list(glob(mock_data_dir, "**/captures_*.json"))
+    load = functools.partial(
+        load_table, table_name="captures", version=SCHEMA_VERSION
+    )
+
+    expected = [load(f) for f in files]
+    actual = map_files(load, files, num_workers=2)
+
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        pd.testing.assert_frame_equal(a, e)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, STREAM_CHUNK_SIZE])
+def test_iter_records(mock_data_dir, tmp_path, chunk_size):
+    float_file = tmp_path / "metrics_000.json"
+    float_file.write_text(
+        json.dumps(
+            {"version": SCHEMA_VERSION, "metrics": [0.0333, 1e-05, -2.5e3, 7]}
+        )
+    )
+    for json_file in list(glob(mock_data_dir, "**/*.json")) + [float_file]:
+        with open(json_file, "r") as f:
+            data = json.load(f)
+        table_name = next(k for k in data if k != "version")
+
+        records = iter_records(
+            json_file, table_name, SCHEMA_VERSION, chunk_size
+        )
+
+        assert list(records) == data[table_name]
+
+
+def test_iter_records_version_after_table(tmp_path):
+    json_file = tmp_path / "metrics_000.json"
+    records = [{"value": 1234567, "name": "☃"}] * 3
+    json_file.write_text(
+        json.dumps({"metrics": records, "version": SCHEMA_VERSION}),
+        encoding="utf-8",
+    )
+
+    assert (
+        list(iter_records(json_file, "metrics", SCHEMA_VERSION, 5)) == records
+    )
+    with pytest.raises(VersionError):
+        list(iter_records(json_file, "metrics", "0.0.2"))
+    with pytest.raises(KeyError):
+        list(iter_records(json_file, "captures", SCHEMA_VERSION))
+
+
+def test_read_version(tmp_path):
+    records = [{"value": 1234567, "name": "☃"}] * 3
+    json_file = tmp_path / "metrics_000.json"
+    for document in [
+        {"version": SCHEMA_VERSION, "metrics": records},
+        {"metrics": records, "version": SCHEMA_VERSION},
+        {"metrics": records, "version": SCHEMA_VERSION, "other": [1]},
+    ]:
+        json_file.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+        assert read_version(json_file, scan_size=16) == SCHEMA_VERSION
+
+    json_file.write_text(json.dumps({"metrics": records}))
+    assert read_version(json_file) is None
+
+
+def test_verify_versions(mock_data_dir, tmp_path):
+    files = list(glob(mock_data_dir, "**/*.json"))
+    verify_versions(files, SCHEMA_VERSION)
+    verify_versions(files, SCHEMA_VERSION, num_workers=1)
+
+    bad_files = [tmp_path / f"captures_00{i}.json" for i in range(2)]
+    for bad_file in bad_files:
+        bad_file.write_text(json.dumps({"version": "0.0.2", "captures": []}))
+    with pytest.raises(VersionError) as e:
+        verify_versions(files + bad_files, SCHEMA_VERSION)
+    assert all(str(bad_file) in str(e.value) for bad_file in bad_files)
+
+
+def test_column_builder():
+    records = [{"id": "a", "step": 1}, {"id": "b"}, {"x": {"y": 1}, "id": "c"}]
+    builder = ColumnBuilder()
+    for record in records:
+        builder.append(record)
+
+    assert len(builder) == len(records)
+    pd.testing.assert_frame_equal(builder.to_frame(), pd.DataFrame(records))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, STREAM_CHUNK_SIZE])
+def test_iter_records_deferred(tmp_path, chunk_size):
+    json_file = tmp_path / "captures_000.json"
+    records = [
+        {
+            "id": "☃",
+            "timestamp": 0.0333,
+            "annotations": [{"id": 1, "values": [{"x": "é"}]}],
+        },
+        {
+            "id": "b",
+            "timestamp": 1e-05,
+            "annotations": [{"id": 2}, {"id": 3, "values": None}],
+        },
+        {"id": "c", "timestamp": 0.0666, "annotations": []},
+    ]
+    json_file.write_text(
+        json.dumps({"version": SCHEMA_VERSION, "captures": records}, indent=1),
+        encoding="utf-8",
+    )
+
+    loaded = list(
+        iter_records(
+            json_file,
+            "captures",
+            SCHEMA_VERSION,
+            chunk_size,
+            deferred={"annotations": {"values": True}},
+        )
+    )
+
+    values = loaded[0]["annotations"][0]["values"]
+    assert isinstance(values, DeferredValue)
+    assert values.load() == [{"x": "é"}]
+    for record in loaded:
+        for annotation in record["annotations"]:
+            if "values" in annotation:
+                [annotation["values"]] = load_deferred([annotation["values"]])
+    assert loaded == records
+
+
+def test_prefetch():
+    assert list(prefetch(range(10), 2)) == list(range(10))
+
+    def failing():
+        yield 1
+        raise ValueError("bad file")
+
+    items = prefetch(failing())
+    assert next(items) == 1
+    with pytest.raises(ValueError):
+        next(items)
+
+    items = prefetch(iter(range(100)))
+    assert next(items) == 0
+    items.close()
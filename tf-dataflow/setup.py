@@ -4,5 +4,6 @@ setuptools.setup(
     name="tfdataflow",
     version="1.0",
     install_requires=[],
+    extras_require={"json": ["orjson"]},
     packages=setuptools.find_packages(),
 )
@@ -10,9 +10,27 @@ import click
 import tensorflow as tf
 from apache_beam.options.pipeline_options import PipelineOptions
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.getLogger().setLevel(logging.INFO)
 
 
+def _json_loads(contents):
+    """Parse a json document with orjson if it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(contents)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN, Infinity and integers over 64 bits, which
+            # the json module accepts.
+            pass
+
+    return json.loads(contents)
+
+
 def _annotations_to_bb_normalized(values, width, height):
     x_mins = [v["x"] / width for v in values]
     x_maxes = [x + v["width"] / width for x, v in zip(x_mins, values)]
@@ -98,9 +116,9 @@ class AppParamLister(beam.DoFn):
 
 
 def _read_captures(capture_file):
-    capture = tf.io.gfile.GFile(capture_file)
+    capture = tf.io.gfile.GFile(capture_file, "rb")
     capture_contents = capture.read()
-    annotation_json = json.loads(capture_contents)
+    annotation_json = _json_loads(capture_contents)
     capture_data = annotation_json["captures"]
     return capture_data
 